@@ -0,0 +1,112 @@
+import os
+import random
+
+WORDS = (
+    "altamira bison cave paint root shell kernel static site markdown jinja "
+    "template post index page fire story idea archive light stone hand ochre "
+    "charcoal wall torch echo river night winter hunt herd horn"
+).split()
+
+# Front matter shapes and how often they appear by default
+FRONT_MATTER_SHAPES = {
+    "full": 0.7,
+    "minimal": 0.15,
+    "page": 0.05,
+    "none": 0.1,
+}
+
+
+def make_paragraph(rng, words):
+    """
+    Make a paragraph of random words, with some inline Markdown.
+
+    Args:
+        rng (random.Random): The random number generator.
+        words (int): The number of words.
+    """
+    paragraph = [rng.choice(WORDS) for _ in range(words)]
+    if words > 10:
+        paragraph[rng.randrange(words)] = f"**{rng.choice(WORDS)}**"
+        paragraph[rng.randrange(words)] = f"[{rng.choice(WORDS)}](http://example.com)"
+    return " ".join(paragraph).capitalize() + "."
+
+
+def make_post(rng, index, body_words, tag_cardinality, tags_per_post, shape):
+    """
+    Make the source of one synthetic post.
+
+    Args:
+        rng (random.Random): The random number generator.
+        index (int): The number of the post, used in its title.
+        body_words (int): The approximate number of words in the body.
+        tag_cardinality (int): The number of distinct tags in the corpus.
+        tags_per_post (int): The number of tags on each post.
+        shape (str): The front matter shape, one of FRONT_MATTER_SHAPES.
+    """
+    title = f"Post {index} {rng.choice(WORDS)}"
+    tags = sorted(
+        {f"tag{rng.randrange(tag_cardinality)}" for _ in range(tags_per_post)}
+    )
+    if shape == "full":
+        front_matter = (
+            f"---\ntitle: {title}\ntags: [{', '.join(tags)}]\n"
+            f"synopsis: {make_paragraph(rng, 12)}\n---\n"
+        )
+    elif shape == "minimal":
+        front_matter = f"---\ntitle: {title}\n---\n"
+    elif shape == "page":
+        front_matter = f"---\ntitle: {title}\ntype: page\n---\n"
+    else:
+        front_matter = ""
+
+    blocks = [f"# {title}"]
+    remaining = body_words
+    while remaining > 0:
+        words = min(remaining, rng.randint(30, 120))
+        blocks.append(make_paragraph(rng, words))
+        remaining -= words
+        if rng.random() < 0.2:
+            blocks.append("\n".join(f"- {make_paragraph(rng, 6)}" for _ in range(3)))
+        if rng.random() < 0.1:
+            blocks.append("    " + "\n    ".join(make_paragraph(rng, 5) for _ in range(3)))
+    return front_matter + "\n\n".join(blocks) + "\n"
+
+
+def generate_corpus(
+    directory,
+    posts=1000,
+    body_words=600,
+    tag_cardinality=50,
+    tags_per_post=3,
+    shapes=FRONT_MATTER_SHAPES,
+    seed=0,
+):
+    """
+    Write a synthetic corpus of Markdown posts. The same arguments always give the same corpus.
+
+    Args:
+        directory (str): The directory to write the posts to.
+        posts (int, optional): The number of posts. Default is 1000.
+        body_words (int, optional): The approximate number of words per post body. Default is 600.
+        tag_cardinality (int, optional): The number of distinct tags. Default is 50.
+        tags_per_post (int, optional): The number of tags drawn for each post. Default is 3.
+        shapes (dict, optional): The weight of each front matter shape. Default is FRONT_MATTER_SHAPES.
+        seed (int, optional): The random seed. Default is 0.
+
+    Returns:
+        list: The paths of the generated posts.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    shape_names = list(shapes)
+    shape_weights = [shapes[name] for name in shape_names]
+    paths = []
+    for index in range(posts):
+        shape = rng.choices(shape_names, shape_weights)[0]
+        path = os.path.join(directory, f"post_{index:06d}.md")
+        with open(path, "w") as f:
+            f.write(
+                make_post(rng, index, body_words, tag_cardinality, tags_per_post, shape)
+            )
+        paths.append(path)
+    return paths
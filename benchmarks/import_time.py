@@ -0,0 +1,182 @@
+"""
+Measure the start-up cost of the site generator with `python -X importtime`.
+
+A no-op rebuild does little more than start the interpreter and import the
+generator, so its time is mostly import time. The module is imported in a
+fresh interpreter, best of several runs; the check fails when the import
+takes longer than the budget, when a module that only some builds need is
+imported eagerly, or when importing loads the configuration.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget 150 --repeat 5 --top 20
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC_DIRECTORY = os.path.join(PROJECT_ROOT, "src")
+
+# The module the command line imports at start-up
+DEFAULT_MODULE = "main"
+# The cumulative import time allowed, in milliseconds
+DEFAULT_BUDGET_MS = 150
+DEFAULT_REPEAT = 3
+# Modules imported only on the paths that need them: templates, Markdown,
+# the pipeline, worker pools, the sitemap and feed, and the preview server
+DEFERRED_MODULES = (
+    "jinja2",
+    "markdown2",
+    "markdown",
+    "mistune",
+    "markdown_it",
+    "asyncio",
+    "concurrent.futures",
+    "xml.sax",
+    "webbrowser",
+)
+# `import time: <self us> | <cumulative us> | <indentation><module>`
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def parse_import_times(output):
+    """
+    Parse the report of `python -X importtime`.
+
+    Args:
+        output (str): The standard error of the interpreter.
+
+    Returns:
+        dict: The self and cumulative import time of every module, in microseconds, by module name.
+    """
+    times = {}
+    for line in output.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            times[match.group(4)] = {
+                "self_us": int(match.group(1)),
+                "cumulative_us": int(match.group(2)),
+            }
+    return times
+
+
+def measure_import(module=DEFAULT_MODULE):
+    """
+    Import a module in a fresh interpreter and report what the import cost.
+
+    Args:
+        module (str, optional): The module to import, from the source directory. Default is DEFAULT_MODULE.
+
+    Returns:
+        tuple: The import times, as returned by `parse_import_times`, and whether the configuration was loaded.
+
+    Raises:
+        RuntimeError: If the import fails.
+    """
+    code = (
+        f"import {module}, sys\n"
+        "config = sys.modules.get('src.config')\n"
+        "print(config is not None and 'parsed_config' in vars(config))\n"
+    )
+    python_path = [SRC_DIRECTORY, PROJECT_ROOT]
+    if os.environ.get("PYTHONPATH"):
+        python_path.append(os.environ["PYTHONPATH"])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(python_path)),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Error: Importing {module} failed:\n{result.stderr}")
+    return parse_import_times(result.stderr), result.stdout.strip() == "True"
+
+
+def get_eager_imports(times, deferred_modules=DEFERRED_MODULES):
+    """
+    Get the deferred modules, or their submodules, an import loaded.
+
+    Args:
+        times (dict): The import times, as returned by `parse_import_times`.
+        deferred_modules (tuple, optional): The modules that must not be imported at start-up. Default is DEFERRED_MODULES.
+    """
+    return sorted(
+        name
+        for name in times
+        if any(name == deferred or name.startswith(f"{deferred}.") for deferred in deferred_modules)
+    )
+
+
+def check_import(module=DEFAULT_MODULE, budget_ms=DEFAULT_BUDGET_MS, repeat=DEFAULT_REPEAT):
+    """
+    Measure the import of a module and check it against the start-up budget.
+
+    Args:
+        module (str, optional): The module to import. Default is DEFAULT_MODULE.
+        budget_ms (float, optional): The cumulative import time allowed, in milliseconds. Default is DEFAULT_BUDGET_MS.
+        repeat (int, optional): The number of imports measured; the fastest counts. Default is DEFAULT_REPEAT.
+
+    Returns:
+        tuple: The import times of the fastest run and the list of problems found; none means the check passed.
+    """
+    runs = [measure_import(module) for _ in range(max(1, repeat))]
+    times, config_loaded = min(runs, key=lambda run: run[0][module]["cumulative_us"])
+    problems = []
+    import_ms = times[module]["cumulative_us"] / 1000
+    if import_ms > budget_ms:
+        problems.append(f"importing {module} took {import_ms:.1f} ms, over the {budget_ms} ms budget")
+    for name in get_eager_imports(times):
+        problems.append(f"{name} is imported at start-up")
+    if any(config_loaded for _, config_loaded in runs):
+        problems.append("the configuration is loaded at import time")
+    return times, problems
+
+
+def print_import_times(times, top=15):
+    """
+    Print the modules that took longest to import, themselves included.
+
+    Args:
+        times (dict): The import times, as returned by `parse_import_times`.
+        top (int, optional): The number of modules listed. Default is 15.
+    """
+    print(f"{'module':<40}{'self ms':>10}{'total ms':>10}")
+    slowest = sorted(times.items(), key=lambda item: item[1]["cumulative_us"], reverse=True)
+    for name, time in slowest[:top]:
+        print(f"{name:<40}{time['self_us'] / 1000:>10.1f}{time['cumulative_us'] / 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the start-up cost of the site generator.")
+    parser.add_argument(
+        "--module", type=str, default=DEFAULT_MODULE, help="The module to import."
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="The cumulative import time allowed, in milliseconds.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="The number of imports measured; the fastest counts.",
+    )
+    parser.add_argument("--top", type=int, default=15, help="The number of modules listed.")
+    args = parser.parse_args()
+
+    times, problems = check_import(args.module, args.budget, args.repeat)
+    print_import_times(times, args.top)
+    for problem in problems:
+        print(f"REGRESSION {problem}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
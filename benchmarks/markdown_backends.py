@@ -0,0 +1,243 @@
+"""
+Compare the installed Markdown backends on a conformance corpus and on our posts.
+
+Every backend renders every document; the output is compared with the
+reference backend's after normalizing insignificant differences (whitespace
+between tags, attribute order, void tag syntax, character references), and
+each backend's throughput is measured.
+
+Usage:
+    python -m benchmarks.markdown_backends
+    python -m benchmarks.markdown_backends --posts static/posts --repeat 5 --output markdown.json
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from html.parser import HTMLParser
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (PROJECT_ROOT, os.path.join(PROJECT_ROOT, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from src.config import LOCAL_POSTS_DIRECTORY
+from src.utils.handler import read_front_matter, read_post_body
+from src.utils.markdown_backends import DEFAULT_BACKEND, get_available_backends
+
+CORPUS_DIRECTORY = os.path.join(PROJECT_ROOT, "tests", "markdown_corpus")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class HTMLNormalizer(HTMLParser):
+    """
+    Reduce HTML to a list of tokens that only differ when the rendered documents do.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tokens = []
+        self.preformatted = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "pre":
+            self.preformatted += 1
+        self.tokens.append(("start", tag, tuple(sorted(attrs))))
+
+    def handle_startendtag(self, tag, attrs):
+        self.tokens.append(("start", tag, tuple(sorted(attrs))))
+
+    def handle_endtag(self, tag):
+        if tag == "pre":
+            self.preformatted = max(0, self.preformatted - 1)
+        self.tokens.append(("end", tag))
+
+    def handle_data(self, data):
+        if not self.preformatted:
+            data = WHITESPACE_PATTERN.sub(" ", data).strip()
+        if not data:
+            return
+        if self.tokens and self.tokens[-1][0] == "text":
+            # Character references split text into several calls
+            self.tokens[-1] = ("text", self.tokens[-1][1] + data)
+        else:
+            self.tokens.append(("text", data))
+
+
+def normalize_html(content):
+    """
+    Normalize HTML for comparison.
+
+    Args:
+        content (str): The HTML.
+
+    Returns:
+        list of tuple: The tokens of the document.
+    """
+    normalizer = HTMLNormalizer()
+    normalizer.feed(content)
+    normalizer.close()
+    return normalizer.tokens
+
+
+def get_first_difference(expected, actual):
+    """
+    Describe where two normalized documents first differ.
+
+    Args:
+        expected (list of tuple): The tokens of the reference output.
+        actual (list of tuple): The tokens of the compared output.
+
+    Returns:
+        str or None: The first differing tokens, or None when the documents are equivalent.
+    """
+    for position, (expected_token, actual_token) in enumerate(zip(expected, actual)):
+        if expected_token != actual_token:
+            return f"token {position}: expected {expected_token!r}, got {actual_token!r}"
+    if len(expected) != len(actual):
+        return f"expected {len(expected)} tokens, got {len(actual)}"
+    return None
+
+
+def load_corpus(corpus_directory=CORPUS_DIRECTORY, posts_directory=None):
+    """
+    Load the conformance corpus, and optionally the bodies of our posts.
+
+    Args:
+        corpus_directory (str, optional): The directory of the corpus `.md` files. Default is CORPUS_DIRECTORY.
+        posts_directory (str, optional): A directory of posts to add, front matter removed.
+
+    Returns:
+        dict: The Markdown of every document, by name.
+    """
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(corpus_directory, "*.md"))):
+        with open(path) as f:
+            corpus[os.path.relpath(path, PROJECT_ROOT)] = f.read()
+    if posts_directory:
+        for path in sorted(glob.glob(os.path.join(posts_directory, "*.md"))):
+            _, body_offset = read_front_matter(path)
+            corpus[os.path.relpath(path, PROJECT_ROOT)] = read_post_body(path, body_offset)
+    return corpus
+
+
+def find_differences(backends, corpus, reference=DEFAULT_BACKEND):
+    """
+    Compare the output of every backend with the reference backend's.
+
+    Args:
+        backends (dict): The backends to compare, by name; must include the reference.
+        corpus (dict): The Markdown of every document, by name.
+        reference (str, optional): The name of the reference backend. Default is DEFAULT_BACKEND.
+
+    Returns:
+        dict: For every other backend, the first difference of each document it renders differently, by document name.
+    """
+    expected = {
+        name: normalize_html(backends[reference].render(markdown))
+        for name, markdown in corpus.items()
+    }
+    differences = {}
+    for backend_name, backend in backends.items():
+        if backend_name == reference:
+            continue
+        differences[backend_name] = {}
+        for name, markdown in corpus.items():
+            difference = get_first_difference(
+                expected[name], normalize_html(backend.render(markdown))
+            )
+            if difference is not None:
+                differences[backend_name][name] = difference
+    return differences
+
+
+def measure_throughput(backend, corpus, repeat=3):
+    """
+    Time a backend rendering the whole corpus, keeping the best of several runs.
+
+    Args:
+        backend (MarkdownBackend): The backend.
+        corpus (dict): The Markdown of every document, by name.
+        repeat (int, optional): The number of runs. Default is 3.
+
+    Returns:
+        dict: The best `seconds`, and the `documents_per_second` and `megabytes_per_second` it gives.
+    """
+    documents = list(corpus.values())
+    size = sum(len(document.encode("utf-8")) for document in documents)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            backend.render(document)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return {
+        "seconds": round(best, 6),
+        "documents_per_second": round(len(documents) / best, 2) if best else None,
+        "megabytes_per_second": round(size / best / 1e6, 3) if best else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the installed Markdown backends.")
+    parser.add_argument(
+        "--posts",
+        type=str,
+        default=LOCAL_POSTS_DIRECTORY,
+        help="Also render the posts in this directory.",
+    )
+    parser.add_argument(
+        "--reference",
+        type=str,
+        default=DEFAULT_BACKEND,
+        help="The backend the others are compared with.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="The number of timed runs.")
+    parser.add_argument("--output", "-o", type=str, help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Exit with an error when any backend renders a document differently.",
+    )
+    args = parser.parse_args()
+
+    backends = get_available_backends()
+    if args.reference not in backends:
+        parser.error(f"The reference backend '{args.reference}' is not installed.")
+    corpus = load_corpus(posts_directory=args.posts)
+    differences = find_differences(backends, corpus, args.reference)
+    results = {
+        "documents": len(corpus),
+        "backends": {
+            name: {
+                "version": backend.version,
+                **measure_throughput(backend, corpus, args.repeat),
+                "differences": differences.get(name, {}),
+            }
+            for name, backend in backends.items()
+        },
+    }
+
+    print(f"{len(corpus)} documents, compared with {args.reference}")
+    print(f"{'backend':<14}{'version':>10}{'docs/s':>12}{'MB/s':>10}{'differ':>8}")
+    for name, summary in results["backends"].items():
+        print(
+            f"{name:<14}{summary['version']:>10}{summary['documents_per_second']:>12.0f}"
+            f"{summary['megabytes_per_second']:>10.3f}{len(summary['differences']):>8}"
+        )
+        for document, difference in summary["differences"].items():
+            print(f"    {document}: {difference}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.strict and any(differences.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Benchmark the site generator on a synthetic corpus.
+
+Usage:
+    python -m benchmarks.run --posts 1000 --output results.json
+    python -m benchmarks.run --posts 1000 --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (PROJECT_ROOT, os.path.join(PROJECT_ROOT, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.corpus import generate_corpus
+from src.generate_pages import (
+    generate_all_posts,
+    generate_pages,
+    generate_post,
+    generate_posts_pipeline,
+    get_post_output_dir,
+    load_posts,
+    make_site,
+    scan_post,
+)
+from src.utils.writer import PageWriter
+
+# A phase is a regression when it is this much slower than the baseline
+DEFAULT_TOLERANCE = 0.2
+
+
+def get_percentiles(latencies):
+    """
+    Get the median and 95th percentile of a list of latencies, in milliseconds.
+
+    Args:
+        latencies (list of float): The latencies in seconds.
+    """
+    if not latencies:
+        return None, None
+    if len(latencies) == 1:
+        return latencies[0] * 1000, latencies[0] * 1000
+    cut_points = statistics.quantiles(latencies, n=100, method="inclusive")
+    return statistics.median(latencies) * 1000, cut_points[94] * 1000
+
+
+def get_peak_rss_mb():
+    """
+    Get the peak resident set size of this process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def time_call(func, *args, **kwargs):
+    """
+    Call a function and return its result and wall time in seconds.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def make_phase(seconds, items, latencies=None):
+    """
+    Summarize a phase.
+
+    Args:
+        seconds (float): The wall time of the phase.
+        items (int): The number of posts or pages the phase handled.
+        latencies (list of float, optional): Per-item latencies in seconds.
+    """
+    p50, p95 = get_percentiles(latencies or [])
+    return {
+        "seconds": round(seconds, 6),
+        "items": items,
+        "per_second": round(items / seconds, 2) if seconds else None,
+        "p50_ms": None if p50 is None else round(p50, 4),
+        "p95_ms": None if p95 is None else round(p95, 4),
+    }
+
+
+def run_benchmarks(work_dir, posts=1000, body_words=600, tag_cardinality=50, jobs=1, seed=0):
+    """
+    Generate a corpus and time every build phase on it.
+
+    Args:
+        work_dir (str): The directory for the corpus and the generated site.
+        posts (int, optional): The number of posts. Default is 1000.
+        body_words (int, optional): The approximate number of words per post body. Default is 600.
+        tag_cardinality (int, optional): The number of distinct tags. Default is 50.
+        jobs (int, optional): The number of worker processes. Default is 1.
+        seed (int, optional): The random seed of the corpus. Default is 0.
+
+    Returns:
+        dict: The results, ready to be saved as JSON.
+    """
+    posts_dir = os.path.join(work_dir, "posts")
+    public_dir = os.path.join(work_dir, "public")
+    public_posts_dir = os.path.join(public_dir, "posts")
+    post_paths = generate_corpus(posts_dir, posts, body_words, tag_cardinality, seed=seed)
+    phases = {}
+
+    latencies = []
+    for post_path in post_paths:
+        _, seconds = time_call(scan_post, post_path)
+        latencies.append(seconds)
+    catalog, seconds = time_call(load_posts, posts_dir, jobs=jobs)
+    phases["load_posts"] = make_phase(seconds, len(catalog), latencies)
+
+    latencies = []
+    with PageWriter() as writer:
+        for post in catalog:
+            output_dir = get_post_output_dir(post, public_dir, public_posts_dir)
+            _, seconds = time_call(generate_post, post, output_dir, writer)
+            latencies.append(seconds)
+    shutil.rmtree(public_dir)
+    _, seconds = time_call(
+        generate_all_posts, catalog, public_dir, public_posts_dir, jobs=jobs
+    )
+    phases["generate_all_posts"] = make_phase(seconds, len(catalog), latencies)
+    shutil.rmtree(public_dir)
+    _, seconds = time_call(
+        generate_posts_pipeline, catalog, public_dir, public_posts_dir, jobs=jobs
+    )
+    phases["generate_posts_pipeline"] = make_phase(seconds, len(catalog))
+
+    pages, seconds = time_call(generate_pages, catalog, 5, public_dir)
+    phases["generate_pages"] = make_phase(seconds, len(pages))
+
+    shutil.rmtree(public_dir)
+    site_args = {
+        "local_posts_directory": posts_dir,
+        "public_dir": public_dir,
+        "public_posts_dir": public_posts_dir,
+        "manifest_file": os.path.join(work_dir, "manifest.json"),
+        "cache_directory": os.path.join(work_dir, "cache"),
+        "jobs": jobs,
+    }
+    _, seconds = time_call(make_site, **site_args)
+    phases["make_site_cold"] = make_phase(seconds, len(catalog))
+    _, seconds = time_call(make_site, **site_args, force_rebuild=True)
+    phases["make_site_forced"] = make_phase(seconds, len(catalog))
+    _, seconds = time_call(make_site, **site_args)
+    phases["make_site_noop"] = make_phase(seconds, len(catalog))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "posts": posts,
+            "body_words": body_words,
+            "tag_cardinality": tag_cardinality,
+            "jobs": jobs,
+            "seed": seed,
+        },
+        "phases": phases,
+        "peak_rss_mb": round(get_peak_rss_mb(), 1),
+    }
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare phase timings against a baseline.
+
+    Args:
+        results (dict): The current results.
+        baseline (dict): The baseline results.
+        tolerance (float, optional): The allowed slowdown, as a fraction. Default is DEFAULT_TOLERANCE.
+
+    Returns:
+        list of str: A description of every regression.
+    """
+    regressions = []
+    for phase, current in results["phases"].items():
+        previous = baseline.get("phases", {}).get(phase)
+        if not previous or not previous["seconds"]:
+            continue
+        ratio = current["seconds"] / previous["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{phase}: {current['seconds']:.3f}s vs {previous['seconds']:.3f}s "
+                f"({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def print_results(results):
+    """
+    Print the results as a table.
+    """
+    print(f"{'phase':<22}{'seconds':>10}{'items/s':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for phase, summary in results["phases"].items():
+        p50 = "-" if summary["p50_ms"] is None else f"{summary['p50_ms']:.3f}"
+        p95 = "-" if summary["p95_ms"] is None else f"{summary['p95_ms']:.3f}"
+        per_second = "-" if summary["per_second"] is None else f"{summary['per_second']:.0f}"
+        print(f"{phase:<22}{summary['seconds']:>10.3f}{per_second:>12}{p50:>10}{p95:>10}")
+    print(f"peak RSS: {results['peak_rss_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the site generator.")
+    parser.add_argument("--posts", type=int, default=1000, help="The number of posts.")
+    parser.add_argument(
+        "--body-words", type=int, default=600, help="The approximate number of words per post."
+    )
+    parser.add_argument(
+        "--tags", type=int, default=50, help="The number of distinct tags in the corpus."
+    )
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="The number of processes.")
+    parser.add_argument("--seed", type=int, default=0, help="The random seed of the corpus.")
+    parser.add_argument("--output", "-o", type=str, help="Write the results to this JSON file.")
+    parser.add_argument(
+        "--baseline", "-b", type=str, help="Compare the results with this JSON file."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="The allowed slowdown against the baseline, as a fraction.",
+    )
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="blog-benchmark-")
+    try:
+        results = run_benchmarks(
+            work_dir, args.posts, args.body_words, args.tags, args.jobs, args.seed
+        )
+    finally:
+        shutil.rmtree(work_dir)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
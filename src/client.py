@@ -0,0 +1,170 @@
+"""
+Send build requests to a running build daemon.
+
+Only the standard library is imported, so a build through the daemon
+costs little more than the build itself. Start the daemon with
+`python src/main.py daemon`.
+
+Usage:
+    python src/client.py
+    python src/client.py build --force-rebuild --verbose
+    python src/client.py status
+    python src/client.py stop
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CONFIG_PATH = os.path.join(PROJECT_ROOT, "config.json")
+DEFAULT_SOCKET = ".cache/build.sock"
+# The exit status when no daemon is listening
+NOT_RUNNING = 2
+
+
+def get_default_socket_path(config_path=CONFIG_PATH):
+    """
+    Get the socket path set by `daemon_socket` in the configuration, without loading the site generator.
+
+    Args:
+        config_path (str, optional): The path of the configuration file. Default is CONFIG_PATH.
+    """
+    try:
+        with open(config_path) as f:
+            socket_path = json.load(f).get("daemon_socket", DEFAULT_SOCKET)
+    except (FileNotFoundError, json.JSONDecodeError):
+        socket_path = DEFAULT_SOCKET
+    return os.path.join(PROJECT_ROOT, socket_path)
+
+
+def encode_message(message):
+    """
+    Encode a message of the daemon protocol: one JSON object per line.
+
+    Args:
+        message (dict): The message.
+    """
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+def read_messages(stream):
+    """
+    Read the messages of the daemon protocol from a stream until it is closed.
+
+    Args:
+        stream (file): A binary stream.
+
+    Yields:
+        dict: The messages.
+    """
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def send_request(socket_path, request, on_message=None):
+    """
+    Send a request to the build daemon and wait for its result.
+
+    Args:
+        socket_path (str): The path of the daemon's Unix socket.
+        request (dict): The `command` ("build", "status" or "stop") and, for builds, the `options` of `make_site` to override and whether to forward `verbose` logs.
+        on_message (callable, optional): Called with every `log` and `output` message received before the result.
+
+    Returns:
+        dict: The result message: `ok`, and the `stats` and `seconds` of a build, the `status` of the daemon or the `error`.
+
+    Raises:
+        ConnectionError: If no daemon is listening on the socket.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"No build daemon is listening on {socket_path}.") from e
+        client.sendall(encode_message(request))
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as stream:
+            for message in read_messages(stream):
+                if message["type"] == "result":
+                    return message
+                if on_message is not None:
+                    on_message(message)
+    raise ConnectionError("The build daemon closed the connection without a result.")
+
+
+def print_message(message):
+    """
+    Print a log or output message forwarded by the daemon.
+
+    Args:
+        message (dict): The message.
+    """
+    if message["type"] == "log":
+        print(message["message"], file=sys.stderr)
+    else:
+        print(message["text"], end="")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send a request to the build daemon.")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["build", "status", "stop"],
+        default="build",
+        help="Build the site (default), report the daemon status, or stop the daemon.",
+    )
+    parser.add_argument(
+        "--socket", type=str, default=None, help="The Unix socket the daemon listens on."
+    )
+    # Options left out are the daemon's defaults
+    parser.add_argument("--posts-directory", "-p", dest="local_posts_directory", type=str)
+    parser.add_argument("--public-directory", "-o", dest="public_dir", type=str)
+    parser.add_argument("--public-posts-directory", "-i", dest="public_posts_dir", type=str)
+    parser.add_argument("--posts-per-page", "-n", type=int)
+    parser.add_argument("--force-rebuild", "-f", action="store_true", default=None)
+    parser.add_argument("--jobs", "-j", type=int)
+    parser.add_argument("--minify", action=argparse.BooleanOptionalAction)
+    parser.add_argument("--precompress", action=argparse.BooleanOptionalAction)
+    parser.add_argument("--pipeline", action=argparse.BooleanOptionalAction)
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Forward the build logs at INFO level."
+    )
+    args = parser.parse_args()
+
+    options = {
+        name: value
+        for name, value in vars(args).items()
+        if name not in ("command", "socket", "verbose") and value is not None
+    }
+    for name in ("local_posts_directory", "public_dir", "public_posts_dir"):
+        # The daemon may run from another directory
+        if name in options:
+            options[name] = os.path.abspath(options[name])
+    request = {"command": args.command, "options": options, "verbose": args.verbose}
+    socket_path = args.socket or get_default_socket_path()
+    try:
+        result = send_request(socket_path, request, print_message)
+    except ConnectionError as e:
+        print(f"{e} Start one with `python src/main.py daemon`.", file=sys.stderr)
+        sys.exit(NOT_RUNNING)
+
+    if not result["ok"]:
+        print(f"Error: {result['error']}", file=sys.stderr)
+        sys.exit(1)
+    if args.command == "build":
+        stats = result["stats"] or {}
+        print(
+            f"Built in {result['seconds'] * 1000:.0f} ms: {stats.get('written', 0)} written, "
+            f"{stats.get('unchanged', 0)} unchanged, {stats.get('skipped', 0)} skipped, "
+            f"{stats.get('broken_links', 0)} broken links."
+        )
+    elif args.command == "status":
+        print(json.dumps(result["status"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
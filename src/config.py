@@ -1,19 +1,136 @@
+"""
+The configuration of the site generator.
+
+Nothing is read when this module is imported. The settings below become
+attributes of the module when `configure` loads a configuration; reading
+any of them first loads `config.json` from the project root.
+"""
 import os
-import sys
-from utils.handler import load_config, parse_config
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 CONFIG_FILE = "config.json"
 CONFIG_PATH = os.path.join(PROJECT_ROOT, CONFIG_FILE)
-config_data = load_config(CONFIG_PATH)
-parsed_config = parse_config(config_data)
-LOCAL_POSTS_DIRECTORY = os.path.join(PROJECT_ROOT, parsed_config["posts_directory"])
-PUBLIC_DIR = os.path.join(PROJECT_ROOT, parsed_config["public_directory"])
-if PUBLIC_DIR == '':
-    PUBLIC_DIR = PROJECT_ROOT
-PUBLIC_POSTS_DIR = os.path.join(PROJECT_ROOT, parsed_config["public_posts_directory"])
-INDEX_TEMPLATE = parsed_config["index_template"]
-POST_TEMPLATE = parsed_config["post_template"]
-DEFAULT_TEMPLATE = parsed_config["default_template"]
-HASH_FILENAME = os.path.join(PROJECT_ROOT, parsed_config["hash_filename"])
-TEMPLATE_DIRECTORY = os.path.join(PROJECT_ROOT, parsed_config["template_directory"])
\ No newline at end of file
+
+# The settings derived from the configuration, see `get_settings`
+SETTINGS = (
+    "parsed_config",
+    "LOCAL_POSTS_DIRECTORY",
+    "PUBLIC_DIR",
+    "PUBLIC_POSTS_DIR",
+    "INDEX_TEMPLATE",
+    "POST_TEMPLATE",
+    "TAG_TEMPLATE",
+    "ARCHIVE_TEMPLATE",
+    "DEFAULT_TEMPLATE",
+    "PAGINATION",
+    "STATIC_DIRECTORY",
+    "ASSETS_DIRECTORY",
+    "TAGS_DIRECTORY",
+    "ARCHIVE_DIRECTORY",
+    "SEARCH_DIRECTORY",
+    "SEARCH_SHARD_SIZE",
+    "SITE_URL",
+    "SITEMAP_FILENAME",
+    "FEED_FILENAME",
+    "FEED_SIZE",
+    "MINIFY",
+    "PRECOMPRESS",
+    "PIPELINE",
+    "MANIFEST_FILENAME",
+    "TEMPLATE_DIRECTORY",
+    "CACHE_DIRECTORY",
+    "DAEMON_SOCKET",
+    "RENDER_CACHE_SIZE",
+    "MARKDOWN_BACKEND",
+    "MARKDOWN_EXTRAS",
+)
+
+
+def get_settings(parsed_config, root=PROJECT_ROOT):
+    """
+    Derive the settings of the site generator from a configuration.
+
+    Args:
+        parsed_config (dict): The configuration, as returned by `parse_config`.
+        root (str, optional): The directory relative paths of the configuration are resolved from. Default is PROJECT_ROOT.
+
+    Returns:
+        dict: Every setting of SETTINGS, by name.
+    """
+    return {
+        "parsed_config": parsed_config,
+        "LOCAL_POSTS_DIRECTORY": os.path.join(root, parsed_config["posts_directory"]),
+        "PUBLIC_DIR": os.path.join(root, parsed_config["public_directory"]) or root,
+        "PUBLIC_POSTS_DIR": os.path.join(root, parsed_config["public_posts_directory"]),
+        "INDEX_TEMPLATE": parsed_config["index_template"],
+        "POST_TEMPLATE": parsed_config["post_template"],
+        "TAG_TEMPLATE": parsed_config["tag_template"],
+        "ARCHIVE_TEMPLATE": parsed_config["archive_template"],
+        "DEFAULT_TEMPLATE": parsed_config["default_template"],
+        # "forward" numbers index pages from the newest post, "stable" from the oldest
+        "PAGINATION": parsed_config["pagination"],
+        "STATIC_DIRECTORY": os.path.join(root, parsed_config["static_directory"]),
+        # Fingerprinted copies of the static files are written under this directory of the public directory
+        "ASSETS_DIRECTORY": parsed_config["assets_directory"],
+        # Tag pages are generated under this directory of the public directory
+        "TAGS_DIRECTORY": parsed_config["tags_directory"],
+        # Year and month archive pages are generated under this directory of the public directory
+        "ARCHIVE_DIRECTORY": parsed_config["archive_directory"],
+        # The search index is generated under this directory of the public directory
+        "SEARCH_DIRECTORY": parsed_config["search_directory"],
+        "SEARCH_SHARD_SIZE": parsed_config["search_shard_size"],
+        # The sitemap and the Atom feed need absolute URLs; they are not generated without a site URL
+        "SITE_URL": parsed_config["site_url"],
+        "SITEMAP_FILENAME": parsed_config["sitemap_filename"],
+        "FEED_FILENAME": parsed_config["feed_filename"],
+        "FEED_SIZE": parsed_config["feed_size"],
+        # Minify HTML pages and stylesheets, and write a .gz sibling next to every text output
+        "MINIFY": parsed_config["minify"],
+        "PRECOMPRESS": parsed_config["precompress"],
+        # Generate changed posts through a streaming read, render and write pipeline
+        "PIPELINE": parsed_config["pipeline"],
+        "MANIFEST_FILENAME": os.path.join(root, parsed_config["manifest_filename"]),
+        "TEMPLATE_DIRECTORY": os.path.join(root, parsed_config["template_directory"]),
+        "CACHE_DIRECTORY": os.path.join(root, parsed_config["cache_directory"]),
+        # The build daemon listens on this Unix socket, see src/daemon.py and src/client.py
+        "DAEMON_SOCKET": os.path.join(root, parsed_config["daemon_socket"]),
+        "RENDER_CACHE_SIZE": parsed_config["render_cache_size"],
+        # The Markdown implementation, see src/utils/markdown_backends.py, and its options
+        # (markdown2 extras, Python-Markdown extensions, mistune plugins or markdown-it rules)
+        "MARKDOWN_BACKEND": parsed_config["markdown_backend"],
+        "MARKDOWN_EXTRAS": parsed_config["markdown_extras"],
+    }
+
+
+def configure(config=None, root=PROJECT_ROOT):
+    """
+    Load a configuration; its settings replace those of this module.
+
+    Args:
+        config (dict or str, optional): The configuration, as a dictionary holding every key of `config.json`, or the path of a configuration file. Default is CONFIG_PATH.
+        root (str, optional): The directory relative paths of the configuration are resolved from. Default is PROJECT_ROOT.
+
+    Returns:
+        dict: The settings, see `get_settings`.
+
+    Raises:
+        ValueError: If the configuration file cannot be loaded.
+        KeyError: If the configuration lacks a setting.
+    """
+    from src.utils.handler import load_config, parse_config
+
+    if config is None:
+        config = CONFIG_PATH
+    if isinstance(config, (str, os.PathLike)):
+        config = load_config(config)
+    settings = get_settings(parse_config(config), root)
+    globals().update(settings)
+    return settings
+
+
+def __getattr__(name):
+    # The first setting read loads the default configuration
+    if name in SETTINGS:
+        configure()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,262 @@
+import contextlib
+import io
+import logging
+import os
+import socket
+import socketserver
+import threading
+import time
+import src.config as config
+from client import encode_message, read_messages
+from generate_pages import make_site, resolve_jobs
+from serve import reload_config
+from src.utils.manifest import get_file_signature
+
+logger = logging.getLogger(__name__)
+
+# The `make_site` arguments a build request may override
+BUILD_OPTIONS = (
+    "local_posts_directory",
+    "public_dir",
+    "public_posts_dir",
+    "posts_per_page",
+    "force_rebuild",
+    "jobs",
+    "minify",
+    "precompress",
+    "pipeline",
+)
+LOG_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+
+
+class ForwardingHandler(logging.Handler):
+    """A logging handler that sends every record to the client of a build request."""
+
+    def __init__(self, send):
+        """
+        Args:
+            send (callable): Sends a message to the client.
+        """
+        super().__init__()
+        self.send = send
+        self.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    def emit(self, record):
+        try:
+            self.send({"type": "log", "level": record.levelname, "message": self.format(record)})
+        except Exception:
+            self.handleError(record)
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    """Handle one request: a line of JSON in, log messages and a result out."""
+
+    def handle(self):
+        self.lock = threading.Lock()
+        self.connected = True
+        try:
+            request = next(read_messages(self.rfile), None)
+        except ValueError as e:
+            self.send({"type": "result", "ok": False, "error": f"Invalid request: {e}"})
+            return
+        if not isinstance(request, dict):
+            self.send({"type": "result", "ok": False, "error": "Invalid request."})
+            return
+        command = request.get("command", "build")
+        if command == "build":
+            result = self.server.build(
+                request.get("options", {}), request.get("verbose"), self.send
+            )
+            self.send(result)
+        elif command == "status":
+            self.send({"type": "result", "ok": True, "status": self.server.get_status()})
+        elif command == "stop":
+            self.send({"type": "result", "ok": True})
+            # shutdown() waits for serve_forever(), which is waiting for this request
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        else:
+            self.send({"type": "result", "ok": False, "error": f"Unknown command '{command}'."})
+
+    def send(self, message):
+        """
+        Send a message to the client; a client that went away is ignored, so the build still finishes.
+
+        Args:
+            message (dict): The message.
+        """
+        with self.lock:
+            if not self.connected:
+                return
+            try:
+                self.wfile.write(encode_message(message))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                self.connected = False
+
+
+class BuildDaemon(socketserver.UnixStreamServer):
+    """
+    A long-lived build server that keeps the site generator warm between builds.
+
+    The interpreter, its imports and the Jinja environment with its
+    compiled templates stay loaded; the post metadata and the build
+    manifest stay in memory and are reused while their files are
+    unchanged. Rendered HTML is not kept: every build reads it from the
+    on-disk render cache. Requests are handled one at a time, so builds
+    never overlap.
+    """
+
+    def __init__(self, socket_path, build_defaults=None):
+        """
+        Args:
+            socket_path (str): The path of the Unix socket to listen on.
+            build_defaults (dict, optional): The `make_site` arguments of builds, before the overrides of each request.
+        """
+        self.socket_path = socket_path
+        self.build_defaults = dict(build_defaults or {})
+        self.post_cache = {}
+        self.manifest_cache = {}
+        self.config_signature = self.get_config_signature()
+        self.started = time.time()
+        self.builds = 0
+        self.last_build = None
+        prepare_socket_path(socket_path)
+        super().__init__(socket_path, BuildRequestHandler)
+
+    def get_config_signature(self):
+        """
+        Get the stat signature of the configuration file, or None if it is missing.
+        """
+        try:
+            return get_file_signature(config.CONFIG_PATH)
+        except FileNotFoundError:
+            return None
+
+    def get_status(self):
+        """
+        Describe the daemon and the state it keeps.
+        """
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "uptime": round(time.time() - self.started, 3),
+            "builds": self.builds,
+            "cached_posts": len(self.post_cache),
+            "last_build": self.last_build,
+        }
+
+    def build(self, options, verbose=False, send=None):
+        """
+        Build the site with the warm state, forwarding the logs to the client.
+
+        Args:
+            options (dict): The `make_site` arguments to override, see BUILD_OPTIONS.
+            verbose (bool, optional): Forward logs at INFO level instead of only errors. Default is False.
+            send (callable, optional): Sends log and output messages to the client.
+
+        Returns:
+            dict: The result message.
+        """
+        unknown = set(options) - set(BUILD_OPTIONS)
+        if unknown:
+            return {
+                "type": "result",
+                "ok": False,
+                "error": f"Unknown build options: {', '.join(sorted(unknown))}.",
+            }
+        # An edited configuration invalidates everything built from it
+        config_signature = self.get_config_signature()
+        if config_signature != self.config_signature:
+            logger.info("The configuration changed, reloading it")
+            reload_config()
+            self.post_cache.clear()
+            self.manifest_cache.clear()
+            self.config_signature = config_signature
+
+        arguments = dict(self.build_defaults, **options)
+        if "jobs" in arguments:
+            arguments["jobs"] = resolve_jobs(arguments["jobs"])
+        root_logger = logging.getLogger()
+        level = root_logger.level
+        handler = None
+        if send is not None:
+            handler = ForwardingHandler(send)
+            handler.setLevel(logging.INFO if verbose else logging.WARNING)
+            root_logger.addHandler(handler)
+        if verbose:
+            root_logger.setLevel(logging.INFO)
+        output = io.StringIO()
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                stats = make_site(
+                    post_cache=self.post_cache,
+                    manifest_cache=self.manifest_cache,
+                    **arguments,
+                )
+        except Exception as e:
+            logger.error(f"An exception occurred while generating the site: {e}")
+            # The in-memory state may be half updated
+            self.post_cache.clear()
+            self.manifest_cache.clear()
+            return {"type": "result", "ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            root_logger.setLevel(level)
+            if handler is not None:
+                root_logger.removeHandler(handler)
+            if send is not None and output.getvalue():
+                send({"type": "output", "text": output.getvalue()})
+        seconds = time.perf_counter() - start
+        self.builds += 1
+        self.last_build = {"stats": stats, "seconds": round(seconds, 6), "finished": time.time()}
+        return {"type": "result", "ok": True, "stats": stats, "seconds": round(seconds, 6)}
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def prepare_socket_path(socket_path):
+    """
+    Make way for a daemon's socket: create its directory and remove a socket left by a daemon that died.
+
+    Args:
+        socket_path (str): The path of the Unix socket.
+
+    Raises:
+        RuntimeError: If a daemon is already listening on the socket.
+    """
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f"Error: A build daemon is already listening on {socket_path}.")
+
+
+def run_daemon(socket_path=None, **build_defaults):
+    """
+    Run a build daemon until it is stopped, building the site once first so its state is warm.
+
+    Args:
+        socket_path (str, optional): The path of the Unix socket to listen on. Default is `daemon_socket` from the configuration.
+        **build_defaults: The `make_site` arguments of builds, before the overrides of each request.
+    """
+    server = BuildDaemon(socket_path or config.DAEMON_SOCKET, build_defaults)
+    result = server.build({})
+    if not result["ok"]:
+        logger.error(f"The first build failed: {result['error']}")
+    print(f"Build daemon listening on {server.socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -2,7 +2,8 @@ class PostNotFoundError(Exception):
     """Raised when the post cannot be found."""
 
     def __init__(self, post_path):
-        self.message = f"Post '{posts_directory}' not found."
+        self.message = f"Post '{post_path}' not found."
+        super().__init__(self.message)
 
 
 class PostDirectoryNotFoundError(Exception):
@@ -11,6 +12,17 @@ class PostDirectoryNotFoundError(Exception):
     def __init__(self, posts_directory):
         self.message = f"Post directory '{posts_directory}' not found."
 
+class PostProcessingError(Exception):
+    """Raised when one or more posts fail to process or render."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        self.message = f"{len(errors)} post(s) failed: " + "; ".join(
+            f"{post}: {error}" for post, error in errors.items()
+        )
+        super().__init__(self.message)
+
+
 class BlogDirectoryNotFoundError(Exception):
     """Raised when the blog directory cannot be found."""
 
@@ -21,7 +33,7 @@ class BlogTemplateError(Exception):
     """General template error."""
 
     def __init__(self, *args, **kwargs):
-        self.message = "Error loading blog template."
+        self.message = args[0] if args else "Error loading blog template."
         self.exception = kwargs.get("exception")
         self.post_template = kwargs.get("post_template")
         self.template_directory = kwargs.get("template_directory")
@@ -31,3 +43,5 @@ class BlogTemplateError(Exception):
 
         if self.template_directory:
             self.message += f" Template Directory: {self.template_directory}"
+
+        super().__init__(self.message)
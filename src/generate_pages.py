@@ -1,140 +1,322 @@
+import contextlib
 import datetime
+import json
 import logging
 import os
-import re
-import shutil
-import markdown2
-import sys
-import webbrowser
-from exceptions import (
+from functools import lru_cache, partial
+from src.exceptions import (
     PostDirectoryNotFoundError,
     PostNotFoundError,
+    PostProcessingError,
     BlogDirectoryNotFoundError,
     BlogTemplateError,
 )
-from src.config import (
-    PROJECT_ROOT,
-    LOCAL_POSTS_DIRECTORY,
-    PUBLIC_DIR,
-    PUBLIC_POSTS_DIR,
-    INDEX_TEMPLATE,
-    POST_TEMPLATE,
-    HASH_FILENAME,
-    TEMPLATE_DIRECTORY,
-    parsed_config,
+import src.config as config
+from src.config import configure
+from src.utils.archive import (
+    PostOrder,
+    generate_archive_pages,
+    get_archive_output_filename,
+    get_archive_page_hash,
+    get_archive_pages,
+    parse_post_date,
 )
 from src.utils.handler import (
-    calculate_hash,
+    calculate_content_hash,
+    calculate_file_hash,
     create_directory,
-    extract_metadata,
-    extract_post_content,
+    get_all_paths,
+    read_front_matter,
     get_template,
-    load_old_hash,
     sanitize_title,
-    save_new_hash,
+)
+from src.utils.assets import (
+    get_asset_map,
+    get_asset_paths,
+    get_asset_url,
+    publish_assets,
+    rewrite_asset_urls,
+)
+from src.utils.catalog import Post, PostCatalog
+from src.utils.render_cache import RenderCache
+from src.utils.search import get_search_index, score_terms
+from src.utils.postprocess import (
+    compress_outputs,
+    get_compressed_path,
+    is_compressible,
+    minify_html,
+    remove_compressed,
+)
+from src.utils.pages import (
+    count_pages,
+    generate_index_page,
+    get_front_page_rows,
+    get_index_filename,
+    get_jinja_cache_directory,
+    get_listing,
+    get_navigation_links,
+    write_page,
+)
+from src.utils.profiler import profile_phase, profile_span
+from src.utils.tags import (
+    generate_tag_pages,
+    get_tag_index,
+    get_tag_listing_hash,
+    get_tag_output_dir,
+)
+from src.utils.shards import (
+    find_shard_manifests,
+    get_post_shard,
+    get_shard_manifest_path,
+    merge_shard_manifests,
+)
+from src.utils.writer import PageWriter, write_output
+from src.utils.markdown_backends import load_markdown_backend
+from src.utils.manifest import (
+    get_build_fingerprint,
+    get_file_signature,
+    get_outputs,
+    get_stale_outputs,
+    is_entry_stale,
+    load_cached_manifest,
+    load_manifest,
+    new_manifest,
+    relative_path,
+    save_manifest,
+    scan_files,
 )
 
 # Set up logging
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+# Posts with more rendered content than this are streamed to the writer
+LARGE_PAGE_SIZE = 256 * 1024
+
 
-def write_page(output_filename, output_html):
+@lru_cache(maxsize=None)
+def get_markdown_renderer():
+    """
+    Load the configured Markdown backend, once per process.
     """
-    Write the output HTML to a file.
+    return load_markdown_backend(config.MARKDOWN_BACKEND, config.MARKDOWN_EXTRAS)
+
+
+def render_markdown(content):
+    """
+    Render Markdown to HTML with the configured backend and options.
 
     Args:
-        output_filename (str): The filename of the output file.
-        output_html (str): The HTML to write to the output file.
+        content (str): The Markdown to render.
     """
-    output_dir = os.path.dirname(output_filename)
-    output_target = os.path.join(PROJECT_ROOT, output_dir)
-    logger.info(f"Writing {output_filename} on {output_dir}")
-    create_directory(output_target)
-    with open(output_filename, "w") as output_file:
-        output_file.write(output_html)
+    return get_markdown_renderer().render(content)
 
 
-def process_post(file_path):
+def get_render_cache(cache_directory=None, max_size=None):
     """
-    Process a single post file and return a dictionary containing the post's metadata and content.
+    Get the render cache for the configured Markdown renderer.
+
+    Args:
+        cache_directory (str, optional): The build cache directory. Default is `cache_directory` from the configuration.
+        max_size (int, optional): The maximum size of the cache in bytes. Default is `render_cache_size` from the configuration.
+    """
+    if cache_directory is None:
+        cache_directory = config.CACHE_DIRECTORY
+    if max_size is None:
+        max_size = config.RENDER_CACHE_SIZE
+    backend = get_markdown_renderer()
+    return RenderCache(
+        os.path.join(cache_directory, "markdown"),
+        max_size,
+        version=f"{backend.name}-{backend.version}",
+        options=backend.options,
+    )
+
+
+def scan_post(file_path, render_cache=None, post_id=None):
+    """
+    Read a post's front matter only and return a Post whose content is loaded on demand.
 
     Args:
         file_path (str): The path to the post file.
+        render_cache (RenderCache, optional): The cache of rendered Markdown. If not provided, the post is always rendered.
+        post_id (str, optional): The hash of the post file, if already known. If not provided, the file is hashed.
     """
     if not os.path.exists(file_path):
         raise PostNotFoundError(file_path)
-    with open(file_path) as post_file:
-        post_content = post_file.read()
-        post_filename = os.path.basename(file_path).split(".")[0]
-        post_metadata = extract_metadata(post_content)
-        if post_metadata:
-            post_title = post_metadata.get("title", "Untitled")
-            post_type = post_metadata.get("type", "post")
-            post_tags = post_metadata.get("tags", [])
-            post_synopsis = post_metadata.get("synopsis", None)
-        else:
-            post_title = post_filename  # default to filename if no title is found
-            post_type = None  # default to None if no type is found
-            post_synopsis = ""
-            post_tags = []
-        # Extract post content; if content has metadata, remove it
-        post_content = extract_post_content(post_content)
-        post_content_html = markdown2.markdown(post_content)
-        last_updated_timestamp = os.path.getmtime(file_path)
-        # Convert timestamp to human-readable format
-        last_updated = datetime.datetime.fromtimestamp(last_updated_timestamp).strftime(
-            "%Y-%m-%d %H:%M:%S"
+    post_filename = os.path.basename(file_path).split(".")[0]
+    post_metadata, body_offset = read_front_matter(file_path)
+    if post_metadata:
+        post_title = post_metadata.get("title", "Untitled")
+        post_type = post_metadata.get("type", "post")
+        post_tags = post_metadata.get("tags", [])
+        post_synopsis = post_metadata.get("synopsis", None)
+    else:
+        post_title = post_filename  # default to filename if no title is found
+        post_type = None  # default to None if no type is found
+        post_synopsis = ""
+        post_tags = []
+    # Get post ID from the hash of the whole source
+    if post_id is None:
+        post_id = calculate_file_hash(file_path)
+    last_updated_timestamp = os.path.getmtime(file_path)
+    # Convert timestamp to human-readable format
+    last_updated = datetime.datetime.fromtimestamp(last_updated_timestamp).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+    # Posts are ordered by their `date`, or by when they were last modified
+    post_date = parse_post_date(post_metadata and post_metadata.get("date"), last_updated)
+    sanitized_title = sanitize_title(post_title)
+    logger.info(f"Sanitized title: {sanitized_title}")
+
+    # Post relative path
+    if post_type == "post":
+        # Get the relative path from public_posts_dir to the post file
+        post_rel_path = os.path.relpath(
+            os.path.join(config.PUBLIC_POSTS_DIR, f"{sanitized_title}.html"),
+            config.PUBLIC_DIR,
+        )
+        logger.info(f"Post path: {post_rel_path}")
+    else:
+        # If post is uncategorized, generate it in the public directory
+        # Get the relative path from public_dir to the post file
+        post_rel_path = os.path.relpath(
+            os.path.join(config.PUBLIC_DIR, f"{sanitized_title}.html"),
+            config.PUBLIC_DIR
         )
-        # Get post ID from hash; might use for later
-        post_id = calculate_hash(post_content)
-        sanitized_title = sanitize_title(post_title)
-        logger.info(f"Sanitized title: {sanitized_title}")
-
-        post = {
-            "id": post_id,
-            "type": post_type,
-            "tags": post_tags,
-            "title": post_title,
-            "sanitized_title": sanitized_title,
-            "synopsis": post_synopsis,
-            "last_updated": last_updated,
-            "content": post_content_html,
-        }
 
-        # Post relative path
-        if post["type"] == "post":
-            # Get the relative path from public_posts_dir to the post file
-            post_rel_path = os.path.relpath(
-                os.path.join(PUBLIC_POSTS_DIR, f'{post["sanitized_title"]}.html'),
-                PUBLIC_DIR,
-            )
-            post["rel_path"] = post_rel_path
-            logger.info(f"Post path: {post_rel_path}")
-        else:
-            # If post is uncategorized, generate it in the public directory
-            # Get the relative path from public_dir to the post file
-            post_rel_path = os.path.relpath(
-                os.path.join(PUBLIC_DIR, f'{post["sanitized_title"]}.html'), 
-                PUBLIC_DIR
-            )
-            post["rel_path"] = post_rel_path
+    return Post(
+        id=post_id,
+        type=post_type,
+        tags=tuple(post_tags),
+        title=post_title,
+        sanitized_title=sanitized_title,
+        synopsis=post_synopsis,
+        last_updated=last_updated,
+        date=post_date,
+        rel_path=post_rel_path,
+        source_path=file_path,
+        body_offset=body_offset,
+        renderer=render_markdown,
+        render_cache=render_cache,
+    )
+
 
-        return post
+def process_post(file_path, render_cache=None):
+    """
+    Process a single post file and return a Post with its content already rendered.
+
+    Args:
+        file_path (str): The path to the post file.
+        render_cache (RenderCache, optional): The cache of rendered Markdown. If not provided, the post is always rendered.
+    """
+    post = scan_post(file_path, render_cache)
+    post.content
+    return post
 
 
-def load_posts(posts_directory=LOCAL_POSTS_DIRECTORY, file_extensions=[".md"]):
+def resolve_jobs(jobs):
     """
-    Load all posts from the posts directory and return a list of processed posts (which are dictionaries).
+    Resolve the number of worker processes to use.
 
     Args:
-        posts_directory (str, optional): The directory where the blog posts are stored. If not provided, the function will try to load it from a configuration file.
+        jobs (int or None): The requested number of jobs. 0 or None means one per CPU core.
+    """
+    if not jobs:
+        return os.cpu_count() or 1
+    return max(1, jobs)
+
+
+def _run_post_job(func, *args):
     """
+    Run a per-post job, in a worker process or on a thread, and capture its error instead of raising it.
+
+    Custom exceptions do not always survive pickling back to the parent
+    process, so errors are returned as messages.
+    """
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {getattr(e, 'message', e)}"
+
+
+def get_process_pool(jobs, mp_context=None):
+    """
+    Start a pool of worker processes that build with the configuration of this process.
+
+    Workers started with spawn or forkserver import the generator afresh
+    and would otherwise load the default `config.json`, so the settings
+    are passed in when each worker starts.
+
+    Args:
+        jobs (int): The number of worker processes.
+        mp_context (optional): The multiprocessing context the workers are started with. Default is the platform default.
+
+    Returns:
+        ProcessPoolExecutor: The pool.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=mp_context,
+        initializer=configure,
+        initargs=(dict(config.parsed_config),),
+    )
+
+
+def run_post_jobs(func, items, jobs, labels=None, mp_context=None, executor=None):
+    """
+    Run `func` over `items` in a process pool, keeping the results in input order.
+
+    Args:
+        func (callable): A module-level function taking one item.
+        items (list): The items to process.
+        jobs (int): The number of worker processes.
+        labels (list, optional): The names errors are reported under, one per item. Default is the items themselves.
+        mp_context (optional): The multiprocessing context the workers are started with, see `get_process_pool`.
+        executor (ProcessPoolExecutor, optional): A pool of `jobs` workers to run on, left open. Default is a new pool.
+
+    Returns:
+        list: The results, in the same order as `items`.
+
+    Raises:
+        PostProcessingError: If any item failed; every failure is reported.
+    """
+    chunksize = max(1, len(items) // (jobs * 4))
+    if executor is None:
+        pool = get_process_pool(jobs, mp_context)
+    else:
+        pool = contextlib.nullcontext(executor)
+    with pool as executor:
+        outcomes = list(
+            executor.map(partial(_run_post_job, func), items, chunksize=chunksize)
+        )
+
+    errors = {}
+    for label, (_, error) in zip(labels or items, outcomes):
+        if error is not None:
+            logger.error(f"Error while processing {label}: {error}")
+            errors[str(label)] = error
+    if errors:
+        raise PostProcessingError(errors)
+    return [result for result, _ in outcomes]
+
+
+def get_post_paths(posts_directory=None, file_extensions=[".md"]):
+    """
+    List the post files in the posts directory.
+
+    Args:
+        posts_directory (str, optional): The directory where the blog posts are stored.
+        file_extensions (list, optional): The extensions of post files. Default is `[".md"]`.
+    """
+    if posts_directory is None:
+        posts_directory = config.LOCAL_POSTS_DIRECTORY
     if not os.path.exists(posts_directory):
         raise PostDirectoryNotFoundError(posts_directory)
-    logger.info(f"Loading posts from {posts_directory}")
     logger.info(f"Using file extensions {file_extensions}")
-    processed_posts = []
+    post_paths = []
 
     try:
         for filename in os.listdir(posts_directory):
@@ -143,204 +325,1220 @@ def load_posts(posts_directory=LOCAL_POSTS_DIRECTORY, file_extensions=[".md"]):
                 if not filename.endswith(ext):
                     continue
                 logger.info(f"Processing {filename}")
-                post = process_post(os.path.join(posts_directory, filename))
-                if post:
-                    logger.info(f'Adding {post["id"]} to posts')
-                    processed_posts.append(post)
+                post_paths.append(os.path.join(posts_directory, filename))
     except FileNotFoundError:
         raise PostNotFoundError(posts_directory)
 
-    processed_posts.sort(key=lambda post: post["id"])
+    return post_paths
 
-    return processed_posts
 
+def _scan_post_job(job):
+    """
+    Scan a single post in a worker process.
 
-def generate_post(post, output_dir=None):
+    Args:
+        job (tuple): The arguments of `scan_post`.
+    """
+    return scan_post(*job)
+
+
+def load_posts(
+    posts_directory=None,
+    file_extensions=[".md"],
+    jobs=1,
+    render_cache=None,
+    post_cache=None,
+    file_hashes=None,
+    post_order=None,
+):
+    """
+    Load all posts from the posts directory and return them as a PostCatalog, newest first.
+
+    Only the front matter of each post is read here; a post's body is read
+    and rendered when its `content` is first used. Posts are ordered by
+    `date`; with a persisted `post_order`, only the posts added, removed or
+    redated since it was saved are moved in it, instead of every post being
+    sorted again.
+
+    Args:
+        posts_directory (str, optional): The directory where the blog posts are stored. If not provided, the function will try to load it from a configuration file.
+        jobs (int, optional): The number of worker processes used to scan posts. Default is 1 (no pool).
+        render_cache (RenderCache, optional): The cache of rendered Markdown.
+        post_cache (dict, optional): Posts kept in memory between builds, by path. Posts whose file is unchanged are reused instead of processed again; the cache is updated in place.
+        file_hashes (dict, optional): Known hashes of the post files, by path, used as post IDs. Files without a known hash are hashed.
+        post_order (PostOrder, optional): The order of the previous build; it is updated in place. If not provided, the posts are sorted.
+    """
+    if posts_directory is None:
+        posts_directory = config.LOCAL_POSTS_DIRECTORY
+    logger.info(f"Loading posts from {posts_directory}")
+    post_paths = get_post_paths(posts_directory, file_extensions)
+
+    signatures = {}
+    stale_paths = post_paths
+    if post_cache is not None:
+        signatures = {post_path: get_file_signature(post_path) for post_path in post_paths}
+        stale_paths = [
+            post_path
+            for post_path in post_paths
+            if post_cache.get(post_path, (None, None))[0] != signatures[post_path]
+        ]
+
+    file_hashes = file_hashes or {}
+    if jobs > 1 and len(stale_paths) > 1:
+        stale_posts = run_post_jobs(
+            _scan_post_job,
+            [(post_path, render_cache, file_hashes.get(post_path)) for post_path in stale_paths],
+            jobs,
+            labels=stale_paths,
+        )
+    else:
+        stale_posts = []
+        for post_path in stale_paths:
+            with profile_span("scan", post_path):
+                stale_posts.append(
+                    scan_post(post_path, render_cache, file_hashes.get(post_path))
+                )
+
+    if post_cache is None:
+        posts = stale_posts
+    else:
+        for post_path, post in zip(stale_paths, stale_posts):
+            post_cache[post_path] = (signatures[post_path], post)
+        for post_path in post_cache.keys() - set(post_paths):
+            del post_cache[post_path]
+        posts = [post_cache[post_path][1] for post_path in post_paths]
+
+    processed_posts = []
+    for post in posts:
+        if post:
+            logger.info(f"Adding {post.id} to posts")
+            processed_posts.append(post)
+
+    if post_order is None:
+        processed_posts.sort(key=lambda post: (post.date, post.source_path), reverse=True)
+    else:
+        posts_by_source = {relative_path(post.source_path): post for post in processed_posts}
+        post_order.update({source: post.date for source, post in posts_by_source.items()})
+        processed_posts = [posts_by_source[source] for source in post_order.newest_first()]
+
+    return PostCatalog(processed_posts, render_markdown, render_cache)
+
+
+def get_post_context(post, asset_map=None, content=None):
+    """
+    Get the template context of a post's page.
+
+    Args:
+        post (Post): The post.
+        asset_map (dict, optional): The fingerprinted URL of every asset; asset URLs in the post are rewritten to them.
+        content (str, optional): The rendered HTML of the post. Default is `post.content`.
+    """
+    return {
+        "config": config.parsed_config,
+        "post": post,
+        "content": rewrite_asset_urls(post.content if content is None else content, asset_map),
+        "asset_url": partial(get_asset_url, asset_map),
+        "navigation_links": None,
+    }
+
+
+def generate_post(post, output_dir=None, writer=None, asset_map=None, cache_directory=None):
     """
     Generate a single post and write it to `{post['title']}.html`.
 
     Args:
-        post (dict): The post to generate.
+        post (Post): The post to generate.
         output_dir (str, optional): The directory where the output should be stored. Default is `public_dir/public_posts_dir`.
+        writer (PageWriter, optional): The writer the page is queued on. If not provided, the page is written directly.
+        asset_map (dict, optional): The fingerprinted URL of every asset; asset URLs in the post are rewritten to them.
+        cache_directory (str, optional): The build cache directory, where compiled templates are kept. Default is `cache_directory` from the configuration.
     """
     try:
-        template = get_template(POST_TEMPLATE, TEMPLATE_DIRECTORY)
-    except PostTemplateError as e:
+        template = get_template(
+            config.POST_TEMPLATE,
+            config.TEMPLATE_DIRECTORY,
+            get_jinja_cache_directory(cache_directory),
+        )
+    except BlogTemplateError as e:
         print(f"Error while generating post: {e}")
+    from jinja2.exceptions import TemplateError
+
+    context = get_post_context(post, asset_map)
     try:
-        output_html = template.render(
-            config=parsed_config,
-            post=post,
-            navigation_links=None,
-        )
+        if writer is not None and len(post.content) >= LARGE_PAGE_SIZE:
+            # Stream large pages to the writer instead of building one giant string
+            output_html = template.generate(**context)
+        else:
+            with profile_span("template", post.source_path, template=config.POST_TEMPLATE):
+                output_html = template.render(**context)
     except TemplateError as e:
         raise BlogTemplateError(f"Error while generating post: {e}")
 
-    output_filename = os.path.join(output_dir, f'{post["sanitized_title"]}.html')
-    write_page(output_filename, output_html)
+    output_filename = os.path.join(output_dir, f"{post.sanitized_title}.html")
+    if writer is not None:
+        writer.write(output_filename, output_html)
+    else:
+        write_page(output_filename, output_html)
+    return output_filename
+
+
+def get_post_output_dir(post, public_dir=None, public_posts_dir=None):
+    """
+    Get the directory a post is written to.
+
+    Args:
+        post (Post): The post.
+        public_dir (str, optional): The directory where the uncategorized posts should be stored. Default is `public_dir`.
+        public_posts_dir (str, optional): The directory where the individual posts should be stored. Default is `public_dir/public_posts_dir`.
+    """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    if public_posts_dir is None:
+        public_posts_dir = config.PUBLIC_POSTS_DIR
+    # Defaults to public_dir/public_posts_dir
+    return public_posts_dir if post.type == "post" else public_dir
+
 
+def _generate_post_job(job):
+    """
+    Generate a single post in a worker process.
+
+    Args:
+        job (tuple): The post, its output directory, the asset map, whether to minify the page and the build cache directory.
 
-def generate_index_page(posts, output_dir=PUBLIC_DIR, navigation_links=None):
+    Returns:
+        tuple: The filenames of the pages written and of those left unchanged.
     """
-    Generate an index page for a blog.
+    post, output_dir, asset_map, minify, cache_directory = job
+    writer = PageWriter(workers=0, minify=minify)
+    generate_post(post, output_dir, writer, asset_map, cache_directory)
+    writer.close()
+    return writer.written, writer.unchanged
+
+
+def render_post_page(post, body, asset_map=None, minify=False, cache_directory=None):
+    """
+    Render the page of a post from its Markdown body.
 
     Args:
-        posts (list of dict): The list of blog posts to include in the index page.
-        output_dir (str): The directory where the output should be stored.
-        navigation_links (dict, optional): Navigation links for the index page.
+        post (Post): The post.
+        body (str): The Markdown body of the post, as returned by `Post.read_body`.
+        asset_map (dict, optional): The fingerprinted URL of every asset.
+        minify (bool, optional): Minify the page. Default is False.
+        cache_directory (str, optional): The build cache directory, where compiled templates are kept. Default is `cache_directory` from the configuration.
+
+    Returns:
+        str: The page.
     """
+    with profile_span("markdown", post.source_path):
+        content = post.render_body(body)
+    template = get_template(
+        config.POST_TEMPLATE,
+        config.TEMPLATE_DIRECTORY,
+        get_jinja_cache_directory(cache_directory),
+    )
+    from jinja2.exceptions import TemplateError
+
     try:
-        template = get_template(INDEX_TEMPLATE, TEMPLATE_DIRECTORY)
-    except BlogTemplateError as e:
-        print(f"Error while generating index page: {e}")
-    if navigation_links:
-        index = navigation_links["index"]
-    output_html = template.render(
-        config=parsed_config,
-        posts=posts,
-        navigation_links=navigation_links,
+        with profile_span("template", post.source_path, template=config.POST_TEMPLATE):
+            output_html = template.render(**get_post_context(post, asset_map, content))
+    except TemplateError as e:
+        raise BlogTemplateError(f"Error while generating post: {e}")
+    if minify:
+        with profile_span("minify", post.source_path):
+            output_html = minify_html(output_html)
+    return output_html
+
+
+def _read_post_job(job):
+    """
+    Read the body of a post, on a pipeline I/O thread.
+
+    A post that cannot be read is reported like one that fails to render,
+    instead of stopping the pipeline.
+
+    Args:
+        job (tuple): The post, its output filename, the asset map, whether to minify the page and the build cache directory.
+
+    Returns:
+        tuple: The Markdown body and the error message; either is None.
+    """
+    return _run_post_job(job[0].read_body)
+
+
+def _render_post_job(job, body):
+    """
+    Render the page of a post, on the pipeline render executor.
+
+    Args:
+        job (tuple): The post, its output filename, the asset map, whether to minify the page and the build cache directory.
+        body (tuple): The Markdown body of the post and the error message, as returned by `_read_post_job`.
+
+    Returns:
+        tuple: The output filename, the page and the error message; either of the last two is None.
+    """
+    post, output_filename, asset_map, minify, cache_directory = job
+    body, error = body
+    if error is not None:
+        return output_filename, None, error
+    output_html, error = _run_post_job(
+        render_post_page, post, body, asset_map, minify, cache_directory
     )
-    filename = "index.html" if index == 1 else f"{index}.html"
-    output_filename = os.path.join(output_dir, filename)
-    write_page(output_filename, output_html)
+    return output_filename, output_html, error
 
 
-def generate_all_posts(posts, public_dir=PUBLIC_DIR, public_posts_dir=PUBLIC_POSTS_DIR):
+def _write_post_job(output):
+    """
+    Write the page of a post, on a pipeline I/O thread.
+
+    Args:
+        output (tuple): The page, as returned by `_render_post_job`.
+
+    Returns:
+        tuple: The output filename, whether it was written and the error message; a page that failed to be read or rendered is not written.
+    """
+    output_filename, output_html, error = output
+    if error is not None:
+        return output_filename, False, error
+    with profile_span("write", output_filename):
+        was_written, error = _run_post_job(write_output, output_filename, output_html)
+    return output_filename, bool(was_written), error
+
+
+def generate_posts_pipeline(
+    posts,
+    public_dir=None,
+    public_posts_dir=None,
+    jobs=1,
+    asset_map=None,
+    minify=False,
+    cache_directory=None,
+    executor=None,
+):
+    """
+    Generate posts through a streaming read, render and write pipeline.
+
+    Post bodies are read and pages written on threads while other posts
+    are rendered, on `jobs` worker processes or on one thread. Bounded
+    queues between the stages keep only a few posts in memory at a time,
+    however many are generated; see `run_pipeline`.
+
+    Args:
+        posts (iterable of Post): The posts to generate.
+        public_dir (str, optional): The directory where the uncategorized posts should be stored. Default is `public_dir`.
+        public_posts_dir (str, optional): The directory where the individual posts should be stored. Default is `public_dir/public_posts_dir`.
+        jobs (int, optional): The number of worker processes used to render posts; 1 renders on a thread. Default is 1.
+        asset_map (dict, optional): The fingerprinted URL of every asset.
+        minify (bool, optional): Minify the pages. Default is False.
+        cache_directory (str, optional): The build cache directory, where compiled templates are kept. Default is `cache_directory` from the configuration.
+        executor (ProcessPoolExecutor, optional): A pool of `jobs` workers to render on, left open. Default is a new pool, or a thread for one job.
+
+    Returns:
+        tuple: The filenames of the pages written and of those left unchanged.
+
+    Raises:
+        PostProcessingError: If any post failed to render; every failure is reported.
+    """
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from src.utils.pipeline import run_pipeline
+
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    if public_posts_dir is None:
+        public_posts_dir = config.PUBLIC_POSTS_DIR
+    for directory in {public_dir, public_posts_dir}:
+        create_directory(directory)
+    post_jobs = (
+        (
+            post,
+            os.path.join(
+                get_post_output_dir(post, public_dir, public_posts_dir),
+                f"{post.sanitized_title}.html",
+            ),
+            asset_map,
+            minify,
+            cache_directory,
+        )
+        for post in posts
+    )
+    if executor is not None:
+        pool = contextlib.nullcontext(executor)
+    elif jobs > 1:
+        pool = executor = get_process_pool(jobs)
+    else:
+        pool = executor = ThreadPoolExecutor(max_workers=1)
+    with pool:
+        results = asyncio.run(
+            run_pipeline(
+                post_jobs,
+                _read_post_job,
+                _render_post_job,
+                _write_post_job,
+                render_executor=executor,
+                render_tasks=jobs,
+            )
+        )
+
+    written, unchanged, errors = [], [], {}
+    for output_filename, was_written, error in results:
+        if error is not None:
+            logger.error(f"Error while processing {output_filename}: {error}")
+            errors[output_filename] = error
+        elif was_written:
+            written.append(output_filename)
+        else:
+            unchanged.append(output_filename)
+    if errors:
+        raise PostProcessingError(errors)
+    return written, unchanged
+
+
+def generate_all_posts(
+    posts,
+    public_dir=None,
+    public_posts_dir=None,
+    jobs=1,
+    writer=None,
+    asset_map=None,
+    pipeline=False,
+    cache_directory=None,
+    executor=None,
+):
     """
     Generate HTML for all posts in posts directory.
 
     Args:
-        posts (list of dict, optional): The list of blog posts to generate pages for. If not provided, the function will load the posts from the `posts_directory`.
+        posts (PostCatalog or list of Post, optional): The list of blog posts to generate pages for. If not provided, the function will load the posts from the `posts_directory`.
         public_dir (str, optional): The directory where the uncategorized posts should be stored. Default is `public_dir`.
         public_posts_dir (str, optional): The directory where the individual posts should be stored. Default is `public_dir/public_posts_dir`.
+        jobs (int, optional): The number of worker processes used to render posts. Default is 1 (no pool).
+        writer (PageWriter, optional): The writer pages are queued on. Worker processes write their pages themselves and report them to it.
+        asset_map (dict, optional): The fingerprinted URL of every asset.
+        pipeline (bool, optional): Generate the posts through `generate_posts_pipeline`; pages are then written by the pipeline and reported to `writer`. Default is False.
+        cache_directory (str, optional): The build cache directory, where compiled templates are kept. Default is `cache_directory` from the configuration.
+        executor (ProcessPoolExecutor, optional): A pool of `jobs` workers to render on, left open. Default is a new pool when `jobs` is above 1.
     """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    if public_posts_dir is None:
+        public_posts_dir = config.PUBLIC_POSTS_DIR
     if posts is not None:
+        if pipeline:
+            written, unchanged = generate_posts_pipeline(
+                posts,
+                public_dir,
+                public_posts_dir,
+                jobs,
+                asset_map,
+                writer is not None and writer.minify,
+                cache_directory,
+                executor,
+            )
+            if writer is not None:
+                writer.written.extend(written)
+                writer.unchanged.extend(unchanged)
+            return written, unchanged
+        if jobs > 1 and len(posts) > 1:
+            post_jobs = [
+                (
+                    post,
+                    get_post_output_dir(post, public_dir, public_posts_dir),
+                    asset_map,
+                    writer is not None and writer.minify,
+                    cache_directory,
+                )
+                for post in posts
+            ]
+            results = run_post_jobs(
+                _generate_post_job,
+                post_jobs,
+                jobs,
+                labels=[post.source_path for post in posts],
+                executor=executor,
+            )
+            if writer is not None:
+                for written, unchanged in results:
+                    writer.written.extend(written)
+                    writer.unchanged.extend(unchanged)
+            return results
         try:
             for post in posts:
-                logger.info(f"Generating post {post['id']}")
+                logger.info(f"Generating post {post.id}")
                 logger.info(f"Writing to {public_posts_dir}")
-                if post["type"] == "post":
-                    # Defaults to public_dir/public_posts_dir
-                    generate_post(post, public_posts_dir)
-                else:
-                    generate_post(post, public_dir)
+                generate_post(
+                    post,
+                    get_post_output_dir(post, public_dir, public_posts_dir),
+                    writer,
+                    asset_map,
+                    cache_directory,
+                )
         except BlogTemplateError as e:
             print(f"Error while generating posts: {e}")
 
 
-def generate_pages(posts, posts_per_page=5, output_dir=PUBLIC_DIR):
+def get_index_pages(posts, posts_per_page=5, pagination=None, order=None):
+    """
+    Lay out the index pages.
+
+    With "forward" pagination, posts are listed in catalog order from
+    `index.html` on, so adding a post shifts every page after it. With
+    "stable" pagination, archive pages are numbered from the oldest post:
+    `1.html` holds the oldest `posts_per_page` posts, and only the newest
+    page, which is still filling up, changes when a post is added.
+    `index.html` shows the newest posts and links to the archive. Each page
+    lists its posts newest first.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        posts_per_page (int, optional): The maximum number of posts to display on each page. Default is 5.
+        pagination (str, optional): "forward" or "stable". Default is `pagination` from the configuration.
+        order (list, optional): With stable pagination, a sort key per post giving the order posts were published in. Default is by `date`.
+
+    Returns:
+        list of dict: The `filename`, `rows` (positions in `posts`) and `navigation_links` of each page.
+    """
+    if pagination is None:
+        pagination = config.PAGINATION
+    rows = get_front_page_rows(posts)
+    if pagination == "forward":
+        total_pages = count_pages(len(rows), posts_per_page)
+        return [
+            {
+                "filename": get_index_filename(page_number),
+                "rows": rows[(page_number - 1) * posts_per_page:page_number * posts_per_page],
+                "navigation_links": get_navigation_links(page_number, total_pages),
+            }
+            for page_number in range(1, total_pages + 1)
+        ]
+    if pagination != "stable":
+        raise ValueError(f"Error: Unknown pagination '{pagination}'.")
+
+    if order is None:
+        order = [(post.date, post.id) for post in posts]
+    rows.sort(key=lambda row: order[row])
+    total_pages = count_pages(len(rows), posts_per_page)
+    pages = []
+    for page_number in range(1, total_pages + 1):
+        page_rows = rows[(page_number - 1) * posts_per_page:page_number * posts_per_page]
+        pages.append(
+            {
+                "filename": f"{page_number}.html",
+                "rows": page_rows[::-1],
+                "navigation_links": {
+                    "index": page_number,
+                    "prev": (
+                        f"{page_number + 1}.html" if page_number < total_pages else "index.html"
+                    ),
+                    "next": f"{page_number - 1}.html" if page_number > 1 else None,
+                },
+            }
+        )
+    if pages:
+        pages.append(
+            {
+                "filename": "index.html",
+                "rows": rows[-posts_per_page:][::-1],
+                "navigation_links": {
+                    "index": 1,
+                    "prev": None,
+                    "next": f"{total_pages - 1}.html" if total_pages > 1 else None,
+                },
+            }
+        )
+    return pages
+
+
+def get_index_page_hash(posts, page):
+    """
+    Hash everything an index page shows, so it is only rendered again when it changes.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        page (dict): The page, as returned by `get_index_pages`.
+    """
+    return calculate_content_hash(
+        json.dumps(
+            [page["filename"], page["navigation_links"], get_listing(posts, page["rows"])]
+        )
+    )
+
+
+def generate_pages(
+    posts,
+    posts_per_page=5,
+    output_dir=None,
+    writer=None,
+    pages=None,
+    order=None,
+    asset_map=None,
+    cache_directory=None,
+):
     """
     Generate HTML for index pages.
 
     Args:
-        posts (list of dict, optional): The list of blog posts to generate pages for. If not provided, the function will load the posts from the `posts_directory`.
+        posts (PostCatalog or list of Post, optional): The list of blog posts to generate pages for. If not provided, the function will load the posts from the `posts_directory`.
         posts_per_page (int, optional): The maximum number of posts to display on each page. Default is 5.
         output_dir (str, optional): The directory where the output should be stored. Default is `public_dir`. Individual posts are stored in `public_dir/public_posts_dir`.
+        writer (PageWriter, optional): The writer pages are queued on. If not provided, pages are written directly.
+        pages (list of dict, optional): The pages to generate, as returned by `get_index_pages`. Default is every page.
+        order (list, optional): The publication order of the posts, see `get_index_pages`.
+        asset_map (dict, optional): The fingerprinted URL of every asset.
+        cache_directory (str, optional): The build cache directory, where compiled templates are kept. Default is `cache_directory` from the configuration.
     """
+    if output_dir is None:
+        output_dir = config.PUBLIC_DIR
     if len(posts) == 0:
         raise ValueError("Error: No posts found.")
-    front_page_posts = [post for post in posts if post["type"] == "post"]
-    total_pages = (len(front_page_posts) + posts_per_page - 1) // posts_per_page
-
-    for page_number in range(1, total_pages + 1):
-        start_index = (page_number - 1) * posts_per_page
-        end_index = start_index + posts_per_page
-        page_posts = front_page_posts[start_index:end_index]
-        prev_page = None if page_number == 1 else f"{page_number - 1}.html"
-        next_page = None if page_number == total_pages else f"{page_number + 1}.html"
-
-        navigation_links = {
-            "index": page_number,
-            "prev": prev_page,
-            "next": next_page,
-        }
+    if pages is None:
+        pages = get_index_pages(posts, posts_per_page, order=order)
+    output_filenames = []
 
+    for page in pages:
+        page_posts = [posts[row] for row in page["rows"]]
         try:
-            generate_index_page(page_posts, output_dir, navigation_links)
+            output_filenames.append(
+                generate_index_page(
+                    page_posts,
+                    output_dir,
+                    page["navigation_links"],
+                    writer,
+                    filename=page["filename"],
+                    asset_map=asset_map,
+                    cache_directory=cache_directory,
+                )
+            )
         except BlogTemplateError as e:
             print(f"Error while generating blog pages: {e}")
 
+    return output_filenames
+
+
+def remove_empty_directories(directory, root):
+    """
+    Remove a directory, and then its parents, while they are empty, stopping at `root`.
+
+    Args:
+        directory (str): The directory.
+        root (str): The directory above it that is kept.
+    """
+    directory = os.path.abspath(directory)
+    root = os.path.abspath(root)
+    while (
+        directory.startswith(root + os.sep)
+        and os.path.isdir(directory)
+        and not os.listdir(directory)
+    ):
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+
+def check_links(manifest, public_dir, asset_paths, cache_directory):
+    """
+    Check the links of every generated page against the files of the site.
+
+    Only the pages whose file changed since the last check are scanned
+    again, see `LinkGraph`; links are resolved against the outputs of the
+    manifest, the published assets and the static files.
+
+    Args:
+        manifest (dict): The manifest of the build.
+        public_dir (str): The public directory, the root of the site.
+        asset_paths (list of str): The paths of the static files.
+        cache_directory (str): The build cache directory, where the link graph is kept.
+
+    Returns:
+        tuple: The broken links, as `(page, url)` pairs, and the pages no other page links to.
+    """
+    from src.utils.links import LinkGraph
+
+    outputs = [
+        os.path.join(config.PROJECT_ROOT, output)
+        for output in get_outputs(manifest) | set(manifest["assets"])
+    ]
+    targets = {
+        os.path.relpath(path, public_dir).replace(os.sep, "/")
+        for path in outputs + list(asset_paths)
+    }
+    link_graph = LinkGraph(os.path.join(cache_directory, "links.json"))
+    scanned = link_graph.update(
+        (path for path in outputs if path.endswith(".html")), public_dir
+    )
+    logger.info(f"Scanned the links of {scanned} changed pages")
+    broken, orphans = link_graph.check(targets)
+    link_graph.save()
+    for page, url in broken:
+        logger.warning(f"Broken link in {page}: {url}")
+    for page in orphans:
+        logger.info(f"No page links to {page}")
+    return broken, orphans
+
+
+def get_publication_sequences(posts, sources, old_manifest):
+    """
+    Number the posts in the order they were first published; the numbers are kept in the build manifest.
+
+    Posts keep the number they were given when first built, even when they
+    are edited later. New posts are numbered after every known post, in
+    order of their `date`.
+
+    Args:
+        posts (PostCatalog): The blog posts.
+        sources (list of str): The relative source path of each post.
+        old_manifest (dict): The manifest of the previous build.
+
+    Returns:
+        dict: The number of each post, by relative source path.
+    """
+    sequences = {}
+    next_sequence = 1
+    for entry in old_manifest["posts"].values():
+        next_sequence = max(next_sequence, entry.get("sequence", 0) + 1)
+    new_sources = []
+    for source, date in zip(sources, posts.column("date")):
+        sequence = old_manifest["posts"].get(source, {}).get("sequence")
+        if sequence is None:
+            new_sources.append((date, source))
+        else:
+            sequences[source] = sequence
+    for _, source in sorted(new_sources):
+        sequences[source] = next_sequence
+        next_sequence += 1
+    return sequences
+
+
+def update_compressed_outputs(manifest, written, precompress, was_precompressed):
+    """
+    Bring the `.gz` siblings of the outputs up to date.
+
+    Only the outputs written by this build, and those whose sibling is
+    missing, are compressed. When precompression is turned off, the
+    siblings left by earlier builds are removed, as they would go stale.
+
+    Args:
+        manifest (dict): The manifest of the current build.
+        written (iterable of str): The paths of the outputs written by this build.
+        precompress (bool): Whether outputs get a `.gz` sibling.
+        was_precompressed (bool): Whether the previous build wrote `.gz` siblings.
+
+    Returns:
+        int: The number of siblings written or removed.
+    """
+    outputs = [
+        os.path.join(config.PROJECT_ROOT, output)
+        for output in sorted(get_outputs(manifest) | set(manifest["assets"]))
+        if is_compressible(output)
+    ]
+    if precompress:
+        to_compress = {os.path.abspath(path) for path in written}
+        to_compress.update(
+            output for output in outputs if not os.path.exists(get_compressed_path(output))
+        )
+        return len(compress_outputs(to_compress))
+    if was_precompressed:
+        return sum(remove_compressed(output) for output in outputs)
+    return 0
+
 
 def make_site(
-    local_posts_directory=LOCAL_POSTS_DIRECTORY,
-    public_dir=PUBLIC_DIR,
-    public_posts_dir=PUBLIC_POSTS_DIR,
+    local_posts_directory=None,
+    public_dir=None,
+    public_posts_dir=None,
     posts_per_page=5,
     force_rebuild=False,
+    manifest_file=None,
+    jobs=1,
+    cache_directory=None,
+    post_cache=None,
+    pagination=None,
+    site_url=None,
+    minify=None,
+    precompress=None,
+    pipeline=None,
+    manifest_cache=None,
+    shard=None,
+    merge=False,
 ):
     """
     Make the site as a whole.
 
+    Only the posts whose source, templates or configuration changed since the
+    last build are rendered again; the build manifest records what each post
+    produced and the inputs it was built from. When no input file's stat
+    signature changed, the build stops before any post is read.
+
     Args:
         posts_directory (str, optional): The directory where the blog posts are stored. If not provided, the function will try to load it from a configuration file.
-        posts (list of dict, optional): The list of blog posts to generate pages for. If not provided, the function will load the posts from the `posts_directory`.
+        posts (PostCatalog or list of Post, optional): The list of blog posts to generate pages for. If not provided, the function will load the posts from the `posts_directory`.
         public_dir (str, optional): The directory where the uncategorized posts should be stored. Default is `public_dir`.
         public_posts_dir (str, optional): The directory where the individual posts should be stored. Default is `public_dir/public_posts_dir`.
         posts_per_page (int, optional): The maximum number of posts to display on each page. Default is 5.
         force_rebuild (bool, optional): Force a rebuild of the site. Default is False.
+        manifest_file (str, optional): The path of the build manifest. Default is `manifest_filename` from the configuration.
+        jobs (int, optional): The number of worker processes used to process and render posts. Default is 1.
+        cache_directory (str, optional): The build cache directory. Default is `cache_directory` from the configuration.
+        post_cache (dict, optional): Posts kept in memory between builds, see `load_posts`.
+        pagination (str, optional): How index pages are numbered, see `get_index_pages`. Default is `pagination` from the configuration.
+        site_url (str, optional): The URL of the site root; the sitemap and feed are only generated with one. Default is `site_url` from the configuration.
+        minify (bool, optional): Minify HTML pages and stylesheets. Default is `minify` from the configuration.
+        precompress (bool, optional): Write a `.gz` sibling next to every changed HTML, CSS, JS and JSON output. Default is `precompress` from the configuration.
+        pipeline (bool, optional): Generate changed posts through a streaming read, render and write pipeline, see `generate_posts_pipeline`. Default is `pipeline` from the configuration.
+        manifest_cache (dict, optional): Build manifests kept in memory between builds, see `load_cached_manifest`.
+        shard (tuple, optional): Only render the posts of this shard, as returned by `parse_shard`, and record them in the shard's own manifest; the pages listing every post are left to the merge. Default is the whole site.
+        merge (bool, optional): Take the posts rendered by the shards of a build from their manifests, and generate the pages listing every post. Default is False.
+
+    Returns:
+        dict: The number of pages `written`, `unchanged` (rendered, but identical to the existing file) and `skipped` (not rendered at all).
+
+    Raises:
+        ValueError: If the shard manifests to merge are missing or do not match this build.
     """
-    hash_file = os.path.join(PROJECT_ROOT, HASH_FILENAME)
+    if local_posts_directory is None:
+        local_posts_directory = config.LOCAL_POSTS_DIRECTORY
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    if public_posts_dir is None:
+        public_posts_dir = config.PUBLIC_POSTS_DIR
+    if manifest_file is None:
+        manifest_file = config.MANIFEST_FILENAME
+    if cache_directory is None:
+        cache_directory = config.CACHE_DIRECTORY
+    if pagination is None:
+        pagination = config.PAGINATION
+    if site_url is None:
+        site_url = config.SITE_URL
+    if minify is None:
+        minify = config.MINIFY
+    if precompress is None:
+        precompress = config.PRECOMPRESS
+    if pipeline is None:
+        pipeline = config.PIPELINE
+    if shard is not None:
+        # Each shard keeps its own manifest; the merge combines them
+        manifest_file = get_shard_manifest_path(manifest_file, shard)
+
+    if not os.path.exists(config.TEMPLATE_DIRECTORY):
+        logger.warning(f"Error: Directory '{config.TEMPLATE_DIRECTORY}' not found.")
+        raise BlogDirectoryNotFoundError(config.TEMPLATE_DIRECTORY)
 
     try:
-        posts = load_posts(local_posts_directory)
+        post_paths = get_post_paths(local_posts_directory)
     except (PostDirectoryNotFoundError, PostNotFoundError) as e:
         logger.error(f"Error while loading posts: {e}")
+        return
 
-    dirs_to_check = [
-        LOCAL_POSTS_DIRECTORY,
-        PUBLIC_DIR,
-        PUBLIC_POSTS_DIR,
-        TEMPLATE_DIRECTORY,
+    # Stat every input; only files whose stat signature changed are hashed again
+    old_manifest = load_cached_manifest(manifest_file, manifest_cache)
+    template_paths = [
+        path for path in get_all_paths(config.TEMPLATE_DIRECTORY) if os.path.isfile(path)
     ]
+    asset_paths = get_asset_paths(
+        config.STATIC_DIRECTORY, [local_posts_directory, config.LOCAL_POSTS_DIRECTORY]
+    )
 
-    def get_hashes_by_dir(dirs):
-        """
-        Get hashes of all files in a directory.
-        """
-        hashes = {}
-        for directory in dirs:
-            assert os.path.exists(directory), f"Directory {directory} not found."
-            logger.info(f"Calculating hash for {directory}")
-            hashes[directory] = calculate_hash(directory)
-        return hashes
-
-    def has_site_changed():
-        """
-        Checks if site has changed by comparing the current hashes with the old hashes.
-        """
-        dir_hashes = get_hashes_by_dir(dirs_to_check)
-        for directory, dir_hash in dir_hashes.items():
-            if not os.path.exists(directory):
-                logger.warning(f"Error: Directory '{directory}' not found.")
-                raise BlogDirectoryNotFoundError(directory)
-        if not os.path.exists(hash_file):
-            return True
-        else:
-            old_hash = load_old_hash(hash_file)
-            if any(
-                dir_hashes[directory] != old_hash.get(directory, None)
-                for directory in dirs_to_check
-            ):
-                return True
-            return False
+    def get_link_stats(manifest):
+        # A shard only has its own posts; the merge checks the whole site
+        if shard is not None:
+            return {"broken_links": 0, "orphan_pages": 0}
+        with profile_phase("links"):
+            broken_links, orphan_pages = check_links(
+                manifest, public_dir, asset_paths, cache_directory
+            )
+        return {"broken_links": len(broken_links), "orphan_pages": len(orphan_pages)}
 
-    if posts is not None:
-        site_changed = has_site_changed()
-        if site_changed or force_rebuild:
-            if force_rebuild:
-                logger.info("Site rebuild requested. Generating site...")
-            else:
-                logger.info("Changes detected. Generating site...")
-            # Generating site...
-            try:
-                logger.info(f"Generating all posts in {local_posts_directory}...")
-                generate_all_posts(posts, public_dir, public_posts_dir)
-                logger.info(f"Generating pages in {local_posts_directory}...")
-                generate_pages(posts, posts_per_page, public_dir)
-                current_hashes = get_hashes_by_dir(dirs_to_check)
-                save_new_hash(current_hashes, hash_file)
-                logger.info("Pages generated successfully.")
-            except BlogTemplateError as e:
-                logger.error(f"Error while generating site: {e}")
-        else:
-            logger.info("No changes detected. Skipping post generation.")
+    with profile_phase("hash"):
+        files, rehashed_files = scan_files(
+            post_paths + template_paths + asset_paths, old_manifest["files"]
+        )
+    options = {
+        "posts_per_page": posts_per_page,
+        "pagination": pagination,
+        "minify": minify,
+        "precompress": precompress,
+        "public_dir": relative_path(public_dir),
+        "public_posts_dir": relative_path(public_posts_dir),
+        "config": calculate_content_hash(json.dumps(config.parsed_config, sort_keys=True)),
+    }
+    if (
+        not force_rebuild
+        and not rehashed_files
+        and files.keys() == old_manifest["files"].keys()
+        and options == old_manifest["options"]
+        and all(
+            os.path.exists(os.path.join(config.PROJECT_ROOT, output))
+            for output in get_outputs(old_manifest) | set(old_manifest["assets"])
+        )
+    ):
+        logger.info("No changes detected. Skipping post generation.")
+        # The link graph is unchanged too; checking it only stats the pages
+        return {
+            "written": 0,
+            "unchanged": 0,
+            "skipped": len(get_outputs(old_manifest)),
+            **get_link_stats(old_manifest),
+        }
+
+    template_hashes = {
+        relative_path(path): files[relative_path(path)]["hash"] for path in template_paths
+    }
+    # Assets are copied under a name derived from their hash; pages link to those copies
+    asset_map = get_asset_map(
+        {path: files[relative_path(path)]["hash"] for path in asset_paths},
+        config.STATIC_DIRECTORY,
+        os.path.join(public_dir, config.ASSETS_DIRECTORY),
+        public_dir,
+        minify,
+    )
+    asset_manifest_file = os.path.join(public_dir, config.ASSETS_DIRECTORY, "manifest.json")
+    published = []
+    # Shards link to the fingerprinted assets; only the merge publishes them
+    if shard is None:
+        with profile_phase("assets"):
+            published = publish_assets(
+                asset_paths,
+                asset_map,
+                config.STATIC_DIRECTORY,
+                public_dir,
+                asset_manifest_file,
+                minify,
+            )
+    if published:
+        logger.info(f"Published {len(published)} changed asset files")
+    fingerprint = get_build_fingerprint(
+        template_hashes, dict(config.parsed_config, minify=minify), asset_map
+    )
+    manifest = new_manifest(fingerprint)
+    manifest["options"] = options
+    manifest["files"] = files
+    if shard is None:
+        manifest["assets"] = [relative_path(asset_manifest_file)] + sorted(
+            relative_path(os.path.join(public_dir, url)) for url in asset_map.values()
+        )
+    if force_rebuild:
+        logger.info("Site rebuild requested. Generating site...")
+
+    render_cache = get_render_cache(cache_directory)
+    post_order = PostOrder(os.path.join(cache_directory, "order.json"))
+    posts = None
+    try:
+        with profile_phase("load"):
+            posts = load_posts(
+                local_posts_directory,
+                jobs=jobs,
+                render_cache=render_cache,
+                post_cache=post_cache,
+                file_hashes={path: files[relative_path(path)]["hash"] for path in post_paths},
+                post_order=post_order,
+            )
+    except (PostDirectoryNotFoundError, PostNotFoundError) as e:
+        logger.error(f"Error while loading posts: {e}")
+
+    if posts is None:
+        return
+
+    sources = [relative_path(source_path) for source_path in posts.column("source_path")]
+    sequences = get_publication_sequences(posts, sources, old_manifest)
+    shard_posts = {}
+    shard_scores = {}
+    if merge:
+        shard_posts, shard_scores = merge_shard_manifests(
+            [load_manifest(path) for path in find_shard_manifests(manifest_file)],
+            fingerprint,
+            options,
+        )
+    changed_posts = []
+    search_scores = {}
+    for post, source in zip(posts, sources):
+        if shard is not None and get_post_shard(source, shard[1]) != shard[0]:
+            continue
+        output_dir = get_post_output_dir(post, public_dir, public_posts_dir)
+        output_filename = os.path.join(output_dir, f"{post.sanitized_title}.html")
+        entry = {
+            "hash": files[source]["hash"],
+            "last_updated": post.last_updated,
+            "sequence": sequences[source],
+            "fingerprint": fingerprint,
+            "outputs": [relative_path(output_filename)],
+        }
+        manifest["posts"][source] = entry
+        shard_entry = shard_posts.get(source)
+        if shard_entry is not None and shard_entry["hash"] == entry["hash"]:
+            # A shard rendered this version of the post
+            if source in shard_scores:
+                search_scores[source] = shard_scores[source]
+            continue
+        if force_rebuild or is_entry_stale(old_manifest["posts"].get(source), entry):
+            logger.info(f"Changes detected in {source}")
+            changed_posts.append(post)
+
+    # Each index page is tracked on its own, so only the pages whose listing changed are rendered
+    order = [sequences[source] for source in sources]
+    # The pages listing every post are generated by the merge, not by each shard
+    index_pages = []
+    if shard is None:
+        index_pages = get_index_pages(posts, posts_per_page, pagination, order)
+    changed_index_pages = []
+    for page in index_pages:
+        page_entry = {
+            "hash": get_index_page_hash(posts, page),
+            "fingerprint": fingerprint,
+            "outputs": [relative_path(os.path.join(public_dir, page["filename"]))],
+        }
+        page_key = f"index/{page['filename']}"
+        manifest["pages"][page_key] = page_entry
+        if force_rebuild or is_entry_stale(old_manifest["pages"].get(page_key), page_entry):
+            changed_index_pages.append(page)
+    index_changed = bool(changed_index_pages)
+
+    # Only the tags a changed post entered, left or is listed differently in are rendered
+    changed_tags = {}
+    tag_index = get_tag_index(posts) if shard is None else {}
+    for slug, (tag, rows) in tag_index.items():
+        tag_dir = get_tag_output_dir(slug, public_dir)
+        tag_entry = {
+            "hash": get_tag_listing_hash(posts, tag, rows, posts_per_page),
+            "fingerprint": fingerprint,
+            "outputs": [
+                relative_path(os.path.join(tag_dir, get_index_filename(page_number)))
+                for page_number in range(1, count_pages(len(rows), posts_per_page) + 1)
+            ],
+        }
+        tag_key = f"{config.TAGS_DIRECTORY}/{slug}"
+        manifest["pages"][tag_key] = tag_entry
+        if force_rebuild or is_entry_stale(old_manifest["pages"].get(tag_key), tag_entry):
+            changed_tags[slug] = (tag, rows)
+
+    # Each archive page is tracked on its own, so the months no post entered, left or changed in are not rendered
+    archive_pages = get_archive_pages(posts) if shard is None else []
+    changed_archive_pages = []
+    for page in archive_pages:
+        page_entry = {
+            "hash": get_archive_page_hash(posts, page),
+            "fingerprint": fingerprint,
+            "outputs": [relative_path(get_archive_output_filename(page["key"], public_dir))],
+        }
+        manifest["pages"][page["key"]] = page_entry
+        if force_rebuild or is_entry_stale(old_manifest["pages"].get(page["key"]), page_entry):
+            changed_archive_pages.append(page)
+
+    # The sitemap and feed are written again only when the pages they list change
+    sitemap_entries = None
+    feed_rows = None
+    if site_url and shard is None:
+        from src.utils.feeds import (
+            generate_feed,
+            generate_sitemap,
+            get_feed_hash,
+            get_feed_rows,
+            get_sitemap_entries,
+            get_sitemap_filenames,
+        )
+
+        entries = get_sitemap_entries(
+            posts,
+            site_url,
+            [page["filename"] for page in index_pages],
+            tag_index,
+            [page["key"] for page in archive_pages],
+        )
+        sitemap_entry = {
+            "hash": calculate_content_hash(json.dumps(entries)),
+            "outputs": [
+                relative_path(os.path.join(public_dir, filename))
+                for filename in get_sitemap_filenames(len(entries), config.SITEMAP_FILENAME)
+            ],
+        }
+        manifest["pages"]["sitemap"] = sitemap_entry
+        if force_rebuild or is_entry_stale(old_manifest["pages"].get("sitemap"), sitemap_entry):
+            sitemap_entries = entries
+
+        rows = get_feed_rows(posts)
+        feed_entry = {
+            "hash": get_feed_hash(
+                posts,
+                rows,
+                {path: files[relative_path(path)]["hash"] for path in post_paths},
+            ),
+            "fingerprint": fingerprint,
+            "outputs": [relative_path(os.path.join(public_dir, config.FEED_FILENAME))],
+        }
+        manifest["pages"]["feed"] = feed_entry
+        if force_rebuild or is_entry_stale(old_manifest["pages"].get("feed"), feed_entry):
+            feed_rows = rows
+
+    search_changed = False
+    if shard is not None:
+        # The merge indexes the posts of a shard with the terms scored here
+        with profile_phase("search"):
+            manifest["search"] = {
+                relative_path(post.source_path): score_terms(post.title, post.content)
+                for post in changed_posts
+            }
+    else:
+        # Only the posts added, changed or removed since the last build are indexed again
+        search_index = get_search_index(public_dir, cache_directory)
+        if force_rebuild:
+            search_index.clear()
+        with profile_phase("search"):
+            search_changed = search_index.update(
+                {
+                    relative_path(post.source_path): (
+                        files[relative_path(post.source_path)]["hash"],
+                        [post.title, post.rel_path, post.synopsis],
+                        post,
+                    )
+                    for post in posts
+                },
+                search_scores,
+            )
+        manifest["pages"]["search"] = {
+            "outputs": [relative_path(path) for path in search_index.get_output_paths()]
+        }
+
+    if (
+        not changed_posts
+        and not index_changed
+        and not changed_tags
+        and not changed_archive_pages
+        and not search_changed
+        and sitemap_entries is None
+        and feed_rows is None
+        and not get_stale_outputs(old_manifest, manifest)
+    ):
+        logger.info("No changes detected. Skipping post generation.")
+        with profile_phase("compress"):
+            update_compressed_outputs(
+                manifest, published, precompress, old_manifest["options"].get("precompress")
+            )
+        save_manifest(manifest, manifest_file, manifest_cache)
+        post_order.save()
+        return {
+            "written": 0,
+            "unchanged": 0,
+            "skipped": len(get_outputs(manifest)),
+            **get_link_stats(manifest),
+        }
+
+    # Generating site...
+    try:
+        logger.info(f"Generating {len(changed_posts)} posts in {local_posts_directory}...")
+        # One pool renders the posts and minifies every other page
+        pool = get_process_pool(jobs) if jobs > 1 else contextlib.nullcontext()
+        with pool as executor, PageWriter(minify=minify, executor=executor) as writer:
+            with profile_phase("render"):
+                writer.create_directories([public_dir, public_posts_dir])
+                generate_all_posts(
+                    changed_posts,
+                    public_dir,
+                    public_posts_dir,
+                    jobs=jobs,
+                    writer=writer,
+                    asset_map=asset_map,
+                    pipeline=pipeline,
+                    cache_directory=cache_directory,
+                    executor=executor,
+                )
+                if index_changed:
+                    logger.info(f"Generating pages in {local_posts_directory}...")
+                    generate_pages(
+                        posts,
+                        posts_per_page,
+                        public_dir,
+                        writer,
+                        pages=changed_index_pages,
+                        asset_map=asset_map,
+                        cache_directory=cache_directory,
+                    )
+                if changed_tags:
+                    logger.info(f"Generating pages for {len(changed_tags)} tags...")
+                    generate_tag_pages(
+                        posts,
+                        changed_tags,
+                        posts_per_page,
+                        public_dir,
+                        writer,
+                        asset_map,
+                        cache_directory,
+                    )
+                if changed_archive_pages:
+                    logger.info(f"Generating {len(changed_archive_pages)} archive pages...")
+                    generate_archive_pages(
+                        posts,
+                        changed_archive_pages,
+                        public_dir,
+                        writer,
+                        asset_map,
+                        cache_directory,
+                    )
+                if search_changed:
+                    logger.info("Writing the search index...")
+                    manifest["pages"]["search"]["outputs"] = [
+                        relative_path(path) for path in search_index.save(writer)
+                    ]
+                if sitemap_entries is not None:
+                    logger.info(f"Writing the sitemap of {len(sitemap_entries)} pages...")
+                    generate_sitemap(sitemap_entries, site_url, public_dir, writer)
+                if feed_rows is not None:
+                    logger.info("Writing the feed...")
+                    generate_feed(posts, feed_rows, site_url, public_dir, writer)
+            # Pages are written on the writer threads while rendering goes on;
+            # their write spans add up the disk time, this is only the wait
+            with profile_phase("drain"):
+                writer.close()
+        with profile_phase("compress"):
+            compressed = update_compressed_outputs(
+                manifest,
+                writer.written + published,
+                precompress,
+                old_manifest["options"].get("precompress"),
+            )
+        if compressed:
+            logger.info(f"Updated {compressed} precompressed outputs")
+        with profile_phase("clean"):
+            for output in get_stale_outputs(old_manifest, manifest):
+                output_path = os.path.join(config.PROJECT_ROOT, output)
+                if os.path.exists(output_path):
+                    logger.info(f"Removing stale output {output}")
+                    os.remove(output_path)
+                remove_compressed(output_path)
+                # Remove the directories of tags and months no post uses anymore
+                for root in (config.TAGS_DIRECTORY, config.ARCHIVE_DIRECTORY):
+                    remove_empty_directories(
+                        os.path.dirname(output_path), os.path.join(public_dir, root)
+                    )
+            save_manifest(manifest, manifest_file, manifest_cache)
+            post_order.save()
+            evicted = render_cache.prune()
+        if evicted:
+            logger.info(f"Evicted {evicted} entries from the render cache")
+        stats = {
+            "written": len(writer.written),
+            "unchanged": len(writer.unchanged),
+            "skipped": len(get_outputs(manifest)) - len(writer.written) - len(writer.unchanged),
+            **get_link_stats(manifest),
+        }
+        logger.info(
+            f"Pages generated successfully: {stats['written']} written, "
+            f"{stats['unchanged']} unchanged, {stats['skipped']} skipped."
+        )
+        return stats
+    except BlogTemplateError as e:
+        logger.error(f"Error while generating site: {e}")
+
+
+def build(config=None, **options):
+    """
+    Build the site with a configuration loaded explicitly, rather than `config.json` on first use.
+
+    Args:
+        config (dict or str, optional): The configuration, as a dictionary holding every key of `config.json`, or the path of a configuration file. Default is `config.json` in the project root.
+        **options: The arguments of `make_site`; those left out come from the configuration.
+
+    Returns:
+        dict: The build statistics, see `make_site`.
+    """
+    configure(config)
+    # The Markdown backend is part of the configuration
+    get_markdown_renderer.cache_clear()
+    return make_site(**options)
@@ -1,8 +1,10 @@
 import argparse
 import logging
 import os
-import config
-from generate_pages import make_site
+import src.config as config
+from generate_pages import make_site, resolve_jobs
+from src.utils.profiler import BuildProfiler, set_profiler
+from src.utils.shards import parse_shard
 
 # Set up logging
 logging.basicConfig(level=logging.ERROR)
@@ -14,6 +16,16 @@ def main():
     parser = argparse.ArgumentParser(
         description="Generate a static site from Markdown files."
     )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["build", "serve", "daemon", "merge"],
+        default="build",
+        help=(
+            "Build the site once (default), build it and serve a local preview, "
+            "run a build daemon for src/client.py, or merge the builds of every --shard."
+        ),
+    )
     parser.add_argument(
         "--posts-directory",
         "-p",
@@ -48,6 +60,81 @@ def main():
         action="store_true",
         help="Force a rebuild of the site.",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="The number of processes used to render posts (0 uses every CPU core).",
+    )
+    parser.add_argument(
+        "--minify",
+        action=argparse.BooleanOptionalAction,
+        default=config.MINIFY,
+        help="Minify HTML pages and stylesheets.",
+    )
+    parser.add_argument(
+        "--precompress",
+        action=argparse.BooleanOptionalAction,
+        default=config.PRECOMPRESS,
+        help="Write a .gz sibling next to every changed HTML, CSS, JS and JSON output.",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action=argparse.BooleanOptionalAction,
+        default=config.PIPELINE,
+        help="Overlap reading, rendering and writing posts in a streaming pipeline.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="Only render the posts of shard I of N; `merge` then generates the pages listing every post.",
+    )
+    parser.add_argument(
+        "--watch",
+        "-w",
+        action="store_true",
+        help="With serve: rebuild on changes and reload open pages.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="With serve: the port of the preview server.",
+    )
+    parser.add_argument(
+        "--open",
+        action="store_true",
+        help="With serve: open the site in a web browser.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=config.DAEMON_SOCKET,
+        help="With daemon: the Unix socket to listen on.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report the time and memory spent in each build phase and the slowest posts and templates.",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="With --profile: the number of slowest posts and templates to list.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=str,
+        help="With --profile: also dump cProfile and tracemalloc snapshots to this directory.",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        help="Export the build phases and per-post spans to this Chrome trace JSON file.",
+    )
     parser.add_argument(
         "--verbose",
         "-v",
@@ -61,6 +148,46 @@ def main():
         logging.getLogger().setLevel(logging.INFO)
         print("Verbose logging enabled.")
     
+    if args.command == "serve":
+        from serve import serve
+
+        serve(
+            local_posts_directory=args.posts_directory,
+            public_dir=args.public_directory,
+            public_posts_dir=args.public_posts_directory,
+            posts_per_page=args.posts_per_page,
+            port=args.port,
+            watch=args.watch,
+            open_browser=args.open,
+            jobs=resolve_jobs(args.jobs),
+        )
+        return
+
+    if args.command == "daemon":
+        from daemon import run_daemon
+
+        run_daemon(
+            args.socket,
+            local_posts_directory=args.posts_directory,
+            public_dir=args.public_directory,
+            public_posts_dir=args.public_posts_directory,
+            posts_per_page=args.posts_per_page,
+            jobs=args.jobs,
+            minify=args.minify,
+            precompress=args.precompress,
+            pipeline=args.pipeline,
+        )
+        return
+
+    profiler = None
+    if args.profile or args.trace:
+        profiler = BuildProfiler(
+            trace_allocations=args.profile,
+            profile_calls=args.profile and args.profile_dir is not None,
+        )
+        set_profiler(profiler)
+        profiler.start()
+
     try:
         logger.info(
             f"Generating site from {args.posts_directory} to {args.public_directory}"
@@ -73,10 +200,28 @@ def main():
             public_posts_dir=args.public_posts_directory,
             posts_per_page=args.posts_per_page,
             force_rebuild=args.force_rebuild,
+            jobs=resolve_jobs(args.jobs),
+            minify=args.minify,
+            precompress=args.precompress,
+            pipeline=args.pipeline,
+            shard=args.shard,
+            merge=args.command == "merge",
         )
     except Exception as e:
         logger.error(f"An exception occurred while generating the site: {e}")
         raise e
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            set_profiler(None)
+            if args.profile:
+                print(profiler.format_report(args.profile_top))
+                if args.profile_dir:
+                    for path in profiler.save_snapshots(args.profile_dir):
+                        print(f"Saved {path}")
+            if args.trace:
+                profiler.save_trace(args.trace)
+                print(f"Saved trace to {args.trace}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,205 @@
+import http.server
+import logging
+import os
+import threading
+from functools import partial
+import src.config as config
+from generate_pages import get_markdown_renderer, make_site
+from src.utils.handler import load_config
+from src.utils.watcher import get_watcher
+
+logger = logging.getLogger(__name__)
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}")'
+    ".onmessage = function () { location.reload(); };</script>"
+)
+
+
+class PreviewServer(http.server.ThreadingHTTPServer):
+    """A local HTTP server for the public directory that tells open pages when to reload."""
+
+    daemon_threads = True
+
+    def __init__(self, address, public_dir):
+        """
+        Args:
+            address (tuple): The host and port to listen on.
+            public_dir (str): The directory to serve.
+        """
+        super().__init__(address, partial(PreviewRequestHandler, directory=public_dir))
+        self.build_number = 0
+        self.build_condition = threading.Condition()
+
+    def notify_reload(self):
+        """
+        Tell every connected page to reload.
+        """
+        with self.build_condition:
+            self.build_number += 1
+            self.build_condition.notify_all()
+
+
+class PreviewRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Serve the site, injecting the live-reload script into HTML pages."""
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self.send_reload_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            self.send_html(path)
+            return
+        super().do_GET()
+
+    def send_html(self, path):
+        """
+        Send an HTML page with the live-reload script added.
+
+        Args:
+            path (str): The path of the page.
+        """
+        with open(path, "rb") as f:
+            html = f.read()
+        script = LIVE_RELOAD_SCRIPT.encode("utf-8")
+        if b"</body>" in html:
+            html = html.replace(b"</body>", script + b"</body>", 1)
+        else:
+            html += script
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(html)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(html)
+
+    def send_reload_events(self):
+        """
+        Stream a server-sent event every time the site is rebuilt.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        condition = self.server.build_condition
+        with condition:
+            seen = self.server.build_number
+        try:
+            while True:
+                with condition:
+                    condition.wait_for(lambda: self.server.build_number != seen, timeout=15)
+                    build_number = self.server.build_number
+                if build_number != seen:
+                    seen = build_number
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    # Keep the connection alive
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        logger.info(format % args)
+
+
+def reload_config():
+    """
+    Reload `config.json`, with every setting derived from it, and the Markdown renderer it selects.
+
+    A configuration that cannot be loaded leaves the current one in place.
+    Directories passed to a build explicitly, as `serve` does, still take precedence.
+    """
+    config_data = load_config(config.CONFIG_PATH)
+    if config_data is not None:
+        config.configure(config_data)
+        get_markdown_renderer.cache_clear()
+
+
+def serve(
+    local_posts_directory=None,
+    public_dir=None,
+    public_posts_dir=None,
+    posts_per_page=5,
+    host="127.0.0.1",
+    port=8000,
+    watch=False,
+    open_browser=False,
+    jobs=1,
+):
+    """
+    Build the site and serve it locally, rebuilding it in-process whenever its sources change.
+
+    Posts stay loaded in memory between rebuilds, so a change only reprocesses
+    the files that changed and renders the pages they affect.
+
+    Args:
+        local_posts_directory (str, optional): The directory where the blog posts are stored. Default is `posts_directory` from the configuration.
+        public_dir (str, optional): The directory where the site is generated and served from. Default is `public_directory` from the configuration.
+        public_posts_dir (str, optional): The directory where the individual posts should be stored. Default is `public_posts_directory` from the configuration.
+        posts_per_page (int, optional): The maximum number of posts to display on each page. Default is 5.
+        host (str, optional): The address to listen on. Default is 127.0.0.1.
+        port (int, optional): The port to listen on. Default is 8000.
+        watch (bool, optional): Watch posts, templates and the configuration for changes. Default is False.
+        open_browser (bool, optional): Open the site in a web browser. Default is False.
+        jobs (int, optional): The number of worker processes used to process and render posts. Default is 1.
+    """
+    if local_posts_directory is None:
+        local_posts_directory = config.LOCAL_POSTS_DIRECTORY
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    if public_posts_dir is None:
+        public_posts_dir = config.PUBLIC_POSTS_DIR
+    post_cache = {}
+
+    def build():
+        make_site(
+            local_posts_directory=local_posts_directory,
+            public_dir=public_dir,
+            public_posts_dir=public_posts_dir,
+            posts_per_page=posts_per_page,
+            jobs=jobs,
+            post_cache=post_cache,
+        )
+
+    build()
+    server = PreviewServer((host, port), public_dir)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    url = f"http://{host}:{server.server_address[1]}/"
+    print(f"Serving {public_dir} at {url}")
+    if open_browser:
+        import webbrowser
+
+        webbrowser.open(url)
+
+    watched_paths = [local_posts_directory, config.TEMPLATE_DIRECTORY, config.CONFIG_PATH]
+    watcher = get_watcher(watched_paths) if watch else None
+    try:
+        if watcher is None:
+            server_thread.join()
+        while watcher is not None:
+            changed = watcher.wait()
+            if not changed:
+                continue
+            logger.info(f"Changes detected: {sorted(changed)}")
+            if os.path.abspath(config.CONFIG_PATH) in changed:
+                reload_config()
+                post_cache.clear()
+            try:
+                build()
+            except Exception as e:
+                logger.error(f"An exception occurred while rebuilding the site: {e}")
+                continue
+            server.notify_reload()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.close()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,340 @@
+import bisect
+import calendar
+import datetime
+import json
+import os
+from functools import partial
+import src.config as config
+from src.exceptions import BlogTemplateError
+from src.utils.assets import get_asset_url
+from src.utils.catalog import PostCatalog
+from src.utils.handler import calculate_content_hash, get_template
+from src.utils.pages import get_front_page_rows, get_jinja_cache_directory, get_listing, write_page
+from src.utils.profiler import profile_span
+from src.utils.writer import write_output
+
+POST_ORDER_VERSION = 1
+# The format of post dates; it sorts as text in chronological order
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_post_date(value, fallback):
+    """
+    Normalize the `date` of a post's front matter to DATE_FORMAT.
+
+    Dates are accepted as `YYYY-MM-DD`, optionally followed by a time
+    (`YYYY-MM-DD HH:MM[:SS]`), or in any ISO 8601 form; times with a UTC
+    offset are converted to local time.
+
+    Args:
+        value (str or None): The `date` of the front matter.
+        fallback (str): The date used when there is none or it cannot be parsed, already in DATE_FORMAT.
+    """
+    if not value:
+        return fallback
+    value = value.strip().strip("\"'")
+    if value.endswith("Z"):
+        value = f"{value[:-1]}+00:00"
+    try:
+        date = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return fallback
+    if date.tzinfo is not None:
+        date = date.astimezone().replace(tzinfo=None)
+    return date.strftime(DATE_FORMAT)
+
+
+def get_month_key(date):
+    """
+    Get the `YYYY/MM` key of the month of a date.
+
+    Args:
+        date (str): The date, in DATE_FORMAT.
+    """
+    return f"{date[:4]}/{date[5:7]}"
+
+
+def get_month_name(month_key):
+    """
+    Get the display name of a month, such as "March 2024".
+
+    Args:
+        month_key (str): The month, as returned by `get_month_key`.
+    """
+    year, month = month_key.split("/")
+    return f"{calendar.month_name[int(month)]} {year}"
+
+
+def get_archive_index(dates, rows):
+    """
+    Group posts by year and month.
+
+    Args:
+        dates (list of str): The date of every post, in catalog order.
+        rows (iterable of int): The positions of the posts to group, in the order they are listed.
+
+    Returns:
+        dict: The rows of each month by `YYYY/MM` key, newest month first.
+    """
+    months = {}
+    for row in rows:
+        months.setdefault(get_month_key(dates[row]), []).append(row)
+    return dict(sorted(months.items(), reverse=True))
+
+
+class PostOrder:
+    """
+    The posts sorted by date, kept between builds.
+
+    The state file holds every post's `(date, source)` key in ascending
+    order. A build only inserts the keys of new posts and of posts whose
+    date changed, with a binary search, and deletes those of removed
+    posts, instead of sorting every post again.
+    """
+
+    def __init__(self, state_file):
+        """
+        Args:
+            state_file (str): The path of the file keeping the order between builds.
+        """
+        self.state_file = state_file
+        self.keys = self.load_state()
+        self.dates = {source: date for date, source in self.keys}
+        self.changed = False
+
+    def load_state(self):
+        """
+        Load the order of the previous build; a missing or outdated state yields an empty order.
+        """
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        if not isinstance(state, dict) or state.get("version") != POST_ORDER_VERSION:
+            return []
+        return [tuple(key) for key in state["keys"]]
+
+    def insert(self, source, date):
+        """
+        Add a post to the order.
+
+        Args:
+            source (str): The relative source path of the post.
+            date (str): The date of the post, in DATE_FORMAT.
+        """
+        bisect.insort(self.keys, (date, source))
+        self.dates[source] = date
+        self.changed = True
+
+    def remove(self, source):
+        """
+        Remove a post from the order.
+
+        Args:
+            source (str): The relative source path of the post.
+        """
+        key = (self.dates.pop(source), source)
+        del self.keys[bisect.bisect_left(self.keys, key)]
+        self.changed = True
+
+    def update(self, dates):
+        """
+        Bring the order up to date with the current posts.
+
+        Args:
+            dates (dict): The date of every post, by relative source path.
+
+        Returns:
+            int: The number of posts added, moved or removed.
+        """
+        updates = 0
+        for source in self.dates.keys() - dates.keys():
+            self.remove(source)
+            updates += 1
+        for source, date in dates.items():
+            known_date = self.dates.get(source)
+            if known_date == date:
+                continue
+            if known_date is not None:
+                self.remove(source)
+            self.insert(source, date)
+            updates += 1
+        return updates
+
+    def newest_first(self):
+        """
+        Get the relative source path of every post, newest first.
+        """
+        return [source for _, source in reversed(self.keys)]
+
+    def save(self):
+        """
+        Write the state file, if the order changed.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        if not self.changed:
+            return False
+        self.changed = False
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        return write_output(
+            self.state_file,
+            json.dumps({"version": POST_ORDER_VERSION, "keys": self.keys}),
+        )
+
+
+def get_archive_pages(posts):
+    """
+    Lay out the archive: `archive/index.html` lists every month,
+    `archive/<year>/index.html` the posts of a year and
+    `archive/<year>/<month>/index.html` those of a month.
+
+    Posts are listed in catalog order, which is newest first.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+
+    Returns:
+        list of dict: The `key` of each page (also its directory, relative to the public directory), its `title`, its `months` (`(month key, rows)` pairs, newest first) and whether it lists their posts or only counts them.
+    """
+    if isinstance(posts, PostCatalog):
+        dates = posts.column("date")
+    else:
+        dates = [post.date for post in posts]
+    months = get_archive_index(dates, get_front_page_rows(posts))
+    if not months:
+        return []
+    pages = [
+        {
+            "key": config.ARCHIVE_DIRECTORY,
+            "title": "Archive",
+            "months": list(months.items()),
+            "lists_posts": False,
+        }
+    ]
+    years = {}
+    for month_key, rows in months.items():
+        years.setdefault(month_key[:4], []).append((month_key, rows))
+    for year, year_months in years.items():
+        pages.append(
+            {
+                "key": f"{config.ARCHIVE_DIRECTORY}/{year}",
+                "title": year,
+                "months": year_months,
+                "lists_posts": True,
+            }
+        )
+        pages.extend(
+            {
+                "key": f"{config.ARCHIVE_DIRECTORY}/{month_key}",
+                "title": get_month_name(month_key),
+                "months": [(month_key, rows)],
+                "lists_posts": True,
+            }
+            for month_key, rows in year_months
+        )
+    return pages
+
+
+def get_archive_page_hash(posts, page):
+    """
+    Hash everything an archive page shows, so it is only rendered again when it changes.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        page (dict): The page, as returned by `get_archive_pages`.
+    """
+    months = [
+        [month_key, get_listing(posts, rows) if page["lists_posts"] else len(rows)]
+        for month_key, rows in page["months"]
+    ]
+    return calculate_content_hash(json.dumps([page["key"], page["title"], months]))
+
+
+def get_archive_output_filename(key, public_dir=None):
+    """
+    Get the filename of an archive page.
+
+    Args:
+        key (str): The key of the page, see `get_archive_pages`.
+        public_dir (str, optional): The public directory. Default is `public_dir`.
+    """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    return os.path.join(public_dir, *key.split("/"), "index.html")
+
+
+def generate_archive_pages(
+    posts, pages, public_dir=None, writer=None, asset_map=None, cache_directory=None
+):
+    """
+    Generate some archive pages.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        pages (list of dict): The pages to generate, as returned by `get_archive_pages`.
+        public_dir (str, optional): The public directory. Default is `public_dir`.
+        writer (PageWriter, optional): The writer pages are queued on. If not provided, pages are written directly.
+        asset_map (dict, optional): The fingerprinted URL of every asset.
+        cache_directory (str, optional): The build cache directory, where compiled templates are kept. Default is `cache_directory` from the configuration.
+
+    Returns:
+        list: The filenames of the generated pages.
+
+    Raises:
+        BlogTemplateError: If the archive template cannot be loaded or rendered.
+    """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    if not pages:
+        return []
+    template = get_template(
+        config.ARCHIVE_TEMPLATE,
+        config.TEMPLATE_DIRECTORY,
+        get_jinja_cache_directory(cache_directory),
+    )
+    from jinja2.exceptions import TemplateError
+
+    output_filenames = []
+    for page in pages:
+        output_filename = get_archive_output_filename(page["key"], public_dir)
+        # Links are relative to the page, through the site root
+        root = os.path.relpath(public_dir, os.path.dirname(output_filename))
+        root = root.replace(os.sep, "/") + "/"
+        years = {}
+        for month_key, rows in page["months"]:
+            year = month_key[:4]
+            if year not in years:
+                years[year] = {
+                    "name": year,
+                    "url": f"{root}{config.ARCHIVE_DIRECTORY}/{year}/index.html",
+                    "months": [],
+                }
+            years[year]["months"].append(
+                {
+                    "name": get_month_name(month_key),
+                    "url": f"{root}{config.ARCHIVE_DIRECTORY}/{month_key}/index.html",
+                    "count": len(rows),
+                    "posts": [posts[row] for row in rows] if page["lists_posts"] else [],
+                }
+            )
+        with profile_span("index", output_filename, template=config.ARCHIVE_TEMPLATE):
+            try:
+                output_html = template.render(
+                    config=config.parsed_config,
+                    title=page["title"],
+                    years=list(years.values()),
+                    root=root,
+                    navigation_links=None,
+                    asset_url=partial(get_asset_url, asset_map),
+                )
+            except TemplateError as e:
+                raise BlogTemplateError(f"Error while generating archive pages: {e}")
+        if writer is not None:
+            writer.write(output_filename, output_html)
+        else:
+            write_page(output_filename, output_html)
+        output_filenames.append(output_filename)
+    return output_filenames
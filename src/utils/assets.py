@@ -0,0 +1,204 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+from src.utils.handler import calculate_content_hash
+from src.utils.postprocess import MINIFIER_VERSION, minify_css
+from src.utils.writer import write_output
+
+# The number of hash characters in fingerprinted filenames
+FINGERPRINT_LENGTH = 10
+
+# src and href attributes, as markdown2 writes them
+ASSET_URL_PATTERN = re.compile(
+    r"""(?P<attribute>\b(?:src|href)=)(?P<quote>["'])(?P<url>[^"'>]*)(?P=quote)"""
+)
+RELATIVE_PREFIX_PATTERN = re.compile(r"(?:\.\.?/)*")
+
+
+def get_asset_paths(static_directory, exclude_directories=()):
+    """
+    List the asset files in the static directory.
+
+    Args:
+        static_directory (str): The static directory.
+        exclude_directories (iterable of str, optional): Directories to leave out, such as the posts directory.
+
+    Returns:
+        list of str: The paths of the assets, sorted.
+    """
+    excluded = {os.path.abspath(directory) for directory in exclude_directories}
+    asset_paths = []
+    for root, dirs, files in os.walk(static_directory):
+        dirs[:] = [
+            d
+            for d in dirs
+            if not d.startswith(".") and os.path.abspath(os.path.join(root, d)) not in excluded
+        ]
+        asset_paths.extend(
+            os.path.join(root, file) for file in files if not file.startswith(".")
+        )
+    return sorted(asset_paths)
+
+
+def get_fingerprinted_name(path, digest):
+    """
+    Add a content hash to a filename, before its extension: `style.css` becomes `style.<hash>.css`.
+
+    Args:
+        path (str): The path of the asset.
+        digest (str): The hash of the asset content.
+    """
+    name, extension = os.path.splitext(path)
+    return f"{name}.{digest[:FINGERPRINT_LENGTH]}{extension}"
+
+
+def is_minified_asset(path, minify):
+    """
+    Check whether an asset is published minified.
+
+    Args:
+        path (str): The path of the asset.
+        minify (bool): Whether minification is enabled.
+    """
+    return minify and path.endswith(".css")
+
+
+def get_asset_map(asset_hashes, static_directory, assets_directory, public_dir, minify=False):
+    """
+    Map every asset to its fingerprinted copy.
+
+    Args:
+        asset_hashes (dict): The hash of each asset file, by path.
+        static_directory (str): The static directory.
+        assets_directory (str): The directory fingerprinted copies are written to.
+        public_dir (str): The public directory; URLs are relative to it.
+        minify (bool, optional): Stylesheets are published minified, under a name of their own. Default is False.
+
+    Returns:
+        dict: The URL of each fingerprinted copy, by the URL of the original (e.g. `static/style.css`), both relative to the site root.
+    """
+    site_root = os.path.dirname(os.path.abspath(static_directory))
+    asset_map = {}
+    for path, digest in asset_hashes.items():
+        url = os.path.relpath(os.path.abspath(path), site_root).replace(os.sep, "/")
+        if is_minified_asset(path, minify):
+            digest = calculate_content_hash(f"minified-{MINIFIER_VERSION}:{digest}")
+        output = os.path.join(
+            assets_directory,
+            get_fingerprinted_name(os.path.relpath(path, static_directory), digest),
+        )
+        asset_map[url] = os.path.relpath(output, public_dir).replace(os.sep, "/")
+    return asset_map
+
+
+def copy_asset(source, destination, minify=False):
+    """
+    Copy an asset to its fingerprinted path, unless it is already there.
+
+    Fingerprinted paths change with the content, so an existing copy is
+    always up to date. The copy is written to a temporary file first and
+    renamed into place.
+
+    Args:
+        source (str): The path of the asset.
+        destination (str): The fingerprinted path.
+        minify (bool, optional): Minify the copy of a stylesheet. Default is False.
+
+    Returns:
+        bool: True if the asset was copied.
+    """
+    if os.path.exists(destination):
+        return False
+    destination_dir = os.path.dirname(destination)
+    os.makedirs(destination_dir, exist_ok=True)
+    if is_minified_asset(source, minify):
+        with open(source, encoding="utf-8") as f:
+            return write_output(destination, minify_css(f.read()))
+    fd, temp_path = tempfile.mkstemp(dir=destination_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, temp_path)
+        shutil.copymode(source, temp_path)
+        os.replace(temp_path, destination)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return True
+
+
+def publish_assets(
+    asset_paths, asset_map, static_directory, public_dir, manifest_filename, minify=False
+):
+    """
+    Copy the assets to their fingerprinted paths and write the asset manifest.
+
+    Args:
+        asset_paths (list of str): The paths of the assets.
+        asset_map (dict): The fingerprinted URL of each asset, as returned by `get_asset_map`.
+        static_directory (str): The static directory.
+        public_dir (str): The public directory.
+        manifest_filename (str): The path of the asset manifest.
+        minify (bool, optional): Minify stylesheets. Default is False.
+
+    Returns:
+        list of str: The paths of the files written: new copies, and the asset manifest if it changed.
+    """
+    site_root = os.path.dirname(os.path.abspath(static_directory))
+    written = []
+    for path in asset_paths:
+        url = os.path.relpath(os.path.abspath(path), site_root).replace(os.sep, "/")
+        destination = os.path.join(public_dir, asset_map[url])
+        if copy_asset(path, destination, minify):
+            written.append(destination)
+    os.makedirs(os.path.dirname(manifest_filename), exist_ok=True)
+    if write_output(manifest_filename, json.dumps(asset_map, indent=1, sort_keys=True)):
+        written.append(manifest_filename)
+    return written
+
+
+def get_asset_url(asset_map, url):
+    """
+    Get the fingerprinted URL of an asset, or the URL itself if it is not an asset.
+
+    Args:
+        asset_map (dict or None): The fingerprinted URL of each asset.
+        url (str): The URL of the asset relative to the site root, e.g. `static/style.css`.
+    """
+    if not asset_map:
+        return url
+    return asset_map.get(url.lstrip("/"), url)
+
+
+def rewrite_asset_urls(content, asset_map):
+    """
+    Point the `src` and `href` attributes of rendered HTML to fingerprinted assets.
+
+    Relative prefixes such as `../` are kept, so a URL keeps working from
+    the page it was written for.
+
+    Args:
+        content (str): The HTML.
+        asset_map (dict or None): The fingerprinted URL of each asset.
+    """
+    if not asset_map:
+        return content
+
+    def replace(match):
+        url = match.group("url")
+        prefix = RELATIVE_PREFIX_PATTERN.match(url).group(0)
+        # Keep any query string or fragment
+        path, fragment_separator, fragment = url[len(prefix):].partition("#")
+        path, query_separator, query = path.partition("?")
+        fingerprinted = asset_map.get(path)
+        if fingerprinted is None:
+            return match.group(0)
+        quote = match.group("quote")
+        return (
+            f"{match.group('attribute')}{quote}{prefix}{fingerprinted}"
+            f"{query_separator}{query}{fragment_separator}{fragment}{quote}"
+        )
+
+    return ASSET_URL_PATTERN.sub(replace, content)
@@ -0,0 +1,291 @@
+import os
+import sys
+from src.exceptions import PostNotFoundError
+from src.utils.handler import read_post_body
+from src.utils.profiler import profile_span
+
+# The metadata every post carries, in catalog column order
+POST_FIELDS = (
+    "id",
+    "type",
+    "tags",
+    "title",
+    "sanitized_title",
+    "synopsis",
+    "last_updated",
+    "date",
+    "rel_path",
+    "source_path",
+    "body_offset",
+)
+
+
+class Post:
+    """
+    A post's metadata, with its content read and rendered on first access.
+
+    `post.content` (also `post["content"]`, as posts used to be dictionaries)
+    reads the post body from `source_path` and renders it the first time it
+    is used. Until then, `"content" in post` is False.
+    """
+
+    __slots__ = POST_FIELDS + ("renderer", "render_cache", "_content")
+
+    def __init__(
+        self,
+        id=None,
+        type=None,
+        tags=(),
+        title=None,
+        sanitized_title=None,
+        synopsis=None,
+        last_updated=None,
+        date=None,
+        rel_path=None,
+        source_path=None,
+        body_offset=0,
+        renderer=None,
+        render_cache=None,
+    ):
+        """
+        Args:
+            renderer (callable, optional): Renders the Markdown body to HTML.
+            render_cache (RenderCache, optional): The cache of rendered Markdown.
+
+        The other arguments are the post's metadata, see POST_FIELDS.
+        """
+        self.id = id
+        self.type = type
+        self.tags = tags
+        self.title = title
+        self.sanitized_title = sanitized_title
+        self.synopsis = synopsis
+        self.last_updated = last_updated
+        self.date = date
+        self.rel_path = rel_path
+        self.source_path = source_path
+        self.body_offset = body_offset
+        self.renderer = renderer
+        self.render_cache = render_cache
+        self._content = None
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = self.load_content()
+        return self._content
+
+    def load_content(self):
+        """
+        Read and render the post body.
+
+        Returns:
+            str: The rendered HTML.
+
+        Raises:
+            PostNotFoundError: If the post file no longer exists.
+        """
+        with profile_span("markdown", self.source_path):
+            return self.render_body(self.read_body())
+
+    def read_body(self):
+        """
+        Read the Markdown body of the post, without its front matter.
+
+        Raises:
+            PostNotFoundError: If the post file no longer exists.
+        """
+        if not os.path.exists(self.source_path):
+            raise PostNotFoundError(self.source_path)
+        return read_post_body(self.source_path, self.body_offset)
+
+    def render_body(self, body):
+        """
+        Render a Markdown body read by `read_body`, through the render cache if there is one.
+
+        Args:
+            body (str): The Markdown body.
+
+        Returns:
+            str: The rendered HTML.
+        """
+        if self.render_cache is not None:
+            return self.render_cache.render(body, self.renderer)
+        return self.renderer(body)
+
+    def to_dict(self):
+        """
+        Get the post's metadata as a dictionary.
+        """
+        return {field: getattr(self, field) for field in POST_FIELDS}
+
+    def __getitem__(self, key):
+        if key == "content" or key in POST_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if key == "content":
+            return self._content is not None
+        return key in POST_FIELDS
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if not isinstance(other, Post):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in POST_FIELDS)
+
+    def __repr__(self):
+        return f"Post(id={self.id!r}, title={self.title!r})"
+
+
+class PostCatalog:
+    """
+    A compact, columnar collection of posts.
+
+    Metadata is stored one list per field instead of one object per post;
+    types and tags are interned, so repeated values are shared. Indexing or
+    iterating returns Post objects built on the fly, which load their content
+    on demand and release it when dropped. Rows of each type and of each tag,
+    and sorted orders, are indexed for fast filters and sorted views.
+    """
+
+    def __init__(self, posts=(), renderer=None, render_cache=None):
+        """
+        Args:
+            posts (iterable of Post, optional): The posts to add.
+            renderer (callable, optional): Renders Markdown to HTML for the posts built by the catalog.
+            render_cache (RenderCache, optional): The cache of rendered Markdown.
+        """
+        self.columns = {field: [] for field in POST_FIELDS}
+        self.renderer = renderer
+        self.render_cache = render_cache
+        self.type_rows = {}
+        self.tag_rows = {}
+        self.sorted_rows = {}
+        self.interned_tags = {}
+        for post in posts:
+            self.append(post)
+
+    def append(self, post):
+        """
+        Add a post to the catalog.
+
+        Args:
+            post (Post): The post to add.
+        """
+        row = len(self)
+        for field in POST_FIELDS:
+            value = getattr(post, field)
+            if field == "type" and value is not None:
+                value = sys.intern(value)
+            elif field == "tags":
+                value = tuple(sys.intern(tag) for tag in value)
+                value = self.interned_tags.setdefault(value, value)
+            self.columns[field].append(value)
+        self.type_rows.setdefault(self.columns["type"][row], []).append(row)
+        for tag in self.columns["tags"][row]:
+            rows = self.tag_rows.setdefault(tag, [])
+            # A post listing the same tag twice is indexed once
+            if not rows or rows[-1] != row:
+                rows.append(row)
+        self.sorted_rows.clear()
+
+    def get_post(self, row):
+        """
+        Build the Post stored at a row.
+
+        Args:
+            row (int): The row of the post.
+        """
+        return Post(
+            **{field: self.columns[field][row] for field in POST_FIELDS},
+            renderer=self.renderer,
+            render_cache=self.render_cache,
+        )
+
+    def column(self, field):
+        """
+        Get the values of one field for every post, in catalog order. Do not modify it.
+
+        Args:
+            field (str): The field, see POST_FIELDS.
+        """
+        return self.columns[field]
+
+    def of_type(self, post_type):
+        """
+        Get the posts of a type, in catalog order.
+
+        Args:
+            post_type (str or None): The type of the posts.
+        """
+        return [self.get_post(row) for row in self.type_rows.get(post_type, [])]
+
+    def count_type(self, post_type):
+        """
+        Count the posts of a type.
+
+        Args:
+            post_type (str or None): The type of the posts.
+        """
+        return len(self.type_rows.get(post_type, []))
+
+    def with_tag(self, tag):
+        """
+        Get the posts with a tag, in catalog order.
+
+        Args:
+            tag (str): The tag.
+        """
+        return [self.get_post(row) for row in self.tag_rows.get(tag, [])]
+
+    def tags(self):
+        """
+        Get every tag used by the posts, in order of first use.
+        """
+        return list(self.tag_rows)
+
+    def sorted_by(self, field, reverse=False):
+        """
+        Get every post sorted by a field; the order is computed once and kept until the catalog changes.
+
+        Args:
+            field (str): The field to sort by, see POST_FIELDS.
+            reverse (bool, optional): Sort in descending order. Default is False.
+        """
+        key = (field, reverse)
+        if key not in self.sorted_rows:
+            column = self.columns[field]
+            self.sorted_rows[key] = sorted(
+                range(len(self)),
+                key=lambda row: (column[row] is None, column[row]),
+                reverse=reverse,
+            )
+        return [self.get_post(row) for row in self.sorted_rows[key]]
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.get_post(row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.get_post(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("post catalog index out of range")
+        return self.get_post(index)
+
+    def __eq__(self, other):
+        if not isinstance(other, PostCatalog):
+            return NotImplemented
+        return self.columns == other.columns
@@ -0,0 +1,337 @@
+import datetime
+import heapq
+import itertools
+import json
+import os
+from urllib.parse import urljoin
+from xml.sax.saxutils import escape, quoteattr
+import src.config as config
+from src.utils.catalog import PostCatalog
+from src.utils.handler import calculate_content_hash
+from src.utils.pages import get_front_page_rows, get_index_filename, get_listing, write_page
+
+# The most URLs a single sitemap file may list, per the sitemap protocol
+MAX_SITEMAP_URLS = 50000
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+# The format of `last_updated`, in local time
+LAST_UPDATED_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_timestamp(last_updated):
+    """
+    Convert a `last_updated` value to the RFC 3339 format used by sitemaps and Atom.
+
+    Args:
+        last_updated (str): The time, as `YYYY-MM-DD HH:MM:SS` in local time.
+    """
+    timestamp = datetime.datetime.strptime(last_updated, LAST_UPDATED_FORMAT)
+    return timestamp.astimezone().isoformat()
+
+
+def get_url(site_url, path):
+    """
+    Get the absolute URL of a page.
+
+    Args:
+        site_url (str): The URL of the site root.
+        path (str): The path of the page, relative to the site root.
+    """
+    if not site_url.endswith("/"):
+        site_url = f"{site_url}/"
+    return urljoin(site_url, path.replace("\\", "/"))
+
+
+def lastmod_element(last_updated):
+    """
+    Format the `lastmod` element of a sitemap entry, empty when the time is not known.
+
+    Args:
+        last_updated (str or None): The time, see `format_timestamp`.
+    """
+    if last_updated is None:
+        return ""
+    return element("lastmod", format_timestamp(last_updated))
+
+
+def element(name, text):
+    """
+    Format an element holding text.
+
+    Args:
+        name (str): The name of the element.
+        text (str): The text, escaped here.
+    """
+    return f"<{name}>{escape(text)}</{name}>"
+
+
+def iter_urlset(entries):
+    """
+    Stream a sitemap, one chunk per URL.
+
+    Args:
+        entries (iterable of tuple): The `(url, last_updated)` of every page; `last_updated` may be None.
+
+    Yields:
+        str: The chunks of the sitemap.
+    """
+    yield XML_DECLARATION
+    yield f"<urlset xmlns={quoteattr(SITEMAP_NAMESPACE)}>\n"
+    for url, last_updated in entries:
+        yield f"<url>{element('loc', url)}{lastmod_element(last_updated)}</url>\n"
+    yield "</urlset>\n"
+
+
+def iter_sitemap_index(sitemaps):
+    """
+    Stream a sitemap index.
+
+    Args:
+        sitemaps (iterable of tuple): The `(url, last_updated)` of every sitemap; `last_updated` may be None.
+
+    Yields:
+        str: The chunks of the sitemap index.
+    """
+    yield XML_DECLARATION
+    yield f"<sitemapindex xmlns={quoteattr(SITEMAP_NAMESPACE)}>\n"
+    for url, last_updated in sitemaps:
+        yield f"<sitemap>{element('loc', url)}{lastmod_element(last_updated)}</sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def get_sitemap_filenames(url_count, filename="sitemap.xml", max_urls=MAX_SITEMAP_URLS):
+    """
+    Get the filenames of the sitemaps listing a number of URLs.
+
+    Up to `max_urls` URLs fit in `filename` itself; beyond that, `filename`
+    becomes a sitemap index and the URLs are split across
+    `sitemap-1.xml`, `sitemap-2.xml`, ...
+
+    Args:
+        url_count (int): The number of URLs.
+        filename (str, optional): The filename of the sitemap. Default is "sitemap.xml".
+        max_urls (int, optional): The most URLs per sitemap. Default is MAX_SITEMAP_URLS.
+
+    Returns:
+        list of str: The filenames of every sitemap file, the sitemap index last.
+    """
+    if url_count <= max_urls:
+        return [filename]
+    name, extension = filename.rsplit(".", 1)
+    sitemap_count = (url_count + max_urls - 1) // max_urls
+    filenames = [f"{name}-{number}.{extension}" for number in range(1, sitemap_count + 1)]
+    return filenames + [filename]
+
+
+def iter_sitemaps(entries, site_url, filename="sitemap.xml", max_urls=MAX_SITEMAP_URLS):
+    """
+    Split the URLs of a site into sitemaps, with a sitemap index when they do not fit in one.
+
+    Args:
+        entries (list of tuple): The `(url, last_updated)` of every page.
+        site_url (str): The URL of the site root, where the sitemaps are published.
+        filename (str, optional): The filename of the sitemap. Default is "sitemap.xml".
+        max_urls (int, optional): The most URLs per sitemap. Default is MAX_SITEMAP_URLS.
+
+    Yields:
+        tuple: The filename of each file and an iterator over its chunks.
+    """
+    filenames = get_sitemap_filenames(len(entries), filename, max_urls)
+    if len(filenames) == 1:
+        yield filename, iter_urlset(entries)
+        return
+    sitemaps = []
+    for number, sitemap_filename in enumerate(filenames[:-1]):
+        chunk = entries[number * max_urls:(number + 1) * max_urls]
+        dates = [last_updated for _, last_updated in chunk if last_updated is not None]
+        sitemaps.append((get_url(site_url, sitemap_filename), max(dates, default=None)))
+        yield sitemap_filename, iter_urlset(chunk)
+    yield filename, iter_sitemap_index(sitemaps)
+
+
+def iter_atom_feed(feed, entries):
+    """
+    Stream an Atom feed.
+
+    Args:
+        feed (dict): The `title`, `subtitle`, `url` (of the site), `feed_url`, `author` and `email` of the feed.
+        entries (iterable of dict): The `title`, `url`, `last_updated`, `summary` and `content` (HTML) of every entry, newest first.
+
+    Yields:
+        str: The chunks of the feed.
+    """
+    entries = iter(entries)
+    first = next(entries, None)
+    # A feed is as recent as its newest entry
+    updated = (
+        format_timestamp(first["last_updated"])
+        if first is not None
+        else datetime.datetime.fromtimestamp(0).astimezone().isoformat()
+    )
+    yield XML_DECLARATION
+    yield f"<feed xmlns={quoteattr(ATOM_NAMESPACE)}>\n"
+    yield element("title", feed["title"])
+    if feed.get("subtitle"):
+        yield element("subtitle", feed["subtitle"])
+    yield f"<link href={quoteattr(feed['feed_url'])} rel=\"self\"/>"
+    yield f"<link href={quoteattr(feed['url'])}/>"
+    yield element("id", feed["url"])
+    yield element("updated", updated)
+    author = element("name", feed["author"])
+    if feed.get("email"):
+        author += element("email", feed["email"])
+    yield f"<author>{author}</author>\n"
+    if first is None:
+        yield "</feed>\n"
+        return
+    for entry in itertools.chain([first], entries):
+        yield "<entry>"
+        yield element("title", entry["title"])
+        yield f"<link href={quoteattr(entry['url'])}/>"
+        yield element("id", entry["url"])
+        yield element("updated", format_timestamp(entry["last_updated"]))
+        if entry.get("summary"):
+            yield element("summary", entry["summary"])
+        yield f"<content type=\"html\">{escape(entry['content'])}</content>"
+        yield "</entry>\n"
+    yield "</feed>\n"
+
+
+def get_sitemap_entries(posts, site_url, index_filenames, tag_slugs, archive_keys=()):
+    """
+    List the URLs of every page of the site, for the sitemap.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        site_url (str): The URL of the site root.
+        index_filenames (list of str): The filenames of the index pages.
+        tag_slugs (iterable of str): The sanitized names of the tags.
+        archive_keys (iterable of str, optional): The keys of the archive pages, see `get_archive_pages`.
+
+    Returns:
+        list of tuple: The `(url, last_updated)` of every page; `last_updated` is None for listings.
+    """
+    if isinstance(posts, PostCatalog):
+        pages = zip(posts.column("rel_path"), posts.column("last_updated"))
+    else:
+        pages = ((post.rel_path, post.last_updated) for post in posts)
+    entries = [(get_url(site_url, filename), None) for filename in index_filenames]
+    entries.extend((get_url(site_url, rel_path), last_updated) for rel_path, last_updated in pages)
+    entries.extend(
+        (get_url(site_url, f"{config.TAGS_DIRECTORY}/{slug}/{get_index_filename(1)}"), None)
+        for slug in tag_slugs
+    )
+    entries.extend((get_url(site_url, f"{key}/index.html"), None) for key in archive_keys)
+    return entries
+
+
+def get_feed_rows(posts, feed_size=None):
+    """
+    Get the positions of the latest posts, newest first, for the feed.
+
+    Posts are ordered by their `date`, which only falls back to when the
+    file was last modified if the front matter has none, so checking out
+    or touching a post does not reshuffle the feed.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        feed_size (int, optional): The number of posts in the feed. Default is `feed_size` from the configuration.
+    """
+    if feed_size is None:
+        feed_size = config.FEED_SIZE
+    if isinstance(posts, PostCatalog):
+        dates = posts.column("date")
+    else:
+        dates = [post.date for post in posts]
+    return heapq.nlargest(
+        feed_size, get_front_page_rows(posts), key=lambda row: (dates[row], row)
+    )
+
+
+def get_feed_hash(posts, rows, file_hashes):
+    """
+    Hash everything the feed shows, so it is only written again when it changes.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        rows (list of int): The positions of the posts in the feed.
+        file_hashes (dict): The hash of each post source, by path; covers the post contents.
+    """
+    entries = [
+        listing + [file_hashes[posts[row].source_path]]
+        for row, listing in zip(rows, get_listing(posts, rows))
+    ]
+    return calculate_content_hash(json.dumps(entries))
+
+
+def generate_sitemap(entries, site_url, public_dir=None, writer=None):
+    """
+    Write the sitemap, split under a sitemap index when it has too many URLs for one file.
+
+    The XML is streamed to the writer a URL at a time.
+
+    Args:
+        entries (list of tuple): The pages to list, as returned by `get_sitemap_entries`.
+        site_url (str): The URL of the site root.
+        public_dir (str, optional): The public directory. Default is `public_dir`.
+        writer (PageWriter, optional): The writer the files are queued on. If not provided, files are written directly.
+
+    Returns:
+        list of str: The filenames of the sitemap files.
+    """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    output_filenames = []
+    for filename, output in iter_sitemaps(entries, site_url, config.SITEMAP_FILENAME):
+        output_filename = os.path.join(public_dir, filename)
+        if writer is not None:
+            writer.write(output_filename, output)
+        else:
+            write_page(output_filename, output)
+        output_filenames.append(output_filename)
+    return output_filenames
+
+
+def generate_feed(posts, rows, site_url, public_dir=None, writer=None):
+    """
+    Write the Atom feed of the latest posts.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        rows (list of int): The positions of the posts in the feed, newest first, as returned by `get_feed_rows`.
+        site_url (str): The URL of the site root.
+        public_dir (str, optional): The public directory. Default is `public_dir`.
+        writer (PageWriter, optional): The writer the feed is queued on. If not provided, it is written directly.
+
+    Returns:
+        str: The filename of the feed.
+    """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    feed = {
+        "title": config.parsed_config["blog_title"],
+        "subtitle": config.parsed_config["description"],
+        "url": get_url(site_url, ""),
+        "feed_url": get_url(site_url, config.FEED_FILENAME),
+        "author": config.parsed_config["author"],
+        "email": config.parsed_config["email"],
+    }
+    # Posts are rendered here rather than on the writer threads; entries are
+    # dated by the post `date`, like their order, not by the file's mtime
+    entries = [
+        {
+            "title": post.title,
+            "url": get_url(site_url, post.rel_path),
+            "last_updated": post.date,
+            "summary": post.synopsis,
+            "content": post.content,
+        }
+        for post in (posts[row] for row in rows)
+    ]
+    output_filename = os.path.join(public_dir, config.FEED_FILENAME)
+    if writer is not None:
+        writer.write(output_filename, iter_atom_feed(feed, entries))
+    else:
+        write_page(output_filename, iter_atom_feed(feed, entries))
+    return output_filename
@@ -1,17 +1,12 @@
 import hashlib
+import io
 import json
 import os
 import re
-import shelve
-import shutil
-import sys
-import tempfile
 from src.exceptions import (
     BlogTemplateError,
 )
 from functools import lru_cache
-from jinja2 import Environment, FileSystemLoader
-from jinja2.exceptions import TemplateError
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 IGNORED_DIRECTORIES = ["venv", ".git", "__pycache__"]  # for debugging purposes
@@ -63,8 +58,8 @@ def create_directory(directory_path):
     Args:
         directory_path (str): The path of the directory to create.
     """
-    if not os.path.exists(directory_path):
-        os.makedirs(directory_path)
+    # Worker processes may create the same directory at the same time
+    os.makedirs(directory_path, exist_ok=True)
 
 
 def calculate_hash(root_directory, ignore_dirs=IGNORED_DIRECTORIES, ignore_files=None):
@@ -104,6 +99,41 @@ def calculate_hash(root_directory, ignore_dirs=IGNORED_DIRECTORIES, ignore_files
     return hash_object.hexdigest()
 
 
+def calculate_content_hash(content):
+    """
+    Calculate the hash of a string or bytes object.
+
+    Args:
+        content (str or bytes): The content to hash.
+
+    Returns:
+        str: The calculated hash.
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha1(content).hexdigest()
+
+
+def calculate_file_hash(file_path):
+    """
+    Calculate the hash of a single file's contents.
+
+    Args:
+        file_path (str): The path of the file to hash.
+
+    Returns:
+        str: The calculated hash.
+    """
+    hash_object = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        while True:
+            data = f.read(1 << 20)
+            if not data:
+                break
+            hash_object.update(data)
+    return hash_object.hexdigest()
+
+
 def load_old_hash(path):
     """
     Load the old hash from a file.
@@ -222,6 +252,54 @@ def extract_metadata(post_content):
         return None
 
 
+def read_front_matter(file_path):
+    """
+    Read the metadata block at the top of a post without reading the rest of the file.
+
+    Args:
+        file_path (str): The path of the post.
+
+    Returns:
+        tuple: The extracted metadata (or None if the post has no metadata block) and the byte offset where the post body starts.
+    """
+    with open(file_path, "rb") as post_file:
+        first_line = post_file.readline()
+        if first_line.rstrip(b"\r\n") != b"---":
+            return None, 0
+        lines = [first_line]
+        for line in post_file:
+            lines.append(line)
+            if line.startswith(b"---"):
+                header = b"".join(lines)
+                metadata = extract_metadata(header.decode("utf-8").replace("\r\n", "\n"))
+                if metadata is None:
+                    return None, 0
+                # The body starts right after the closing dashes
+                return metadata, len(header) - len(line) + 3
+    return None, 0
+
+
+def read_post_body(file_path, body_offset):
+    """
+    Read the body of a post, seeking past its front matter instead of reading it again.
+
+    Args:
+        file_path (str): The path of the post.
+        body_offset (int): The byte offset where the body starts, as returned by `read_front_matter`.
+
+    Returns:
+        str: The post body.
+    """
+    with open(file_path, "rb") as post_file:
+        if body_offset:
+            post_file.seek(body_offset - 3)
+            if post_file.read(3) != b"---":
+                # The front matter changed since the offset was read
+                _, body_offset = read_front_matter(file_path)
+            post_file.seek(body_offset)
+        return io.TextIOWrapper(post_file, encoding="utf-8").read()
+
+
 def extract_post_content(post_content):
     """
     Extract the content from the given post.
@@ -256,29 +334,62 @@ def sanitize_title(title):
 
 
 @lru_cache(maxsize=None)
-def get_template(template_name, template_directory):
+def get_environment(template_directory, bytecode_cache_directory=None):
+    """
+    Get the Jinja environment shared by every template in a directory.
+
+    The environment keeps compiled templates in memory and reloads any template
+    whose file changed. With a bytecode cache directory, compiled templates are
+    also kept on disk; entries are checked against the template source, so an
+    edited template is never served from the cache.
+
+    Args:
+        template_directory (str): The directory containing the templates.
+        bytecode_cache_directory (str, optional): The directory where compiled templates are cached. Default is no disk cache.
+
+    Returns:
+        Environment: The shared environment.
+    """
+    # Jinja is imported when the first template is needed, not at start-up
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    bytecode_cache = None
+    if bytecode_cache_directory is not None:
+        create_directory(bytecode_cache_directory)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_directory)
+    environment = Environment(
+        loader=FileSystemLoader(template_directory),
+        bytecode_cache=bytecode_cache,
+        auto_reload=True,
+    )
+    # Templates link to tag pages by their sanitized name
+    environment.filters["sanitize_title"] = sanitize_title
+    return environment
+
+
+def get_template(template_name, template_directory, bytecode_cache_directory=None):
     """
     Get a template from the template directory.
 
     Args:
         template_name (str): The name of the template.
         template_directory (str): The directory containing the templates.
+        bytecode_cache_directory (str, optional): The directory where compiled templates are cached. Default is no disk cache.
 
     Returns:
         The template if found, None otherwise.
 
     Raises:
-        PostTemplateError: If there is an error loading the template.
+        BlogTemplateError: If there is an error loading the template.
     """
-
-    template_path = os.path.join(template_directory, template_name)
+    from jinja2.exceptions import TemplateNotFound, TemplateSyntaxError
 
     try:
-        environment = Environment(loader=FileSystemLoader(template_directory))
+        environment = get_environment(template_directory, bytecode_cache_directory)
         template = environment.get_template(template_name)
         if template is not None:
             return template
-    except (TemplateError.TemplateNotFound, TemplateError.TemplateSyntaxError) as e:
+    except (TemplateNotFound, TemplateSyntaxError) as e:
         raise BlogTemplateError(
             post_template=template_name,
             template_directory=template_directory,
@@ -0,0 +1,163 @@
+import html
+import json
+import os
+import posixpath
+import re
+from urllib.parse import unquote, urlsplit
+from src.utils.manifest import get_file_signature
+from src.utils.writer import write_output
+
+LINK_GRAPH_VERSION = 1
+# href and src attributes; data-src and the like are not links
+LINK_PATTERN = re.compile(
+    r"""(?<![\w-])(?:href|src)\s*=\s*(?:"(?P<double>[^"]*)"|'(?P<single>[^']*)')""",
+    re.IGNORECASE,
+)
+# The pages a visitor arrives at without following a link
+ENTRY_PAGES = ("index.html",)
+
+
+def extract_links(content):
+    """
+    Get the URL of every `href` and `src` attribute of a page, in one pass over its HTML.
+
+    Args:
+        content (str): The HTML of the page.
+
+    Returns:
+        list of str: The URLs, in order and without duplicates.
+    """
+    urls = {}
+    for match in LINK_PATTERN.finditer(content):
+        url = match.group("double")
+        if url is None:
+            url = match.group("single")
+        urls.setdefault(html.unescape(url).strip(), None)
+    return list(urls)
+
+
+def resolve_link(page, url):
+    """
+    Resolve a link of a page to the site file it points to.
+
+    Args:
+        page (str): The path of the page, relative to the site root, with forward slashes.
+        url (str): The URL of the link.
+
+    Returns:
+        str or None: The path of the target relative to the site root, `..` first if it is outside the site, or None for links that are not to a site file (other sites, absolute paths, `mailto:` and the like, and fragments of the page itself).
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path or parts.path.startswith("/"):
+        return None
+    path = posixpath.join(posixpath.dirname(page), unquote(parts.path))
+    if path.endswith("/"):
+        path += "index.html"
+    return posixpath.normpath(path)
+
+
+class LinkGraph:
+    """
+    The links between the pages of the site, kept between builds.
+
+    The state file records the stat signature of every page and the links
+    found in it, already resolved; only pages whose file changed are read
+    and scanned again. Checking the graph is a set lookup per link, so a
+    build stays linear in the number of links.
+    """
+
+    def __init__(self, state_file):
+        """
+        Args:
+            state_file (str): The path of the file keeping the graph between builds.
+        """
+        self.state_file = state_file
+        self.pages = self.load_state()
+        self.changed = False
+
+    def load_state(self):
+        """
+        Load the graph of the previous build; a missing or outdated state yields an empty graph.
+        """
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(state, dict) or state.get("version") != LINK_GRAPH_VERSION:
+            return {}
+        return state["pages"]
+
+    def update(self, pages, root):
+        """
+        Bring the graph up to date with the pages of the site.
+
+        Args:
+            pages (iterable of str): The paths of the HTML pages.
+            root (str): The site root, that links are resolved from.
+
+        Returns:
+            int: The number of pages scanned again.
+        """
+        scanned = 0
+        current = {}
+        for path in pages:
+            page = os.path.relpath(path, root).replace(os.sep, "/")
+            try:
+                signature = get_file_signature(path)
+            except FileNotFoundError:
+                continue
+            entry = self.pages.get(page)
+            if entry is None or entry["stat"] != signature:
+                with open(path, encoding="utf-8") as f:
+                    urls = extract_links(f.read())
+                links = []
+                for url in urls:
+                    target = resolve_link(page, url)
+                    if target is not None:
+                        links.append([url, target])
+                entry = {"stat": signature, "links": links}
+                scanned += 1
+            current[page] = entry
+        if scanned or current.keys() != self.pages.keys():
+            self.changed = True
+        self.pages = current
+        return scanned
+
+    def check(self, targets, entry_pages=ENTRY_PAGES):
+        """
+        Find the broken links and the pages no other page links to.
+
+        Args:
+            targets (set of str): The paths of every file of the site, relative to its root, with forward slashes; the pages are included.
+            entry_pages (tuple of str, optional): The pages that need no link to them. Default is ENTRY_PAGES.
+
+        Returns:
+            tuple: The broken links, as sorted `(page, url)` pairs, and the sorted paths of the unreferenced pages.
+        """
+        broken = []
+        referenced = set(entry_pages)
+        for page, entry in self.pages.items():
+            for url, target in entry["links"]:
+                if target in targets:
+                    if target != page:
+                        referenced.add(target)
+                else:
+                    broken.append((page, url))
+        orphans = sorted(page for page in self.pages if page not in referenced)
+        return sorted(broken), orphans
+
+    def save(self):
+        """
+        Write the state file, if the graph changed.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        if not self.changed:
+            return False
+        self.changed = False
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        return write_output(
+            self.state_file, json.dumps({"version": LINK_GRAPH_VERSION, "pages": self.pages})
+        )
@@ -0,0 +1,238 @@
+import json
+import os
+from src.utils.handler import (
+    PROJECT_ROOT,
+    calculate_content_hash,
+    calculate_file_hash,
+)
+
+MANIFEST_VERSION = 2
+
+
+def new_manifest(fingerprint=None):
+    """
+    Create an empty build manifest.
+
+    Args:
+        fingerprint (str, optional): The template/config fingerprint of the build.
+
+    Returns:
+        dict: An empty manifest.
+    """
+    return {
+        "version": MANIFEST_VERSION,
+        "fingerprint": fingerprint,
+        "options": {},
+        "files": {},
+        "posts": {},
+        "pages": {},
+        "assets": [],
+    }
+
+
+def load_manifest(path):
+    """
+    Load a build manifest from a file.
+
+    A missing, unreadable or outdated manifest yields an empty one, which makes
+    the next build render everything.
+
+    Args:
+        path (str): The path of the manifest file.
+
+    Returns:
+        dict: The loaded manifest.
+    """
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return new_manifest()
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return new_manifest()
+    for section in ("options", "files", "posts", "pages"):
+        manifest.setdefault(section, {})
+    manifest.setdefault("assets", [])
+    return manifest
+
+
+def load_cached_manifest(path, manifest_cache=None):
+    """
+    Load a build manifest, reusing the copy a long-running process keeps in memory while the file is unchanged.
+
+    Args:
+        path (str): The path of the manifest file.
+        manifest_cache (dict, optional): The manifests kept in memory between builds, by path; updated in place. If not provided, the file is always loaded.
+
+    Returns:
+        dict: The loaded manifest. Do not modify it.
+    """
+    if manifest_cache is None:
+        return load_manifest(path)
+    try:
+        signature = get_file_signature(path)
+    except FileNotFoundError:
+        manifest_cache.pop(path, None)
+        return load_manifest(path)
+    cached = manifest_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    manifest = load_manifest(path)
+    manifest_cache[path] = (signature, manifest)
+    return manifest
+
+
+def save_manifest(manifest, path, manifest_cache=None):
+    """
+    Save a build manifest to a file.
+
+    Args:
+        manifest (dict): The manifest to save.
+        path (str): The path of the file to save the manifest to.
+        manifest_cache (dict, optional): The manifests kept in memory between builds, see `load_cached_manifest`; the saved manifest replaces the cached one.
+    """
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    if manifest_cache is not None:
+        manifest_cache[path] = (get_file_signature(path), manifest)
+
+
+def relative_path(path, root=PROJECT_ROOT):
+    """
+    Get a portable, project-relative path for the manifest.
+
+    Args:
+        path (str): The path to convert.
+        root (str, optional): The directory paths are relative to. Defaults to PROJECT_ROOT.
+
+    Returns:
+        str: The relative path, always using forward slashes.
+    """
+    return os.path.relpath(os.path.abspath(path), root).replace(os.sep, "/")
+
+
+def get_file_signature(path):
+    """
+    Get the stat signature used to tell whether a file may have changed.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        list: The file's size, modification time in nanoseconds and inode.
+    """
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def scan_files(paths, file_table, root=PROJECT_ROOT, max_workers=None):
+    """
+    Hash a set of files, reusing the recorded hash of every file whose stat signature is unchanged.
+
+    Only files whose size, modification time or inode changed are read, and
+    those are hashed in a thread pool (hashlib releases the GIL while hashing).
+
+    Args:
+        paths (list): The paths of the files to scan.
+        file_table (dict): The `files` section of the previous manifest.
+        root (str, optional): The directory paths are relative to. Defaults to PROJECT_ROOT.
+        max_workers (int, optional): The number of hashing threads. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        tuple: The new file table, and the sorted relative paths of the files that were hashed again.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    files = {}
+    to_hash = []
+    for path in paths:
+        rel_path = relative_path(path, root)
+        signature = get_file_signature(path)
+        cached = file_table.get(rel_path)
+        if cached is not None and cached.get("stat") == signature:
+            files[rel_path] = cached
+        else:
+            to_hash.append((rel_path, path, signature))
+
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            digests = executor.map(calculate_file_hash, [path for _, path, _ in to_hash])
+            for (rel_path, _, signature), digest in zip(to_hash, digests):
+                files[rel_path] = {"stat": signature, "hash": digest}
+
+    return files, sorted(rel_path for rel_path, _, _ in to_hash)
+
+
+def get_build_fingerprint(template_hashes, config, asset_map=None):
+    """
+    Fingerprint the inputs shared by every page: the templates, the configuration and the asset URLs.
+
+    Args:
+        template_hashes (dict): The hash of every template file, by relative path.
+        config (dict): The parsed configuration.
+        asset_map (dict, optional): The fingerprinted URL of every asset.
+
+    Returns:
+        str: The calculated fingerprint.
+    """
+    return calculate_content_hash(
+        json.dumps([template_hashes, config, asset_map or {}], sort_keys=True)
+    )
+
+
+def is_entry_stale(old_entry, new_entry, root=PROJECT_ROOT):
+    """
+    Check whether an output must be rendered again.
+
+    Args:
+        old_entry (dict or None): The entry recorded by the previous build.
+        new_entry (dict): The entry for the current build.
+        root (str, optional): The directory output paths are relative to. Defaults to PROJECT_ROOT.
+
+    Returns:
+        bool: True if the inputs changed or any recorded output is missing.
+    """
+    if old_entry is None:
+        return True
+    for key, value in new_entry.items():
+        if old_entry.get(key) != value:
+            return True
+    return not all(
+        os.path.exists(os.path.join(root, output)) for output in new_entry["outputs"]
+    )
+
+
+def get_outputs(manifest):
+    """
+    Get every output recorded in a manifest.
+
+    Args:
+        manifest (dict): The manifest.
+
+    Returns:
+        set: The relative paths of the outputs.
+    """
+    outputs = set()
+    for section in ("posts", "pages"):
+        for entry in manifest[section].values():
+            outputs.update(entry.get("outputs", []))
+    return outputs
+
+
+def get_stale_outputs(old_manifest, new_manifest):
+    """
+    Get outputs recorded by the previous build that the current build no longer produces.
+
+    Fingerprinted assets are included, so the copies of an asset's previous
+    versions are removed once no page links to them.
+
+    Args:
+        old_manifest (dict): The manifest of the previous build.
+        new_manifest (dict): The manifest of the current build.
+
+    Returns:
+        list: The sorted relative paths of stale outputs.
+    """
+    old_outputs = get_outputs(old_manifest) | set(old_manifest.get("assets", []))
+    new_outputs = get_outputs(new_manifest) | set(new_manifest.get("assets", []))
+    return sorted(old_outputs - new_outputs)
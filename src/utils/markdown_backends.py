@@ -0,0 +1,159 @@
+import logging
+from collections import namedtuple
+from functools import partial
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = "markdown2"
+
+# A Markdown implementation: `render` takes Markdown and returns HTML
+MarkdownBackend = namedtuple("MarkdownBackend", ["name", "version", "options", "render"])
+
+
+def load_markdown2(options):
+    """
+    Load markdown2, the default backend. The options are markdown2 extras.
+
+    Args:
+        options (list of str): The extras to enable.
+    """
+    import markdown2
+
+    return MarkdownBackend(
+        "markdown2", markdown2.__version__, options, partial(markdown2.markdown, extras=options)
+    )
+
+
+def load_python_markdown(options):
+    """
+    Load Python-Markdown. The options are Python-Markdown extensions.
+
+    Args:
+        options (list of str): The extensions to enable.
+    """
+    import markdown
+
+    return MarkdownBackend(
+        "markdown", markdown.__version__, options, partial(markdown.markdown, extensions=options)
+    )
+
+
+def load_mistune(options):
+    """
+    Load mistune. The options are mistune plugins.
+
+    Args:
+        options (list of str): The plugins to enable.
+    """
+    import mistune
+
+    return MarkdownBackend(
+        "mistune", mistune.__version__, options, mistune.create_markdown(plugins=options)
+    )
+
+
+def load_markdown_it(options):
+    """
+    Load markdown-it-py, in CommonMark mode. The options are the rules to enable on top of it.
+
+    Args:
+        options (list of str): The rules to enable, such as "table" or "strikethrough".
+    """
+    import markdown_it
+
+    parser = markdown_it.MarkdownIt("commonmark")
+    if options:
+        parser.enable(options)
+    return MarkdownBackend("markdown-it", markdown_it.__version__, options, parser.render)
+
+
+def load_cmarkgfm(options):
+    """
+    Load cmarkgfm, the C implementation of GitHub Flavored Markdown. The options are unused.
+
+    Args:
+        options (list of str): Unused.
+    """
+    import cmarkgfm
+
+    return MarkdownBackend(
+        "cmarkgfm",
+        getattr(cmarkgfm, "__version__", "unknown"),
+        options,
+        cmarkgfm.github_flavored_markdown_to_html,
+    )
+
+
+# The loader of every supported backend, by the name used in the configuration
+MARKDOWN_BACKENDS = {
+    "markdown2": load_markdown2,
+    "markdown": load_python_markdown,
+    "mistune": load_mistune,
+    "markdown-it": load_markdown_it,
+    "cmarkgfm": load_cmarkgfm,
+}
+
+
+def get_markdown_backend(name=DEFAULT_BACKEND, options=None):
+    """
+    Load a Markdown backend.
+
+    Args:
+        name (str, optional): The name of the backend, a key of MARKDOWN_BACKENDS. Default is DEFAULT_BACKEND.
+        options (list of str, optional): The backend options, see the loaders.
+
+    Returns:
+        MarkdownBackend: The backend.
+
+    Raises:
+        ValueError: If the backend is unknown.
+        ImportError: If the backend is not installed.
+    """
+    if name not in MARKDOWN_BACKENDS:
+        raise ValueError(
+            f"Error: Unknown Markdown backend '{name}'. "
+            f"Choose one of: {', '.join(MARKDOWN_BACKENDS)}."
+        )
+    return MARKDOWN_BACKENDS[name](list(options or []))
+
+
+def load_markdown_backend(name=DEFAULT_BACKEND, options=None):
+    """
+    Load the configured Markdown backend, falling back to DEFAULT_BACKEND when it is not installed.
+
+    Args:
+        name (str, optional): The name of the backend. Default is DEFAULT_BACKEND.
+        options (list of str, optional): The backend options; not passed on to the fallback.
+
+    Returns:
+        MarkdownBackend: The backend.
+    """
+    try:
+        return get_markdown_backend(name, options)
+    except ImportError:
+        if name == DEFAULT_BACKEND:
+            raise
+        logger.warning(
+            f"Markdown backend '{name}' is not installed, using '{DEFAULT_BACKEND}' instead."
+        )
+        return get_markdown_backend(DEFAULT_BACKEND)
+
+
+def get_available_backends(options=None):
+    """
+    Load every installed backend.
+
+    Args:
+        options (dict, optional): The options of each backend, by name.
+
+    Returns:
+        dict: The installed backends, by name.
+    """
+    options = options or {}
+    backends = {}
+    for name in MARKDOWN_BACKENDS:
+        try:
+            backends[name] = get_markdown_backend(name, options.get(name))
+        except ImportError:
+            continue
+    return backends
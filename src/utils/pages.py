@@ -0,0 +1,164 @@
+import logging
+import os
+from functools import partial
+import src.config as config
+from src.exceptions import BlogTemplateError
+from src.utils.assets import get_asset_url
+from src.utils.catalog import PostCatalog
+from src.utils.handler import create_directory, get_template
+from src.utils.profiler import profile_span
+from src.utils.writer import write_output
+
+logger = logging.getLogger(__name__)
+
+# The post fields shown on index and tag pages
+LISTING_FIELDS = ("title", "synopsis", "last_updated", "date", "rel_path")
+
+
+def get_jinja_cache_directory(cache_directory=None):
+    """
+    Get the directory compiled templates are cached in; builds sharing a cache share them.
+
+    Args:
+        cache_directory (str, optional): The build cache directory. Default is `cache_directory` from the configuration.
+    """
+    if cache_directory is None:
+        cache_directory = config.CACHE_DIRECTORY
+    return os.path.join(cache_directory, "jinja")
+
+
+def write_page(output_filename, output_html):
+    """
+    Write the output HTML to a file, atomically and only if its content changed.
+
+    Args:
+        output_filename (str): The filename of the output file.
+        output_html (str): The HTML to write to the output file.
+
+    Returns:
+        bool: True if the file was written, False if it was already up to date.
+    """
+    output_dir = os.path.dirname(output_filename)
+    output_target = os.path.join(config.PROJECT_ROOT, output_dir)
+    logger.info(f"Writing {output_filename} on {output_dir}")
+    create_directory(output_target)
+    return write_output(output_filename, output_html)
+
+
+def get_index_filename(page_number):
+    """
+    Get the filename of an index page.
+
+    Args:
+        page_number (int): The page number, starting at 1.
+    """
+    return "index.html" if page_number == 1 else f"{page_number}.html"
+
+
+def count_pages(post_count, posts_per_page):
+    """
+    Count the pages needed to list a number of posts.
+
+    Args:
+        post_count (int): The number of posts.
+        posts_per_page (int): The maximum number of posts to display on each page.
+    """
+    return (post_count + posts_per_page - 1) // posts_per_page
+
+
+def get_navigation_links(page_number, total_pages):
+    """
+    Get the navigation links of a listing page.
+
+    Args:
+        page_number (int): The page number, starting at 1.
+        total_pages (int): The number of pages in the listing.
+    """
+    return {
+        "index": page_number,
+        "prev": None if page_number == 1 else get_index_filename(page_number - 1),
+        "next": None if page_number == total_pages else f"{page_number + 1}.html",
+    }
+
+
+def get_front_page_rows(posts):
+    """
+    Get the positions of the posts listed on the index pages.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+    """
+    if isinstance(posts, PostCatalog):
+        return list(posts.type_rows.get("post", []))
+    return [row for row, post in enumerate(posts) if post.type == "post"]
+
+
+def get_listing(posts, rows=None):
+    """
+    Get the fields listing pages show for some posts, without building Post objects for a catalog.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        rows (list of int, optional): The positions of the posts to list. Default is every post.
+    """
+    if rows is None:
+        rows = range(len(posts))
+    if isinstance(posts, PostCatalog):
+        columns = [posts.column(field) for field in LISTING_FIELDS]
+        return [[column[row] for column in columns] for row in rows]
+    return [[getattr(posts[row], field) for field in LISTING_FIELDS] for row in rows]
+
+
+def generate_index_page(
+    posts,
+    output_dir=None,
+    navigation_links=None,
+    writer=None,
+    template_name=None,
+    tag=None,
+    filename=None,
+    asset_map=None,
+    cache_directory=None,
+):
+    """
+    Generate an index page for a blog.
+
+    Args:
+        posts (PostCatalog or list of Post): The list of blog posts to include in the index page.
+        output_dir (str): The directory where the output should be stored.
+        navigation_links (dict, optional): Navigation links for the index page.
+        writer (PageWriter, optional): The writer the page is queued on. If not provided, the page is written directly.
+        template_name (str, optional): The template of the page. Default is `index_template` from the configuration.
+        tag (str, optional): The tag the page lists posts for, if it is a tag page.
+        filename (str, optional): The filename of the page. Default is named after the page number in `navigation_links`.
+        asset_map (dict, optional): The fingerprinted URL of every asset, for `asset_url` in templates.
+        cache_directory (str, optional): The build cache directory, where compiled templates are kept. Default is `cache_directory` from the configuration.
+    """
+    if output_dir is None:
+        output_dir = config.PUBLIC_DIR
+    if template_name is None:
+        template_name = config.INDEX_TEMPLATE
+    try:
+        template = get_template(
+            template_name,
+            config.TEMPLATE_DIRECTORY,
+            get_jinja_cache_directory(cache_directory),
+        )
+    except BlogTemplateError as e:
+        print(f"Error while generating index page: {e}")
+    if navigation_links:
+        index = navigation_links["index"]
+    output_filename = os.path.join(output_dir, filename or get_index_filename(index))
+    with profile_span("index", output_filename, template=template_name):
+        output_html = template.render(
+            config=config.parsed_config,
+            posts=posts,
+            navigation_links=navigation_links,
+            tag=tag,
+            asset_url=partial(get_asset_url, asset_map),
+        )
+    if writer is not None:
+        writer.write(output_filename, output_html)
+    else:
+        write_page(output_filename, output_html)
+    return output_filename
@@ -0,0 +1,94 @@
+import asyncio
+
+# The most items waiting between two stages
+PIPELINE_QUEUE_SIZE = 16
+# The number of items read, and of outputs written, at the same time
+PIPELINE_IO_TASKS = 4
+
+
+async def run_pipeline(
+    items,
+    read,
+    render,
+    write,
+    render_executor=None,
+    render_tasks=1,
+    io_tasks=PIPELINE_IO_TASKS,
+    queue_size=PIPELINE_QUEUE_SIZE,
+):
+    """
+    Stream items through a read, a render and a write stage.
+
+    The stages run concurrently and are connected by bounded queues: reads
+    and writes run on the event loop's default thread pool, so disk latency
+    is hidden behind rendering, and rendering runs on `render_executor`.
+    When a stage falls behind, the stages before it wait for room in its
+    queue, so at most about `2 * queue_size` items are held in memory
+    whatever the number of items. The first error raised by any stage
+    stops the pipeline and is raised again.
+
+    Args:
+        items (iterable): The items to process; consumed lazily.
+        read (callable): Takes an item and returns its input; runs on a thread.
+        render (callable): Takes an item and its input and returns an output; runs on `render_executor`, so it must be picklable for a process pool.
+        write (callable): Takes an output and returns a result; runs on a thread.
+        render_executor (concurrent.futures.Executor, optional): The executor rendering runs on. Default is the event loop's default executor.
+        render_tasks (int, optional): The number of items rendered at the same time; match it to the executor's workers. Default is 1.
+        io_tasks (int, optional): The number of items read, and of outputs written, at the same time. Default is PIPELINE_IO_TASKS.
+        queue_size (int, optional): The most items waiting between two stages. Default is PIPELINE_QUEUE_SIZE.
+
+    Returns:
+        list: The results of `write`, in the order the outputs were written.
+    """
+    loop = asyncio.get_running_loop()
+    items = iter(items)
+    read_queue = asyncio.Queue(maxsize=queue_size)
+    write_queue = asyncio.Queue(maxsize=queue_size)
+    results = []
+
+    async def reader():
+        # Readers share the iterator; the event loop runs one step at a time
+        for item in items:
+            data = await loop.run_in_executor(None, read, item)
+            await read_queue.put((item, data))
+
+    async def renderer():
+        while True:
+            entry = await read_queue.get()
+            if entry is None:
+                return
+            output = await loop.run_in_executor(render_executor, render, *entry)
+            await write_queue.put(output)
+
+    async def writer():
+        while True:
+            output = await write_queue.get()
+            if output is None:
+                return
+            results.append(await loop.run_in_executor(None, write, output))
+
+    async def run_stage(workers, next_queue, next_workers):
+        await asyncio.gather(*workers)
+        # Tell every worker of the next stage that no more items are coming
+        for _ in range(next_workers):
+            await next_queue.put(None)
+
+    render_tasks = max(1, render_tasks)
+    io_tasks = max(1, io_tasks)
+    stages = [
+        asyncio.ensure_future(
+            run_stage([reader() for _ in range(io_tasks)], read_queue, render_tasks)
+        ),
+        asyncio.ensure_future(
+            run_stage([renderer() for _ in range(render_tasks)], write_queue, io_tasks)
+        ),
+        asyncio.ensure_future(asyncio.gather(*[writer() for _ in range(io_tasks)])),
+    ]
+    try:
+        await asyncio.gather(*stages)
+    except BaseException:
+        for stage in stages:
+            stage.cancel()
+        await asyncio.gather(*stages, return_exceptions=True)
+        raise
+    return results
@@ -0,0 +1,196 @@
+import gzip
+import os
+import re
+from src.utils.profiler import profile_span
+from src.utils.writer import write_output
+
+# The extensions of the outputs that get a precompressed `.gz` sibling
+COMPRESSED_EXTENSIONS = (".html", ".css", ".js", ".json")
+COMPRESSION_LEVEL = 9
+# Bump when the minifiers change, so fingerprinted assets get new names
+MINIFIER_VERSION = 1
+
+# Elements whose content is kept byte for byte
+PRESERVED_PATTERN = re.compile(
+    r"<(pre|code|textarea|script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+# Conditional comments are kept
+COMMENT_PATTERN = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+TAG_PATTERN = re.compile(r"(<[^>]*>)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Whitespace around these tags never renders, so it can be dropped instead of collapsed
+BLOCK_TAG_PATTERN = re.compile(
+    r"</?(?:!doctype|html|head|body|meta|link|title|base|header|footer|main|nav|"
+    r"section|article|aside|div|p|h[1-6]|ul|ol|li|dl|dt|dd|table|thead|tbody|"
+    r"tfoot|tr|th|td|form|fieldset|hr|br|blockquote|figure|figcaption|pre|script|"
+    r"style|textarea)\b",
+    re.IGNORECASE,
+)
+
+CSS_STRING_PATTERN = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')""", re.DOTALL)
+CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_PUNCTUATION_PATTERN = re.compile(r"\s*([{};,])\s*")
+
+
+def is_block_tag(token):
+    """
+    Check whether a token is a block-level tag.
+
+    Args:
+        token (str): A tag, or text.
+    """
+    return BLOCK_TAG_PATTERN.match(token) is not None
+
+
+def minify_html_text(content, previous="", following=""):
+    """
+    Minify HTML that holds no preserved element.
+
+    Comments are removed and whitespace in text is collapsed to a single
+    space, or dropped next to block-level tags. Tags are left as they are.
+
+    Args:
+        content (str): The HTML.
+        previous (str, optional): The preserved element before the HTML, if any.
+        following (str, optional): The preserved element after the HTML, if any.
+    """
+    tokens = TAG_PATTERN.split(COMMENT_PATTERN.sub("", content))
+    tokens = [previous] + tokens + [following]
+    # Text and tags alternate, starting and ending with text
+    for i in range(1, len(tokens) - 1, 2):
+        text = WHITESPACE_PATTERN.sub(" ", tokens[i])
+        if is_block_tag(tokens[i - 1]):
+            text = text.lstrip(" ")
+        if is_block_tag(tokens[i + 1]):
+            text = text.rstrip(" ")
+        tokens[i] = text
+    return "".join(tokens[1:-1])
+
+
+def minify_html(content):
+    """
+    Minify a rendered page without changing how it displays.
+
+    The content of `<pre>`, `<code>`, `<textarea>`, `<script>` and `<style>`
+    elements is kept exactly as it is.
+
+    Args:
+        content (str): The HTML.
+
+    Returns:
+        str: The minified HTML.
+    """
+    parts = []
+    position = 0
+    previous = ""
+    for match in PRESERVED_PATTERN.finditer(content):
+        parts.append(
+            minify_html_text(content[position:match.start()], previous, match.group(0))
+        )
+        parts.append(match.group(0))
+        position = match.end()
+        previous = match.group(0)
+    parts.append(minify_html_text(content[position:], previous))
+    return "".join(parts).strip()
+
+
+def minify_css(content):
+    """
+    Minify a stylesheet: remove comments and the whitespace around braces, semicolons and commas.
+
+    Strings are kept as they are.
+
+    Args:
+        content (str): The stylesheet.
+
+    Returns:
+        str: The minified stylesheet.
+    """
+    parts = CSS_STRING_PATTERN.split(content)
+    # Code and strings alternate, starting and ending with code
+    for i in range(0, len(parts), 2):
+        code = WHITESPACE_PATTERN.sub(" ", CSS_COMMENT_PATTERN.sub("", parts[i]))
+        parts[i] = CSS_PUNCTUATION_PATTERN.sub(r"\1", code).replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def get_compressed_path(path):
+    """
+    Get the path of the precompressed sibling of an output.
+
+    Args:
+        path (str): The path of the output.
+    """
+    return f"{path}.gz"
+
+
+def is_compressible(path):
+    """
+    Check whether an output gets a precompressed sibling.
+
+    Args:
+        path (str): The path of the output.
+    """
+    return path.endswith(COMPRESSED_EXTENSIONS)
+
+
+def compress_file(path, level=COMPRESSION_LEVEL):
+    """
+    Write the `.gz` sibling of a file, unless it is already up to date.
+
+    The gzip header carries no timestamp, so compressing the same content
+    always gives the same bytes and unchanged siblings are not rewritten.
+
+    Args:
+        path (str): The path of the file.
+        level (int, optional): The gzip compression level. Default is COMPRESSION_LEVEL.
+
+    Returns:
+        bool: True if the sibling was written.
+    """
+    with profile_span("compress", path):
+        with open(path, "rb") as f:
+            data = gzip.compress(f.read(), compresslevel=level, mtime=0)
+        return write_output(get_compressed_path(path), data)
+
+
+def compress_outputs(paths, workers=None, level=COMPRESSION_LEVEL):
+    """
+    Write the `.gz` siblings of a set of outputs on a thread pool.
+
+    zlib releases the GIL while compressing, so threads compress files in
+    parallel without the cost of worker processes.
+
+    Args:
+        paths (iterable of str): The paths of the outputs; those without a compressible extension are skipped.
+        workers (int, optional): The number of threads. Defaults to the ThreadPoolExecutor default.
+        level (int, optional): The gzip compression level. Default is COMPRESSION_LEVEL.
+
+    Returns:
+        list of str: The paths of the outputs whose sibling was written.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    paths = sorted({path for path in paths if is_compressible(path)})
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        written = list(executor.map(lambda path: compress_file(path, level), paths))
+    return [path for path, was_written in zip(paths, written) if was_written]
+
+
+def remove_compressed(path):
+    """
+    Remove the `.gz` sibling of an output, if there is one.
+
+    Args:
+        path (str): The path of the output.
+
+    Returns:
+        bool: True if a sibling was removed.
+    """
+    try:
+        os.remove(get_compressed_path(path))
+    except FileNotFoundError:
+        return False
+    return True
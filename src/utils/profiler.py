@@ -0,0 +1,339 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# The profiler of the running build, if any; see `set_profiler`
+_active_profiler = None
+
+
+class BuildProfiler:
+    """
+    Record where a build spends its time and memory.
+
+    A build is split into phases (hash, load, render, drain, ...) and each
+    phase into spans, one per post, template render or page write. Every
+    phase and span records its wall time and, while allocations are traced,
+    the memory allocated during it. Spans can be recorded from any thread;
+    posts rendered in worker processes (`--jobs` above 1) are not recorded.
+
+    The results can be printed as a report, exported as a Chrome trace
+    (chrome://tracing or https://ui.perfetto.dev), and dumped as cProfile
+    and tracemalloc snapshots.
+    """
+
+    def __init__(self, trace_allocations=True, profile_calls=False):
+        """
+        Args:
+            trace_allocations (bool, optional): Trace memory allocations with tracemalloc. Default is True.
+            profile_calls (bool, optional): Profile every function call with cProfile. Default is False.
+        """
+        self.trace_allocations = trace_allocations
+        self.call_profiler = None
+        if profile_calls:
+            import cProfile
+
+            self.call_profiler = cProfile.Profile()
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.spans = []
+        self.events = []
+        self.origin = time.perf_counter()
+        self.started_tracing = False
+        self.snapshot = None
+
+    def start(self):
+        """
+        Start tracing allocations and profiling calls, as configured.
+        """
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        if self.call_profiler is not None:
+            self.call_profiler.enable()
+
+    def stop(self):
+        """
+        Stop tracing allocations and profiling calls.
+        """
+        if self.call_profiler is not None:
+            self.call_profiler.disable()
+        if self.started_tracing:
+            self.snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def get_allocated(self):
+        """
+        Get the memory currently allocated, in bytes, or 0 when allocations are not traced.
+        """
+        if tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return 0
+
+    def add_event(self, category, name, start, seconds, args=None):
+        """
+        Add a complete event to the Chrome trace.
+
+        Args:
+            category (str): The category of the event.
+            name (str): The name of the event.
+            start (float): The `time.perf_counter()` value when the event started.
+            seconds (float): The duration of the event.
+            args (dict, optional): Extra values shown with the event.
+        """
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 3),
+            "dur": round(seconds * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Record a build phase. Phases run one after the other on the main thread.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        allocated = self.get_allocated()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            summary = self.phases.setdefault(
+                name, {"seconds": 0.0, "allocated": 0, "peak": 0}
+            )
+            summary["seconds"] += seconds
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                summary["allocated"] += current - allocated
+                summary["peak"] = max(summary["peak"], peak - allocated)
+            self.add_event("phase", name, start, seconds)
+
+    @contextlib.contextmanager
+    def span(self, category, name, **args):
+        """
+        Record a unit of work within a phase, such as rendering one post.
+
+        Allocations are measured process-wide, so spans running at the same
+        time on other threads are counted too.
+
+        Args:
+            category (str): What the span does, e.g. "scan", "markdown", "template", "index" or "write".
+            name (str): What the span works on, usually a post or page path.
+            **args: Extra values kept with the span, e.g. the template name.
+        """
+        allocated = self.get_allocated()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            span = {
+                "category": category,
+                "name": name,
+                "seconds": seconds,
+                "allocated": self.get_allocated() - allocated,
+                **args,
+            }
+            with self.lock:
+                self.spans.append(span)
+            self.add_event(category, name, start, seconds, args)
+
+    def slowest(self, key, top=10, categories=None):
+        """
+        Get the slowest items, adding up the time of their spans.
+
+        Args:
+            key (str): The span field to group by, e.g. "name" or "template".
+            top (int, optional): The number of items. Default is 10.
+            categories (iterable of str, optional): Only count spans of these categories. Default is every category.
+
+        Returns:
+            list of dict: The items, slowest first, with their `seconds`, `allocated`, `count` and time per category.
+        """
+        totals = {}
+        for span in self.spans:
+            if categories is not None and span["category"] not in categories:
+                continue
+            if span.get(key) is None:
+                continue
+            total = totals.setdefault(
+                span[key],
+                {key: span[key], "seconds": 0.0, "allocated": 0, "count": 0, "categories": {}},
+            )
+            total["seconds"] += span["seconds"]
+            total["allocated"] += span["allocated"]
+            total["count"] += 1
+            total["categories"][span["category"]] = (
+                total["categories"].get(span["category"], 0.0) + span["seconds"]
+            )
+        return sorted(totals.values(), key=lambda total: total["seconds"], reverse=True)[:top]
+
+    def category_totals(self):
+        """
+        Add up the time of the spans of each category, whatever thread they ran on.
+
+        Phases are wall time on the main thread, so work done on other threads,
+        such as the page writes of the writer threads, shows up here instead.
+
+        Returns:
+            dict: The `seconds` and `count` of every category, in the order first seen.
+        """
+        totals = {}
+        with self.lock:
+            spans = list(self.spans)
+        for span in spans:
+            total = totals.setdefault(span["category"], {"seconds": 0.0, "count": 0})
+            total["seconds"] += span["seconds"]
+            total["count"] += 1
+        return totals
+
+    def format_report(self, top=10):
+        """
+        Format the phases, the time spent on each kind of work and the slowest posts and templates as text.
+
+        Args:
+            top (int, optional): The number of posts and templates to list. Default is 10.
+        """
+        lines = [f"{'phase':<12}{'seconds':>10}{'allocated':>14}{'peak':>14}"]
+        for name, summary in self.phases.items():
+            lines.append(
+                f"{name:<12}{summary['seconds']:>10.3f}"
+                f"{format_size(summary['allocated']):>14}{format_size(summary['peak']):>14}"
+            )
+
+        lines.append("")
+        lines.append("Work by kind (summed over threads):")
+        for category, total in self.category_totals().items():
+            lines.append(f"{category:<12}{total['seconds']:>10.3f}s {total['count']:>6} spans")
+
+        lines.append("")
+        lines.append(f"Slowest posts (top {top}):")
+        for total in self.slowest("name", top, categories=("scan", "markdown", "template")):
+            breakdown = ", ".join(
+                f"{category} {seconds:.3f}s" for category, seconds in total["categories"].items()
+            )
+            lines.append(
+                f"{total['seconds']:>10.3f}s {format_size(total['allocated']):>10}  "
+                f"{total['name']} ({breakdown})"
+            )
+
+        lines.append("")
+        lines.append(f"Slowest templates (top {top}):")
+        for total in self.slowest("template", top, categories=("template", "index")):
+            lines.append(
+                f"{total['seconds']:>10.3f}s {total['count']:>6} renders  {total['template']}"
+            )
+        return "\n".join(lines)
+
+    def get_trace(self):
+        """
+        Get the recorded phases and spans in the Chrome trace event format.
+        """
+        with self.lock:
+            events = list(self.events)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_trace(self, trace_file):
+        """
+        Save the Chrome trace to a JSON file.
+
+        Args:
+            trace_file (str): The path of the trace file.
+        """
+        with open(trace_file, "w") as f:
+            json.dump(self.get_trace(), f)
+
+    def save_snapshots(self, output_dir):
+        """
+        Dump the cProfile statistics (`build.prof`) and the tracemalloc snapshot (`build.tracemalloc`), when recorded.
+
+        Args:
+            output_dir (str): The directory the snapshots are written to.
+
+        Returns:
+            list of str: The paths of the files written.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = []
+        if self.call_profiler is not None:
+            paths.append(os.path.join(output_dir, "build.prof"))
+            self.call_profiler.dump_stats(paths[-1])
+        if self.snapshot is not None:
+            paths.append(os.path.join(output_dir, "build.tracemalloc"))
+            self.snapshot.dump(paths[-1])
+        return paths
+
+
+def format_size(size):
+    """
+    Format a number of bytes for humans.
+
+    Args:
+        size (int): The number of bytes; may be negative.
+    """
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def set_profiler(profiler):
+    """
+    Make a profiler record the phases and spans of the builds that follow.
+
+    Args:
+        profiler (BuildProfiler or None): The profiler, or None to stop recording.
+    """
+    global _active_profiler
+    _active_profiler = profiler
+
+
+def get_profiler():
+    """
+    Get the active profiler, or None when builds are not profiled.
+    """
+    return _active_profiler
+
+
+def profile_phase(name):
+    """
+    Record a build phase on the active profiler; does nothing when no profiler is active.
+
+    Args:
+        name (str): The name of the phase.
+    """
+    if _active_profiler is None:
+        return contextlib.nullcontext()
+    return _active_profiler.phase(name)
+
+
+def profile_span(category, name, **args):
+    """
+    Record a span on the active profiler; does nothing when no profiler is active.
+
+    Args:
+        category (str): What the span does.
+        name (str): What the span works on.
+        **args: Extra values kept with the span.
+    """
+    if _active_profiler is None:
+        return contextlib.nullcontext()
+    return _active_profiler.span(category, name, **args)
@@ -0,0 +1,145 @@
+import json
+import os
+import tempfile
+from src.utils.handler import calculate_content_hash, create_directory
+
+
+class RenderCache:
+    """
+    An on-disk, content-addressed cache of rendered Markdown.
+
+    Each entry is a file named after the hash of the Markdown source, the
+    renderer version and its options, so entries never need invalidating.
+    Reading an entry refreshes its modification time, and `prune` evicts the
+    least recently used entries once the cache grows past `max_size` bytes.
+    Entries are written atomically, so the cache can be shared by worker
+    processes.
+    """
+
+    def __init__(self, cache_directory, max_size=64 * 1024 * 1024, version="", options=None):
+        """
+        Args:
+            cache_directory (str): The directory where the entries are stored.
+            max_size (int, optional): The maximum total size of the entries in bytes. Default is 64 MiB.
+            version (str, optional): The version of the renderer, part of every key.
+            options (list, optional): The renderer options, part of every key.
+        """
+        self.cache_directory = cache_directory
+        self.max_size = max_size
+        self.version = version
+        self.options = options or []
+
+    def get_key(self, content):
+        """
+        Get the cache key of a Markdown source.
+
+        Args:
+            content (str): The Markdown source.
+
+        Returns:
+            str: The cache key.
+        """
+        return calculate_content_hash(
+            json.dumps([calculate_content_hash(content), self.version, self.options])
+        )
+
+    def get_path(self, key):
+        """
+        Get the path of an entry.
+
+        Args:
+            key (str): The cache key.
+        """
+        return os.path.join(self.cache_directory, key[:2], f"{key}.html")
+
+    def get(self, key):
+        """
+        Get a cached rendering.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str or None: The cached HTML, or None on a miss.
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                html = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+    def put(self, key, html):
+        """
+        Store a rendering.
+
+        Args:
+            key (str): The cache key.
+            html (str): The rendered HTML.
+        """
+        path = self.get_path(key)
+        entry_dir = os.path.dirname(path)
+        create_directory(entry_dir)
+        fd, temp_path = tempfile.mkstemp(dir=entry_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def render(self, content, renderer):
+        """
+        Get the rendering of a Markdown source, rendering and storing it on a miss.
+
+        Args:
+            content (str): The Markdown source.
+            renderer (callable): Renders Markdown to HTML.
+
+        Returns:
+            str: The rendered HTML.
+        """
+        key = self.get_key(content)
+        html = self.get(key)
+        if html is None:
+            html = renderer(content)
+            self.put(key, html)
+        return html
+
+    def prune(self):
+        """
+        Evict the least recently used entries until the cache fits in `max_size`.
+
+        Returns:
+            int: The number of evicted entries.
+        """
+        entries = []
+        total_size = 0
+        for root, _, files in os.walk(self.cache_directory):
+            for file in files:
+                path = os.path.join(root, file)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total_size += stat.st_size
+
+        evicted = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+            evicted += 1
+        return evicted
@@ -0,0 +1,407 @@
+import heapq
+import html
+import json
+import os
+import re
+import src.config as config
+from src.utils.writer import write_output
+
+SEARCH_INDEX_VERSION = 1
+# The number of documents described by each document shard
+DOCS_PER_SHARD = 256
+# Title words weigh as much as this many words of the body
+TITLE_WEIGHT = 10
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+TERM_PATTERN = re.compile(r"\w+")
+
+
+def html_to_text(content):
+    """
+    Get the text of rendered HTML.
+
+    Args:
+        content (str): The HTML.
+    """
+    return html.unescape(TAG_PATTERN.sub(" ", content))
+
+
+def tokenize(text):
+    """
+    Split text into lowercase search terms.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list of str: The terms, in order and with repetitions.
+    """
+    return [
+        term
+        for term in TERM_PATTERN.findall(text.lower())
+        if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH
+    ]
+
+
+def score_terms(title, content):
+    """
+    Score every term of a post by how often it appears, title words counting TITLE_WEIGHT times.
+
+    Args:
+        title (str): The post title.
+        content (str): The rendered HTML of the post.
+
+    Returns:
+        dict: The score of each term.
+    """
+    scores = {}
+    for term in tokenize(html_to_text(content)):
+        scores[term] = scores.get(term, 0) + 1
+    for term in tokenize(title or ""):
+        scores[term] = scores.get(term, 0) + TITLE_WEIGHT
+    return scores
+
+
+def get_shard_filename(prefix):
+    """
+    Get the filename of the term shard for a prefix; prefixes are hex-encoded to stay URL and filesystem safe.
+
+    Args:
+        prefix (str): The prefix of the terms in the shard.
+    """
+    return f"{prefix.encode('utf-8').hex()}.json"
+
+
+class SearchIndex:
+    """
+    A prefix-sharded inverted index of the posts, for client-side search.
+
+    The index is written as static JSON files under `output_dir`:
+
+    - `index.json` lists the term shards by prefix and how documents are sharded;
+    - `terms/<hex prefix>.json` maps each term of a shard to a flat list of
+      document numbers and scores, `[doc, score, doc, score, ...]`;
+    - `docs/<n>.json` holds `[title, url, synopsis]` for DOCS_PER_SHARD
+      documents, or null for free numbers.
+
+    A term belongs to the shard with the longest prefix it starts with. A
+    shard that grows past `shard_size` bytes is split by one more character,
+    so a query only downloads shards of about that size.
+
+    The index is maintained incrementally: the state file records the
+    source hash, document number and terms of every post, and only the
+    shards of posts that were added, changed or removed are loaded,
+    updated and written again. Document numbers are stable and reused, so
+    an edit does not renumber other posts.
+    """
+
+    def __init__(self, output_dir, state_file, shard_size=32 * 1024, root_url="../"):
+        """
+        Args:
+            output_dir (str): The directory the index is written to.
+            state_file (str): The path of the file keeping the per-post state between builds.
+            shard_size (int, optional): The size in bytes above which a term shard is split. Default is 32 KiB.
+            root_url (str, optional): The URL of the site root, relative to `output_dir`; result URLs are relative to it. Default is "../".
+        """
+        self.output_dir = output_dir
+        self.state_file = state_file
+        self.shard_size = shard_size
+        self.root_url = root_url
+        self.state = self.load_state()
+        self.prefix_set = set(self.state["prefixes"])
+        self.shards = {}
+        self.dirty_shards = set()
+        self.dirty_docs = set()
+        self.changed = False
+
+    def new_state(self):
+        """
+        Create the state of an empty index.
+        """
+        return {
+            "version": SEARCH_INDEX_VERSION,
+            "shard_size": self.shard_size,
+            "posts": {},
+            "docs": [],
+            "free": [],
+            "prefixes": [],
+        }
+
+    def clear(self):
+        """
+        Empty the index, so the next update indexes every post again.
+        """
+        self.state = self.new_state()
+        self.prefix_set = set()
+        self.shards = {}
+
+    def load_state(self):
+        """
+        Load the state of the previous build.
+
+        A missing or outdated state, or missing index files, yield an empty
+        state, which makes the next update index every post again.
+        """
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self.new_state()
+        if (
+            not isinstance(state, dict)
+            or state.get("version") != SEARCH_INDEX_VERSION
+            or state.get("shard_size") != self.shard_size
+        ):
+            return self.new_state()
+        self.state = state
+        if not all(os.path.exists(path) for path in self.get_output_paths()):
+            return self.new_state()
+        return state
+
+    def get_output_paths(self):
+        """
+        Get the paths of every file of the index.
+        """
+        paths = [os.path.join(self.output_dir, "index.json")]
+        paths.extend(
+            os.path.join(self.output_dir, "terms", get_shard_filename(prefix))
+            for prefix in self.state["prefixes"]
+        )
+        paths.extend(
+            os.path.join(self.output_dir, "docs", f"{number}.json")
+            for number in range(self.count_doc_shards())
+        )
+        return paths
+
+    def count_doc_shards(self):
+        """
+        Count the document shards.
+        """
+        return (len(self.state["docs"]) + DOCS_PER_SHARD - 1) // DOCS_PER_SHARD
+
+    def get_shard_prefix(self, term):
+        """
+        Get the prefix of the shard a term belongs to, adding a shard for its first character if there is none.
+
+        Args:
+            term (str): The term.
+        """
+        for length in range(len(term), 0, -1):
+            if term[:length] in self.prefix_set:
+                return term[:length]
+        self.prefix_set.add(term[:1])
+        self.state["prefixes"].append(term[:1])
+        self.shards[term[:1]] = {}
+        return term[:1]
+
+    def load_shard(self, prefix):
+        """
+        Get the postings of a shard, reading it from the previous build on first use.
+
+        Args:
+            prefix (str): The prefix of the shard.
+
+        Returns:
+            dict: The score of each document, by term.
+        """
+        if prefix not in self.shards:
+            path = os.path.join(self.output_dir, "terms", get_shard_filename(prefix))
+            try:
+                with open(path) as f:
+                    flat_shard = json.load(f)
+            except FileNotFoundError:
+                flat_shard = {}
+            self.shards[prefix] = {
+                term: dict(zip(postings[::2], postings[1::2]))
+                for term, postings in flat_shard.items()
+            }
+        return self.shards[prefix]
+
+    def remove_post(self, source):
+        """
+        Remove a post from the index.
+
+        Args:
+            source (str): The relative path of the post source.
+        """
+        entry = self.state["posts"].pop(source)
+        doc = entry["doc"]
+        for term in entry["terms"]:
+            prefix = self.get_shard_prefix(term)
+            postings = self.load_shard(prefix).get(term)
+            if postings is not None:
+                postings.pop(doc, None)
+                if not postings:
+                    del self.shards[prefix][term]
+            self.dirty_shards.add(prefix)
+        self.state["docs"][doc] = None
+        heapq.heappush(self.state["free"], doc)
+        self.dirty_docs.add(doc // DOCS_PER_SHARD)
+        self.changed = True
+
+    def add_post(self, source, source_hash, info, scores):
+        """
+        Add a post to the index.
+
+        Args:
+            source (str): The relative path of the post source.
+            source_hash (str): The hash of the post source.
+            info (list): The title, URL and synopsis shown in search results.
+            scores (dict): The score of each term of the post.
+        """
+        docs = self.state["docs"]
+        if self.state["free"]:
+            doc = heapq.heappop(self.state["free"])
+            docs[doc] = info
+        else:
+            doc = len(docs)
+            docs.append(info)
+        for term, score in scores.items():
+            prefix = self.get_shard_prefix(term)
+            self.load_shard(prefix).setdefault(term, {})[doc] = score
+            self.dirty_shards.add(prefix)
+        self.state["posts"][source] = {
+            "hash": source_hash,
+            "doc": doc,
+            "terms": sorted(scores),
+        }
+        self.dirty_docs.add(doc // DOCS_PER_SHARD)
+        self.changed = True
+
+    def update(self, posts, scores=None):
+        """
+        Bring the index up to date with the posts; only new, changed and removed posts are processed.
+
+        Args:
+            posts (dict): `(source_hash, info, post)` by relative source path, where `info` is the title, URL and synopsis of the post.
+            scores (dict, optional): The term scores of posts already scored elsewhere, by relative source path; the other posts are scored from their content.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        for source in [source for source in self.state["posts"] if source not in posts]:
+            self.remove_post(source)
+        for source, (source_hash, info, post) in posts.items():
+            entry = self.state["posts"].get(source)
+            if (
+                entry is not None
+                and entry["hash"] == source_hash
+                and self.state["docs"][entry["doc"]] == info
+            ):
+                continue
+            if entry is not None:
+                self.remove_post(source)
+            if scores is not None and source in scores:
+                post_scores = scores[source]
+            else:
+                post_scores = score_terms(post.title, post.content)
+            self.add_post(source, source_hash, info, post_scores)
+        return self.changed
+
+    def split_shard(self, prefix):
+        """
+        Split an oversized shard by one more character, recursively.
+
+        Terms exactly as long as the prefix stay in the shard.
+
+        Args:
+            prefix (str): The prefix of the shard.
+        """
+        shard = self.shards[prefix]
+        if len(json.dumps(self.flatten(shard))) <= self.shard_size:
+            return
+        children = {}
+        for term in list(shard):
+            if len(term) > len(prefix):
+                children.setdefault(term[: len(prefix) + 1], {})[term] = shard.pop(term)
+        if not children:
+            return
+        # No shard exists for a child prefix yet, or it would own these terms
+        for child_prefix, child in children.items():
+            self.prefix_set.add(child_prefix)
+            self.state["prefixes"].append(child_prefix)
+            self.shards[child_prefix] = child
+            self.dirty_shards.add(child_prefix)
+            self.split_shard(child_prefix)
+
+    @staticmethod
+    def flatten(shard):
+        """
+        Get a shard in its file format, postings sorted by document.
+
+        Args:
+            shard (dict): The score of each document, by term.
+        """
+        return {
+            term: [value for doc in sorted(postings) for value in (doc, postings[doc])]
+            for term, postings in sorted(shard.items())
+        }
+
+    def save(self, writer=None):
+        """
+        Write the changed shards, the index file and the state.
+
+        Args:
+            writer (PageWriter, optional): The writer the files are queued on. If not provided, files are written directly.
+
+        Returns:
+            list of str: The paths of every file of the index.
+        """
+        os.makedirs(os.path.join(self.output_dir, "terms"), exist_ok=True)
+        os.makedirs(os.path.join(self.output_dir, "docs"), exist_ok=True)
+        for prefix in list(self.dirty_shards):
+            self.split_shard(prefix)
+        self.state["prefixes"].sort()
+
+        files = {}
+        for prefix in self.dirty_shards:
+            path = os.path.join(self.output_dir, "terms", get_shard_filename(prefix))
+            files[path] = self.flatten(self.shards[prefix])
+        docs = self.state["docs"]
+        for number in self.dirty_docs:
+            path = os.path.join(self.output_dir, "docs", f"{number}.json")
+            files[path] = docs[number * DOCS_PER_SHARD:(number + 1) * DOCS_PER_SHARD]
+        files[os.path.join(self.output_dir, "index.json")] = {
+            "version": SEARCH_INDEX_VERSION,
+            "shards": {
+                prefix: get_shard_filename(prefix) for prefix in self.state["prefixes"]
+            },
+            "docs_per_shard": DOCS_PER_SHARD,
+            "root": self.root_url,
+        }
+        for path, data in files.items():
+            output = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+            if writer is not None:
+                writer.write(path, output)
+            else:
+                write_output(path, output)
+
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        write_output(self.state_file, json.dumps(self.state, separators=(",", ":")))
+        self.dirty_shards.clear()
+        self.dirty_docs.clear()
+        return self.get_output_paths()
+
+
+def get_search_index(public_dir=None, cache_directory=None):
+    """
+    Get the search index of the site, with the state of the previous build.
+
+    Args:
+        public_dir (str, optional): The public directory. Default is `public_dir`.
+        cache_directory (str, optional): The build cache directory, where the index state is kept. Default is `cache_directory` from the configuration.
+    """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    if cache_directory is None:
+        cache_directory = config.CACHE_DIRECTORY
+    search_dir = os.path.join(public_dir, config.SEARCH_DIRECTORY)
+    root_url = os.path.relpath(public_dir, search_dir).replace(os.sep, "/") + "/"
+    return SearchIndex(
+        search_dir,
+        os.path.join(cache_directory, "search.json"),
+        config.SEARCH_SHARD_SIZE,
+        root_url,
+    )
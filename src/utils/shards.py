@@ -0,0 +1,123 @@
+import glob
+import os
+import re
+from src.utils.handler import calculate_content_hash
+
+# `i/N`: the i-th of N shards, counting from 1
+SHARD_PATTERN = re.compile(r"^(\d+)/(\d+)$")
+SHARD_MANIFEST_PATTERN = re.compile(r"\.shard-(\d+)-of-(\d+)$")
+
+
+def parse_shard(value):
+    """
+    Parse a shard specification such as `2/4`.
+
+    Args:
+        value (str): The shard, as `i/N` with 1 <= i <= N.
+
+    Returns:
+        tuple: The shard number and the number of shards.
+
+    Raises:
+        ValueError: If the specification is malformed.
+    """
+    match = SHARD_PATTERN.match(value.strip())
+    if match is None:
+        raise ValueError(f"Error: Invalid shard '{value}', expected i/N.")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"Error: Invalid shard '{value}', i must be between 1 and N.")
+    return index, count
+
+
+def get_post_shard(source, count):
+    """
+    Get the shard that renders a post.
+
+    The shard only depends on the post's relative source path, so every
+    worker agrees on it whatever the machine, the hash seed of the
+    interpreter or the other posts, and adding a post never moves another.
+
+    Args:
+        source (str): The relative source path of the post.
+        count (int): The number of shards.
+
+    Returns:
+        int: The shard number, counting from 1.
+    """
+    return int(calculate_content_hash(source)[:16], 16) % count + 1
+
+
+def get_shard_manifest_path(manifest_file, shard):
+    """
+    Get the path of the manifest a shard writes, next to the build manifest.
+
+    Args:
+        manifest_file (str): The path of the build manifest.
+        shard (tuple): The shard number and the number of shards.
+    """
+    root, extension = os.path.splitext(manifest_file)
+    return f"{root}.shard-{shard[0]}-of-{shard[1]}{extension}"
+
+
+def find_shard_manifests(manifest_file):
+    """
+    Find the manifests written by the shards of a build.
+
+    Args:
+        manifest_file (str): The path of the build manifest.
+
+    Returns:
+        list of str: The paths of the shard manifests, in shard order.
+
+    Raises:
+        ValueError: If there are none, if they disagree on the number of shards, or if a shard is missing.
+    """
+    root, extension = os.path.splitext(manifest_file)
+    shards = {}
+    for path in glob.glob(f"{glob.escape(root)}.shard-*-of-*{extension}"):
+        match = SHARD_MANIFEST_PATTERN.search(os.path.splitext(path)[0])
+        if match is not None:
+            shards[int(match.group(1)), int(match.group(2))] = path
+    if not shards:
+        raise ValueError(f"Error: No shard manifests found next to {manifest_file}.")
+    counts = {count for _, count in shards}
+    if len(counts) > 1:
+        raise ValueError(
+            f"Error: The shard manifests come from builds of {', '.join(map(str, sorted(counts)))} shards."
+        )
+    count = counts.pop()
+    missing = [str(index) for index in range(1, count + 1) if (index, count) not in shards]
+    if missing:
+        raise ValueError(f"Error: Missing the manifests of shards {', '.join(missing)} of {count}.")
+    return [shards[index, count] for index in range(1, count + 1)]
+
+
+def merge_shard_manifests(manifests, fingerprint, options):
+    """
+    Combine the posts rendered by the shards of a build.
+
+    Args:
+        manifests (list of dict): The shard manifests, in shard order.
+        fingerprint (str): The fingerprint of the merging build; every shard must have been built with it.
+        options (dict): The options of the merging build; every shard must have been built with them.
+
+    Returns:
+        tuple: The manifest entry of every post rendered by a shard, and the search terms of those posts, by relative source path.
+
+    Raises:
+        ValueError: If a shard was built with other templates, configuration or options, or two shards rendered the same post.
+    """
+    posts = {}
+    search = {}
+    for number, manifest in enumerate(manifests, start=1):
+        if manifest["fingerprint"] != fingerprint or manifest["options"] != options:
+            raise ValueError(
+                f"Error: Shard {number} was built with other templates, configuration or options."
+            )
+        for source, entry in manifest["posts"].items():
+            if source in posts:
+                raise ValueError(f"Error: {source} was rendered by more than one shard.")
+            posts[source] = entry
+        search.update(manifest.get("search", {}))
+    return posts, search
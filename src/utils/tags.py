@@ -0,0 +1,135 @@
+import json
+import os
+import src.config as config
+from src.utils.catalog import PostCatalog
+from src.utils.handler import calculate_content_hash, get_template, sanitize_title
+from src.utils.pages import (
+    count_pages,
+    generate_index_page,
+    get_jinja_cache_directory,
+    get_listing,
+    get_navigation_links,
+)
+
+
+def get_tag_index(posts):
+    """
+    Build the inverted index from tags to the posts that carry them, in one pass.
+
+    Tags are grouped by their sanitized name, which names their directory;
+    the first spelling seen is the one displayed.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+
+    Returns:
+        dict: `(tag, rows)` by sanitized tag name, where `rows` are the positions of the tag's posts in `posts`, in order.
+    """
+    if isinstance(posts, PostCatalog):
+        tag_rows = posts.tag_rows
+    else:
+        tag_rows = {}
+        for row, post in enumerate(posts):
+            for tag in dict.fromkeys(post.tags):
+                tag_rows.setdefault(tag, []).append(row)
+
+    tag_index = {}
+    for tag, rows in tag_rows.items():
+        slug = sanitize_title(tag)
+        if slug in tag_index:
+            # Another spelling of a tag already seen
+            merged = tag_index[slug][1] + rows
+            tag_index[slug] = (tag_index[slug][0], sorted(set(merged)))
+        else:
+            tag_index[slug] = (tag, rows)
+    return tag_index
+
+
+def get_tag_output_dir(slug, public_dir=None):
+    """
+    Get the directory the pages of a tag are written to.
+
+    Args:
+        slug (str): The sanitized tag name.
+        public_dir (str, optional): The public directory. Default is `public_dir`.
+    """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    return os.path.join(public_dir, config.TAGS_DIRECTORY, slug)
+
+
+def get_tag_listing_hash(posts, tag, rows, posts_per_page):
+    """
+    Hash everything the pages of a tag show, so they are only rendered again when it changes.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        tag (str): The tag.
+        rows (list of int): The positions of the tag's posts in `posts`.
+        posts_per_page (int): The maximum number of posts to display on each page.
+    """
+    return calculate_content_hash(
+        json.dumps([posts_per_page, tag, get_listing(posts, rows)])
+    )
+
+
+def generate_tag_pages(
+    posts,
+    tag_index,
+    posts_per_page=5,
+    public_dir=None,
+    writer=None,
+    asset_map=None,
+    cache_directory=None,
+):
+    """
+    Generate the paginated pages of some tags, at `tags/<tag>/index.html`, `tags/<tag>/2.html`, ...
+
+    Only the posts shown on each page are built from the catalog.
+
+    Args:
+        posts (PostCatalog or list of Post): The blog posts.
+        tag_index (dict): The tags to generate pages for, as returned by `get_tag_index`.
+        posts_per_page (int, optional): The maximum number of posts to display on each page. Default is 5.
+        public_dir (str, optional): The public directory. Default is `public_dir`.
+        writer (PageWriter, optional): The writer pages are queued on. If not provided, pages are written directly.
+        asset_map (dict, optional): The fingerprinted URL of every asset.
+        cache_directory (str, optional): The build cache directory, where compiled templates are kept. Default is `cache_directory` from the configuration.
+
+    Returns:
+        list: The filenames of the generated pages.
+
+    Raises:
+        BlogTemplateError: If the tag template cannot be loaded.
+    """
+    if public_dir is None:
+        public_dir = config.PUBLIC_DIR
+    if tag_index:
+        # Load the template before any page is queued, so a missing or broken one fails the build
+        get_template(
+            config.TAG_TEMPLATE,
+            config.TEMPLATE_DIRECTORY,
+            get_jinja_cache_directory(cache_directory),
+        )
+    output_filenames = []
+    for slug, (tag, rows) in tag_index.items():
+        output_dir = get_tag_output_dir(slug, public_dir)
+        total_pages = count_pages(len(rows), posts_per_page)
+        for page_number in range(1, total_pages + 1):
+            start_index = (page_number - 1) * posts_per_page
+            page_posts = [
+                posts[row] for row in rows[start_index:start_index + posts_per_page]
+            ]
+            output_filenames.append(
+                generate_index_page(
+                    page_posts,
+                    output_dir,
+                    get_navigation_links(page_number, total_pages),
+                    writer,
+                    template_name=config.TAG_TEMPLATE,
+                    tag=tag,
+                    asset_map=asset_map,
+                    cache_directory=cache_directory,
+                )
+            )
+    return output_filenames
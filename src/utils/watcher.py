@@ -0,0 +1,203 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from src.utils.handler import get_all_paths
+
+# inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def get_watched_files(paths):
+    """
+    Get every file under the watched paths.
+
+    Args:
+        paths (list): The files and directories to watch.
+
+    Returns:
+        list: The paths of all watched files.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(p for p in get_all_paths(path) if os.path.isfile(p))
+        elif os.path.exists(path):
+            files.append(path)
+    return files
+
+
+class PollingWatcher:
+    """Watch files for changes by comparing their stat signatures at an interval."""
+
+    def __init__(self, paths, interval=0.5):
+        """
+        Args:
+            paths (list): The files and directories to watch.
+            interval (float, optional): The number of seconds between scans. Default is 0.5.
+        """
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        """
+        Get the stat signature of every watched file.
+        """
+        snapshot = {}
+        for path in get_watched_files(self.paths):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """
+        Block until a watched file changes.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait. Default is to wait forever.
+
+        Returns:
+            set: The paths that changed; empty if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self.scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Watch files for changes with Linux inotify, called through ctypes."""
+
+    def __init__(self, paths, debounce=0.05):
+        """
+        Args:
+            paths (list): The files and directories to watch.
+            debounce (float, optional): The number of seconds to keep collecting events after the first one. Default is 0.05.
+
+        Raises:
+            OSError: If inotify is not available.
+        """
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.debounce = debounce
+        self.directories = {}
+        self.files = set()
+        for path in paths:
+            path = os.path.abspath(path)
+            if os.path.isdir(path):
+                self.add_directory(path)
+                for sub_path in get_all_paths(path):
+                    if os.path.isdir(sub_path):
+                        self.add_directory(sub_path)
+            else:
+                # Editors often replace files, so watch the parent directory
+                self.files.add(path)
+                self.add_directory(os.path.dirname(path), only_files=True)
+
+    def add_directory(self, directory, only_files=False):
+        """
+        Add an inotify watch on a directory.
+
+        Args:
+            directory (str): The directory to watch.
+            only_files (bool, optional): Only report events for explicitly watched files. Default is False.
+        """
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        # A directory watched as a whole must not be downgraded to a file filter
+        if not only_files or wd not in self.directories:
+            self.directories[wd] = (directory, only_files)
+
+    def read_events(self):
+        """
+        Read pending inotify events and return the paths they concern.
+        """
+        changed = set()
+        buffer = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + name_length].rstrip(b"\0")
+            offset += name_length
+            directory, only_files = self.directories.get(wd, (None, False))
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if only_files and path not in self.files:
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self.add_directory(path)
+            changed.add(path)
+        return changed
+
+    def wait(self, timeout=None):
+        """
+        Block until a watched file changes.
+
+        Args:
+            timeout (float, optional): The maximum number of seconds to wait. Default is to wait forever.
+
+        Returns:
+            set: The paths that changed; empty if the timeout expired.
+        """
+        changed = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        while readable:
+            changed |= self.read_events()
+            readable, _, _ = select.select([self.fd], [], [], self.debounce)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def get_watcher(paths):
+    """
+    Get the best available watcher: inotify where available, polling otherwise.
+
+    Args:
+        paths (list): The files and directories to watch.
+    """
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError):
+        return PollingWatcher(paths)
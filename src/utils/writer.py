@@ -0,0 +1,264 @@
+import filecmp
+import os
+import queue
+import secrets
+import threading
+from src.utils.profiler import profile_span
+
+WRITER_THREADS = 4
+WRITER_QUEUE_SIZE = 64
+# New files only; binary so that Windows does not translate newlines
+TEMP_FILE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+
+
+def is_file_content(path, data):
+    """
+    Check whether a file already holds exactly the given bytes.
+
+    The size is compared first, so most changed pages are detected with a
+    single stat call.
+
+    Args:
+        path (str): The path of the file.
+        data (bytes): The expected content.
+    """
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def create_temp_file(output_filename):
+    """
+    Create a new temporary file next to an output.
+
+    Unlike `tempfile.mkstemp`, which creates private files, the file gets the
+    permissions of any new file under the process umask, so it can be renamed
+    over the output as is.
+
+    Args:
+        output_filename (str): The filename of the output file.
+
+    Returns:
+        tuple: The file descriptor, open for writing, and the path of the file.
+    """
+    output_dir = os.path.dirname(output_filename) or "."
+    prefix = f".{os.path.basename(output_filename)}."
+    while True:
+        temp_path = os.path.join(output_dir, f"{prefix}{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(temp_path, TEMP_FILE_FLAGS, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+def write_output(output_filename, output):
+    """
+    Write a rendered page to a file, unless the file already has the same content.
+
+    The page is written to a temporary file in the same directory and renamed
+    over the output, so a crashed build never leaves a half-written page.
+    Skipping identical pages keeps their modification times stable.
+
+    Args:
+        output_filename (str): The filename of the output file.
+        output (str, bytes or iterable of str): The page, either whole or as a stream of chunks.
+
+    Returns:
+        bool: True if the file was written, False if it was already up to date.
+    """
+    binary = isinstance(output, bytes)
+    if isinstance(output, (str, bytes)):
+        data = output if binary else output.encode("utf-8")
+        if is_file_content(output_filename, data):
+            return False
+        output = [output]
+
+    fd, temp_path = create_temp_file(output_filename)
+    try:
+        if binary:
+            output_file = os.fdopen(fd, "wb")
+        else:
+            output_file = os.fdopen(fd, "w", encoding="utf-8")
+        with output_file:
+            output_file.writelines(output)
+        if os.path.exists(output_filename) and filecmp.cmp(
+            temp_path, output_filename, shallow=False
+        ):
+            os.unlink(temp_path)
+            return False
+        os.replace(temp_path, output_filename)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return True
+
+
+class PageWriter:
+    """
+    Write rendered pages on a pool of threads, so rendering overlaps with disk I/O.
+
+    Pages go through a bounded queue: when the writers fall behind, the
+    renderer blocks instead of holding every page in memory. Output
+    directories are created once, up front or on first use, instead of
+    being checked for every page. With no worker threads, pages are written
+    synchronously by `write`.
+
+    The writer keeps the filenames of the pages it wrote (`written`) and of
+    those it left alone because they were up to date (`unchanged`).
+
+    HTML pages can be minified before they are compared with the existing
+    files; a streamed page is then joined first. Minifying is CPU-bound, so
+    with an executor, such as the process pool posts are rendered on, pages
+    are minified there as they are queued and the writer threads only wait
+    for the result; otherwise they are minified on the writer threads.
+    """
+
+    def __init__(
+        self, workers=WRITER_THREADS, queue_size=WRITER_QUEUE_SIZE, minify=False, executor=None
+    ):
+        """
+        Args:
+            workers (int, optional): The number of writer threads; 0 writes synchronously. Default is WRITER_THREADS.
+            queue_size (int, optional): The maximum number of pages waiting to be written. Default is WRITER_QUEUE_SIZE.
+            minify (bool, optional): Minify `.html` pages. Default is False.
+            executor (concurrent.futures.Executor, optional): The executor pages are minified on. Default is the writer threads.
+        """
+        self.minify = minify
+        self.minifier = None
+        if minify:
+            from src.utils.postprocess import minify_html
+
+            self.minifier = minify_html
+        self.executor = executor
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.directories = set()
+        self.errors = []
+        self.written = []
+        self.unchanged = []
+        self.closed = False
+        self.threads = [
+            threading.Thread(target=self.run, daemon=True) for _ in range(max(0, workers))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def create_directories(self, directories):
+        """
+        Create output directories ahead of the pages written to them.
+
+        Args:
+            directories (iterable of str): The directories to create.
+        """
+        for directory in directories:
+            if directory not in self.directories:
+                os.makedirs(directory, exist_ok=True)
+                self.directories.add(directory)
+
+    def write(self, output_filename, output):
+        """
+        Queue a page to be written; blocks while the queue is full.
+
+        Args:
+            output_filename (str): The filename of the output file.
+            output (str or iterable of str): The page, either whole or as a stream of chunks.
+        """
+        directory = os.path.dirname(output_filename)
+        if directory not in self.directories:
+            with self.lock:
+                self.create_directories([directory])
+        if self.executor is not None and self.should_minify(output_filename):
+            if not isinstance(output, str):
+                output = "".join(output)
+            output = self.executor.submit(self.minifier, output)
+        if self.threads:
+            self.queue.put((output_filename, output))
+        else:
+            self.write_page(output_filename, output)
+
+    def should_minify(self, output_filename):
+        """
+        Check whether a page is minified before it is written.
+
+        Args:
+            output_filename (str): The filename of the output file.
+        """
+        return self.minifier is not None and output_filename.endswith(".html")
+
+    def write_page(self, output_filename, output):
+        """
+        Write a page and record the outcome.
+
+        Args:
+            output_filename (str): The filename of the output file.
+            output (str or iterable of str): The page, either whole or as a stream of chunks; with an executor, the future of the minified page.
+        """
+        try:
+            if self.should_minify(output_filename):
+                if self.executor is not None:
+                    output = output.result()
+                else:
+                    with profile_span("minify", output_filename):
+                        if not isinstance(output, str):
+                            output = "".join(output)
+                        output = self.minifier(output)
+            with profile_span("write", output_filename):
+                written = write_output(output_filename, output)
+        except Exception as e:
+            with self.lock:
+                self.errors.append((output_filename, e))
+            return
+        with self.lock:
+            if written:
+                self.written.append(output_filename)
+            else:
+                self.unchanged.append(output_filename)
+
+    def run(self):
+        """
+        Write queued pages until the writer is closed.
+        """
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.write_page(*item)
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        """
+        Wait for every queued page to be written and stop the writer threads.
+        Closing an already closed writer does nothing.
+
+        Raises:
+            Exception: The first error raised while writing a page.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0][1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # Do not mask the original error with a write error
+            try:
+                self.close()
+            except Exception:
+                pass
@@ -0,0 +1,170 @@
+// Client-side search over the prebuilt, prefix-sharded index.
+// Only the term shards a query needs, and the document shards of its
+// results, are downloaded; every file is fetched at most once.
+(function () {
+  "use strict";
+
+  var MAX_RESULTS = 20;
+  // The most shards fetched to complete the last, partial word of a query
+  var MAX_PREFIX_SHARDS = 8;
+
+  var script = document.querySelector("script[data-search-index]");
+  var input = document.getElementById("search-input");
+  var results = document.getElementById("search-results");
+  if (!script || !input || !results) {
+    return;
+  }
+  var indexUrl = new URL(script.getAttribute("data-search-index"), location.href);
+  var cache = {};
+
+  function fetchJson(url) {
+    var key = url.toString();
+    if (!cache[key]) {
+      cache[key] = fetch(key).then(function (response) {
+        return response.ok ? response.json() : {};
+      });
+    }
+    return cache[key];
+  }
+
+  function tokenize(text) {
+    return (text.toLowerCase().match(/[\p{L}\p{N}_]+/gu) || []).filter(function (term) {
+      return term.length >= 2 && term.length <= 40;
+    });
+  }
+
+  // The shard a term belongs to is the one with the longest prefix it starts with
+  function getShardPrefix(index, term) {
+    for (var length = term.length; length > 0; length--) {
+      if (Object.prototype.hasOwnProperty.call(index.shards, term.slice(0, length))) {
+        return term.slice(0, length);
+      }
+    }
+    return null;
+  }
+
+  function loadShard(index, prefix) {
+    return fetchJson(new URL("terms/" + index.shards[prefix], indexUrl));
+  }
+
+  function addPostings(scores, postings) {
+    for (var i = 0; i < postings.length; i += 2) {
+      scores[postings[i]] = Math.max(scores[postings[i]] || 0, postings[i + 1]);
+    }
+  }
+
+  // Get the score of every document containing a term, or a word starting with it
+  function findTerm(index, term, isPrefix) {
+    var prefix = getShardPrefix(index, term);
+    var prefixes = prefix === null ? [] : [prefix];
+    if (isPrefix) {
+      prefixes = prefixes.concat(
+        Object.keys(index.shards)
+          .filter(function (shard) {
+            return shard.length > term.length && shard.startsWith(term);
+          })
+          .slice(0, MAX_PREFIX_SHARDS)
+      );
+    }
+    return Promise.all(
+      prefixes.map(function (shardPrefix) {
+        return loadShard(index, shardPrefix);
+      })
+    ).then(function (shards) {
+      var scores = {};
+      shards.forEach(function (shard) {
+        if (!isPrefix) {
+          addPostings(scores, shard[term] || []);
+          return;
+        }
+        Object.keys(shard).forEach(function (word) {
+          if (word.startsWith(term)) {
+            addPostings(scores, shard[word]);
+          }
+        });
+      });
+      return scores;
+    });
+  }
+
+  function search(query) {
+    var terms = tokenize(query);
+    if (!terms.length) {
+      return Promise.resolve([]);
+    }
+    return fetchJson(indexUrl).then(function (index) {
+      return Promise.all(
+        terms.map(function (term, i) {
+          return findTerm(index, term, i === terms.length - 1);
+        })
+      ).then(function (termScores) {
+        // Every term must match; scores add up
+        var total = termScores[0];
+        termScores.slice(1).forEach(function (scores) {
+          var next = {};
+          Object.keys(total).forEach(function (doc) {
+            if (doc in scores) {
+              next[doc] = total[doc] + scores[doc];
+            }
+          });
+          total = next;
+        });
+        var docs = Object.keys(total)
+          .map(Number)
+          .sort(function (a, b) {
+            return total[b] - total[a] || a - b;
+          })
+          .slice(0, MAX_RESULTS);
+        return loadDocs(index, docs);
+      });
+    });
+  }
+
+  function loadDocs(index, docs) {
+    return Promise.all(
+      docs.map(function (doc) {
+        var shard = Math.floor(doc / index.docs_per_shard);
+        return fetchJson(new URL("docs/" + shard + ".json", indexUrl)).then(function (entries) {
+          return entries[doc % index.docs_per_shard];
+        });
+      })
+    ).then(function (entries) {
+      var rootUrl = new URL(index.root, indexUrl);
+      return entries.filter(Boolean).map(function (entry) {
+        return { title: entry[0], url: new URL(entry[1], rootUrl).toString(), synopsis: entry[2] };
+      });
+    });
+  }
+
+  function showResults(entries) {
+    results.textContent = "";
+    entries.forEach(function (entry) {
+      var term = document.createElement("dt");
+      var link = document.createElement("a");
+      link.href = entry.url;
+      link.textContent = entry.title;
+      term.appendChild(link);
+      results.appendChild(term);
+      if (entry.synopsis) {
+        var description = document.createElement("dd");
+        description.textContent = entry.synopsis;
+        results.appendChild(description);
+      }
+    });
+  }
+
+  var timer = null;
+  var latestQuery = "";
+  input.addEventListener("input", function () {
+    clearTimeout(timer);
+    timer = setTimeout(function () {
+      var query = (latestQuery = input.value);
+      search(query).then(function (entries) {
+        // Ignore answers to queries typed over since
+        if (query === latestQuery) {
+          showResults(entries);
+        }
+      });
+    }, 150);
+  });
+})();
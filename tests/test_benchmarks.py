@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.import_time import check_import, get_eager_imports, parse_import_times
+from benchmarks.run import compare_results, run_benchmarks
+
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_generate_corpus_is_deterministic(self):
+        first = generate_corpus(f'{self.temp_dir}/a', posts=5, body_words=50, seed=1)
+        second = generate_corpus(f'{self.temp_dir}/b', posts=5, body_words=50, seed=1)
+        for first_path, second_path in zip(first, second):
+            with open(first_path) as f, open(second_path) as g:
+                self.assertEqual(f.read(), g.read())
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(self.temp_dir, posts=8, body_words=50, tag_cardinality=3)
+        self.assertEqual(results['phases']['load_posts']['items'], 8)
+        self.assertIsNotNone(results['phases']['generate_all_posts']['p95_ms'])
+        self.assertIn('make_site_noop', results['phases'])
+        self.assertEqual(results['phases']['generate_posts_pipeline']['items'], 8)
+        self.assertEqual(compare_results(results, results), [])
+
+        slower = {'phases': {'load_posts': {'seconds': results['phases']['load_posts']['seconds'] * 2}}}
+        self.assertEqual(len(compare_results(slower, results)), 1)
+
+    def test_parse_import_times(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |   jinja2.utils\n'
+            'import time:       300 |        420 | jinja2\n'
+        )
+        times = parse_import_times(output)
+        self.assertEqual(times['jinja2'], {'self_us': 300, 'cumulative_us': 420})
+        self.assertEqual(get_eager_imports(times), ['jinja2', 'jinja2.utils'])
+
+    def test_import_defers_heavy_modules(self):
+        # The budget depends on the machine; what is imported does not
+        times, problems = check_import(budget_ms=float('inf'), repeat=1)
+        self.assertEqual(problems, [])
+        self.assertIn('generate_pages', times)
+
+
+if __name__ == '__main__':
+    unittest.main()
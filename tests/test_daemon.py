@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import src.config as config
+from src.client import send_request
+from src.daemon import BuildDaemon
+
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.posts_dir = os.path.join(self.temp_dir, 'posts')
+        self.public_dir = os.path.join(self.temp_dir, 'public')
+        os.mkdir(self.posts_dir)
+        for i in range(1, 4):
+            with open(os.path.join(self.posts_dir, f'post_{i}.md'), 'w') as f:
+                f.write(f'---\ntitle: Post {i}\n---\nContent {i}')
+        self.socket_path = os.path.join(self.temp_dir, 'build.sock')
+        self.daemon = BuildDaemon(self.socket_path, {
+            'local_posts_directory': self.posts_dir,
+            'public_dir': self.public_dir,
+            'public_posts_dir': os.path.join(self.public_dir, 'posts'),
+            'manifest_file': os.path.join(self.temp_dir, 'manifest.json'),
+            'cache_directory': os.path.join(self.temp_dir, 'cache'),
+        })
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        if self.thread.is_alive():
+            self.daemon.shutdown()
+        self.daemon.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_builds_reuse_the_warm_state(self):
+        result = send_request(self.socket_path, {'command': 'build'})
+        self.assertTrue(result['ok'])
+        self.assertGreaterEqual(result['stats']['written'], 3)
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, 'posts', 'post_1.html')))
+        self.assertEqual(len(self.daemon.post_cache), 3)
+
+        result = send_request(self.socket_path, {'command': 'build'})
+        self.assertEqual(result['stats']['written'], 0)
+
+        # Overrides apply to one request, and logs are forwarded with verbose
+        messages = []
+        result = send_request(
+            self.socket_path,
+            {'command': 'build', 'options': {'force_rebuild': True}, 'verbose': True},
+            messages.append)
+        self.assertTrue(result['ok'])
+        self.assertTrue(any('rebuild requested' in message['message']
+                            for message in messages if message['type'] == 'log'))
+
+        status = send_request(self.socket_path, {'command': 'status'})['status']
+        self.assertEqual(status['builds'], 3)
+
+    def test_config_changes_apply_to_the_next_build(self):
+        config_path = os.path.join(self.temp_dir, 'config.json')
+        with open(config.CONFIG_PATH) as f:
+            config_data = json.load(f)
+        with open(config_path, 'w') as f:
+            json.dump(config_data, f)
+        self.addCleanup(config.configure)
+        with mock.patch.object(config, 'CONFIG_PATH', config_path):
+            self.daemon.config_signature = self.daemon.get_config_signature()
+            options = {'options': {'posts_per_page': 2}}
+            self.assertTrue(send_request(self.socket_path, dict(options, command='build'))['ok'])
+
+            config_data.update(minify=True, pagination='stable')
+            with open(config_path, 'w') as f:
+                json.dump(config_data, f)
+            os.utime(config_path, (time.time() + 60, time.time() + 60))
+            self.assertTrue(send_request(self.socket_path, dict(options, command='build'))['ok'])
+        # The settings derived from the configuration are reloaded too
+        self.assertTrue(config.MINIFY)
+        self.assertEqual(config.PAGINATION, 'stable')
+        self.assertTrue(os.path.exists(os.path.join(self.public_dir, '1.html')))
+
+    def test_errors(self):
+        result = send_request(self.socket_path, {'command': 'build', 'options': {'nope': 1}})
+        self.assertFalse(result['ok'])
+        self.assertIn('nope', result['error'])
+        self.assertFalse(send_request(self.socket_path, {'command': 'dance'})['ok'])
+
+    def test_stop(self):
+        self.assertTrue(send_request(self.socket_path, {'command': 'stop'})['ok'])
+        self.thread.join(timeout=5)
+        self.assertFalse(self.thread.is_alive())
+        self.daemon.server_close()
+        self.assertFalse(os.path.exists(self.socket_path))
+        with self.assertRaises(ConnectionError):
+            send_request(self.socket_path, {'command': 'status'})
+
+
+if __name__ == '__main__':
+    unittest.main()
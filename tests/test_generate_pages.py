@@ -1,17 +1,31 @@
+import gzip
 import logging
 import os
 import random
+import re
 import shutil
 import sys
 import tempfile
 import time
 import unittest
+import xml.etree.ElementTree as ET
+from multiprocessing import get_context
+from unittest import mock
 
 from bs4 import BeautifulSoup
 
-from src.config import parsed_config
-from src.generate_pages import (generate_pages, generate_post, get_template,
-                                load_posts, process_post, write_page)
+from src.config import CONFIG_PATH, PROJECT_ROOT, configure, parsed_config
+from src.exceptions import BlogTemplateError, PostProcessingError
+from src.generate_pages import (_generate_post_job, build, generate_all_posts,
+                                generate_pages, generate_post,
+                                generate_posts_pipeline, get_template,
+                                load_posts, make_site, process_post,
+                                run_post_jobs, write_page)
+from src.utils.archive import generate_archive_pages, get_archive_pages
+from src.utils.catalog import Post
+from src.utils.handler import load_config
+from src.utils.manifest import get_outputs, load_manifest
+from src.utils.tags import generate_tag_pages, get_tag_index
 
 sys.path.insert(0, os.path.abspath(
     os.path.join(os.path.dirname(__file__), "..")))
@@ -97,7 +111,7 @@ class TestGeneratePages(unittest.TestCase):
             processed_post = process_post(post_path)
             processed_posts.append(processed_post)
         for processed_post, original_post in zip(processed_posts, self.generated_posts):
-            self.assertIsInstance(processed_post, dict)
+            self.assertIsInstance(processed_post, Post)
             self.assertEqual(processed_post['title'], original_post['title'])
             self.assertEqual(processed_post['tags'], original_post['tags'])
             self.assertEqual(
@@ -109,6 +123,38 @@ class TestGeneratePages(unittest.TestCase):
         processed_posts = load_posts(self.test_dir)
         self.assertEqual(len(processed_posts), self.post_amount)
 
+    def test_post_ids_are_unique(self):
+        post_ids = {post['id'] for post in self.generated_posts}
+        self.assertEqual(len(post_ids), self.post_amount)
+
+    def test_load_posts_is_lazy(self):
+        posts = load_posts(self.test_dir)
+        output_dir = os.path.join(self.backup_dir, 'pages')
+        generate_pages(posts, self.posts_per_page, output_dir)
+        for post in posts:
+            self.assertNotIn('content', post)
+        post = posts[0]
+        self.assertIn('<p>Content', post['content'])
+        self.assertIn('content', post)
+
+    def test_load_posts_parallel(self):
+        serial_posts = load_posts(self.test_dir)
+        parallel_posts = load_posts(self.test_dir, jobs=2)
+        self.assertEqual(parallel_posts, serial_posts)
+
+    def test_generate_all_posts_parallel(self):
+        serial_dir = os.path.join(self.backup_dir, 'serial')
+        parallel_dir = os.path.join(self.backup_dir, 'parallel')
+        generate_all_posts(self.generated_posts, serial_dir, serial_dir)
+        generate_all_posts(self.generated_posts, parallel_dir, parallel_dir,
+                           jobs=2)
+        self.assertEqual(sorted(os.listdir(parallel_dir)),
+                         sorted(os.listdir(serial_dir)))
+        for name in os.listdir(serial_dir):
+            with open(os.path.join(serial_dir, name)) as serial_file, \
+                    open(os.path.join(parallel_dir, name)) as parallel_file:
+                self.assertEqual(parallel_file.read(), serial_file.read())
+
     def test_generate_post(self):
         posts = self.generated_posts
         for post in posts:
@@ -195,6 +241,515 @@ class TestGeneratePages(unittest.TestCase):
                     self.assertIn(
                         post['title'], html_content, f"Post {post['title']} not found in page {i + 1}")
 
+    def test_make_site_incremental(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        public_posts_dir = os.path.join(public_dir, 'posts')
+        manifest_file = os.path.join(self.backup_dir, 'manifest.json')
+        cache_dir = os.path.join(self.backup_dir, 'cache')
+        stats = make_site(self.test_dir, public_dir, public_posts_dir,
+                          self.posts_per_page, manifest_file=manifest_file,
+                          cache_directory=cache_dir)
+        self.assertEqual(stats['unchanged'], 0)
+        self.assertEqual(stats['skipped'], 0)
+        # Compiled templates are kept in the cache of the build
+        self.assertTrue(os.listdir(os.path.join(cache_dir, 'jinja')))
+        manifest = load_manifest(manifest_file)
+
+        # A forced rebuild renders everything but writes nothing new
+        stats = make_site(self.test_dir, public_dir, public_posts_dir,
+                          self.posts_per_page, force_rebuild=True,
+                          manifest_file=manifest_file,
+                          cache_directory=cache_dir)
+        self.assertEqual(stats['written'], 0)
+        self.assertEqual(stats['unchanged'], len(get_outputs(manifest)))
+        self.assertEqual(len(manifest['posts']), self.post_amount)
+        for source in manifest['posts']:
+            self.assertFalse(os.path.isabs(source))
+
+        # Mark every output so we can tell which ones get rendered again
+        outputs = [os.path.join(public_posts_dir, name)
+                   for name in os.listdir(public_posts_dir)]
+        outputs.append(os.path.join(public_dir, 'index.html'))
+        for output in outputs:
+            with open(output, 'w') as f:
+                f.write('untouched')
+
+        # Keep the mtime so the index listing stays the same
+        edited_post = os.path.join(self.test_dir, 'test_post_1.md')
+        stat = os.stat(edited_post)
+        with open(edited_post, 'a') as f:
+            f.write(' edited')
+        os.utime(edited_post, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        make_site(self.test_dir, public_dir, public_posts_dir,
+                  self.posts_per_page, manifest_file=manifest_file,
+                  cache_directory=cache_dir)
+
+        for output in outputs:
+            with open(output) as f:
+                content = f.read()
+            if output.endswith('test_post_1.html'):
+                self.assertIn('edited', content)
+            else:
+                self.assertEqual(content, 'untouched', output)
+
+    def test_make_site_tag_pages(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        public_posts_dir = os.path.join(public_dir, 'posts')
+        manifest_file = os.path.join(self.backup_dir, 'manifest.json')
+        cache_dir = os.path.join(self.backup_dir, 'cache')
+        site_args = (self.test_dir, public_dir, public_posts_dir, 1)
+        make_site(*site_args, manifest_file=manifest_file, cache_directory=cache_dir)
+
+        test_dir = os.path.join(public_dir, 'tags', 'test')
+        self.assertEqual(len(os.listdir(test_dir)), self.post_amount)
+        with open(os.path.join(test_dir, 'index.html')) as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        self.assertIn('test', soup.find('dl').h2.text)
+        self.assertTrue(soup.find('dt').a['href'].startswith('../../posts/'))
+
+        # Move one post from "example" to a new tag; "test" lists it the same
+        test_page = os.path.join(test_dir, 'index.html')
+        with open(test_page, 'w') as f:
+            f.write('untouched')
+        edited_post = os.path.join(self.test_dir, 'test_post_1.md')
+        stat = os.stat(edited_post)
+        with open(edited_post, 'w') as f:
+            f.write('---\ntitle: Test Post 1\ntags: [test, new]\n---\nContent 1')
+        os.utime(edited_post, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        make_site(*site_args, manifest_file=manifest_file, cache_directory=cache_dir)
+
+        with open(test_page) as f:
+            self.assertEqual(f.read(), 'untouched')
+
+        self.assertTrue(os.path.exists(os.path.join(public_dir, 'tags', 'new', 'index.html')))
+        example_pages = os.listdir(os.path.join(public_dir, 'tags', 'example'))
+        self.assertEqual(len(example_pages), self.post_amount - 1)
+
+        # Dropping the last post of a tag removes its pages
+        os.remove(edited_post)
+        make_site(*site_args, manifest_file=manifest_file, cache_directory=cache_dir)
+        self.assertFalse(os.path.exists(os.path.join(public_dir, 'tags', 'new')))
+
+    def test_generate_tag_pages_missing_template(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        posts = self.generated_posts
+        with mock.patch('src.config.TAG_TEMPLATE', 'missing.html'):
+            with self.assertRaises(BlogTemplateError):
+                generate_tag_pages(posts, get_tag_index(posts), public_dir=public_dir)
+            self.assertEqual(generate_tag_pages(posts, {}, public_dir=public_dir), [])
+        self.assertFalse(os.path.exists(public_dir))
+
+    def test_generate_archive_pages_missing_template(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        posts = self.generated_posts
+        with mock.patch('src.config.ARCHIVE_TEMPLATE', 'missing.html'):
+            with self.assertRaises(BlogTemplateError):
+                generate_archive_pages(posts, get_archive_pages(posts), public_dir=public_dir)
+        self.assertFalse(os.path.exists(public_dir))
+
+        site_args = (self.test_dir, public_dir, os.path.join(public_dir, 'posts'), 1)
+        manifest_file = os.path.join(self.backup_dir, 'manifest.json')
+        with mock.patch('src.config.ARCHIVE_TEMPLATE', 'missing.html'):
+            with self.assertLogs('src.generate_pages', level='ERROR') as logs:
+                self.assertIsNone(make_site(
+                    *site_args, manifest_file=manifest_file,
+                    cache_directory=os.path.join(self.backup_dir, 'cache')))
+        self.assertIn('missing.html', logs.output[0])
+
+    def test_make_site_assets(self):
+        static_dir = os.path.join(self.backup_dir, 'static')
+        os.makedirs(static_dir)
+        with open(os.path.join(static_dir, 'style.css'), 'w') as f:
+            f.write('body {}')
+        public_dir = os.path.join(self.backup_dir, 'public')
+        public_posts_dir = os.path.join(public_dir, 'posts')
+        assets_dir = os.path.join(public_dir, 'assets')
+        site_args = (self.test_dir, public_dir, public_posts_dir, self.posts_per_page)
+        site_kwargs = {
+            'manifest_file': os.path.join(self.backup_dir, 'manifest.json'),
+            'cache_directory': os.path.join(self.backup_dir, 'cache'),
+        }
+        with open(os.path.join(self.test_dir, 'test_post_1.md'), 'a') as f:
+            f.write('\n\n![Style](../static/style.css)')
+
+        with mock.patch('src.config.STATIC_DIRECTORY', static_dir):
+            make_site(*site_args, **site_kwargs)
+            [first] = [name for name in os.listdir(assets_dir) if name.endswith('.css')]
+            with open(os.path.join(public_dir, 'index.html')) as f:
+                soup = BeautifulSoup(f.read(), 'html.parser')
+            self.assertEqual(soup.find_all('link', rel='stylesheet')[-1]['href'], f'assets/{first}')
+            with open(os.path.join(public_posts_dir, 'test_post_1.html')) as f:
+                soup = BeautifulSoup(f.read(), 'html.parser')
+            self.assertEqual(soup.find('img')['src'], f'../assets/{first}')
+
+            # A changed asset gets a new name; the old copy is removed
+            with open(os.path.join(static_dir, 'style.css'), 'w') as f:
+                f.write('body { color: black; }')
+            make_site(*site_args, **site_kwargs)
+            [second] = [name for name in os.listdir(assets_dir) if name.endswith('.css')]
+            self.assertNotEqual(first, second)
+            with open(os.path.join(public_dir, 'index.html')) as f:
+                self.assertIn(f'assets/{second}', f.read())
+
+    def test_make_site_precompress(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        public_posts_dir = os.path.join(public_dir, 'posts')
+        site_args = (self.test_dir, public_dir, public_posts_dir, self.posts_per_page)
+        site_kwargs = {
+            'manifest_file': os.path.join(self.backup_dir, 'manifest.json'),
+            'cache_directory': os.path.join(self.backup_dir, 'cache'),
+        }
+        make_site(*site_args, **site_kwargs)
+        index_page = os.path.join(public_dir, 'index.html')
+        self.assertFalse(os.path.exists(index_page + '.gz'))
+
+        # Turning the stage on minifies every page and compresses every output
+        make_site(*site_args, **site_kwargs, minify=True, precompress=True)
+        with open(index_page) as f:
+            content = f.read()
+        self.assertNotIn('\n    ', content)
+        with gzip.open(index_page + '.gz', 'rt') as f:
+            self.assertEqual(f.read(), content)
+        manifest = load_manifest(site_kwargs['manifest_file'])
+        for output in get_outputs(manifest):
+            if output.endswith(('.html', '.json')):
+                self.assertTrue(os.path.exists(os.path.join(PROJECT_ROOT, output + '.gz')))
+
+        # Only the changed outputs are compressed again
+        post_page = os.path.join(public_posts_dir, 'test_post_2.html')
+        os.utime(post_page + '.gz', (0, 0))
+        with open(os.path.join(self.test_dir, 'test_post_1.md'), 'a') as f:
+            f.write(' edited')
+        make_site(*site_args, **site_kwargs, minify=True, precompress=True)
+        self.assertEqual(os.stat(post_page + '.gz').st_mtime, 0)
+        with gzip.open(os.path.join(public_posts_dir, 'test_post_1.html.gz'), 'rt') as f:
+            self.assertIn('edited', f.read())
+
+        # Turning it off removes the siblings, which would go stale
+        make_site(*site_args, **site_kwargs)
+        self.assertFalse(os.path.exists(index_page + '.gz'))
+
+    def test_make_site_minify_parallel(self):
+        outputs = []
+        for jobs in (1, 2):
+            public_dir = os.path.join(self.backup_dir, f'public_{jobs}')
+            make_site(self.test_dir, public_dir, os.path.join(public_dir, 'posts'),
+                      self.posts_per_page, jobs=jobs, minify=True,
+                      manifest_file=os.path.join(self.backup_dir, f'manifest_{jobs}.json'),
+                      cache_directory=os.path.join(self.backup_dir, 'cache'))
+            # Index and tag pages are minified on the worker pool too
+            with open(os.path.join(public_dir, 'index.html')) as f:
+                outputs.append(f.read())
+            self.assertNotIn('\n    ', outputs[-1])
+        self.assertEqual(outputs[1], outputs[0])
+
+    def test_make_site_sitemap_and_feed(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        public_posts_dir = os.path.join(public_dir, 'posts')
+        site_args = (self.test_dir, public_dir, public_posts_dir, self.posts_per_page)
+        site_kwargs = {
+            'manifest_file': os.path.join(self.backup_dir, 'manifest.json'),
+            'cache_directory': os.path.join(self.backup_dir, 'cache'),
+            'site_url': 'https://example.com/blog/',
+        }
+        make_site(*site_args, **site_kwargs)
+        sitemap = os.path.join(public_dir, 'sitemap.xml')
+        feed = os.path.join(public_dir, 'atom.xml')
+        locs = [loc.text for loc in ET.parse(sitemap).iter(
+            '{http://www.sitemaps.org/schemas/sitemap/0.9}loc')]
+        self.assertIn('https://example.com/blog/index.html', locs)
+        self.assertIn('https://example.com/blog/posts/test_post_1.html', locs)
+        entries = ET.parse(feed).findall('{http://www.w3.org/2005/Atom}entry')
+        self.assertEqual(len(entries), self.post_amount)
+
+        # Nothing changed: neither file is written again
+        for path in (sitemap, feed):
+            os.utime(path, (0, 0))
+        make_site(*site_args, **site_kwargs)
+        self.assertEqual(os.stat(sitemap).st_mtime, 0)
+        self.assertEqual(os.stat(feed).st_mtime, 0)
+
+        # An edit changes `last_updated`, so both are written again
+        edited_post = os.path.join(self.test_dir, 'test_post_1.md')
+        with open(edited_post, 'a') as f:
+            f.write(' edited')
+        os.utime(edited_post, (time.time() + 60, time.time() + 60))
+        make_site(*site_args, **site_kwargs)
+        self.assertNotEqual(os.stat(sitemap).st_mtime, 0)
+        self.assertNotEqual(os.stat(feed).st_mtime, 0)
+
+    def test_make_site_feed_orders_by_date(self):
+        posts_dir = os.path.join(self.backup_dir, 'posts')
+        public_dir = os.path.join(self.backup_dir, 'public')
+        os.mkdir(posts_dir)
+        for name, date in [('old', '2023-05-06'), ('new', '2024-01-02')]:
+            with open(os.path.join(posts_dir, f'{name}.md'), 'w') as f:
+                f.write(f'---\ntitle: {name}\ntype: post\ndate: {date}\n---\nContent')
+        # A checkout or touch makes the older post the most recently modified
+        os.utime(os.path.join(posts_dir, 'old.md'), (time.time() + 60, time.time() + 60))
+        make_site(posts_dir, public_dir, os.path.join(public_dir, 'posts'),
+                  manifest_file=os.path.join(self.backup_dir, 'manifest.json'),
+                  cache_directory=os.path.join(self.backup_dir, 'cache'),
+                  site_url='https://example.com/')
+        atom = '{http://www.w3.org/2005/Atom}'
+        entries = ET.parse(os.path.join(public_dir, 'atom.xml')).findall(f'{atom}entry')
+        self.assertEqual([entry.find(f'{atom}title').text for entry in entries], ['new', 'old'])
+        self.assertTrue(entries[0].find(f'{atom}updated').text.startswith('2024-01-02T00:00:00'))
+
+    def test_make_site_stable_pagination(self):
+        posts_dir = os.path.join(self.backup_dir, 'posts')
+        public_dir = os.path.join(self.backup_dir, 'public')
+        site_args = {
+            'public_dir': public_dir,
+            'public_posts_dir': os.path.join(public_dir, 'posts'),
+            'posts_per_page': 2,
+            'manifest_file': os.path.join(self.backup_dir, 'manifest.json'),
+            'cache_directory': os.path.join(self.backup_dir, 'cache'),
+            'pagination': 'stable',
+        }
+        os.mkdir(posts_dir)
+        self.generate_test_posts(5, posts_dir)
+        make_site(posts_dir, **site_args)
+        pages = sorted(name for name in os.listdir(public_dir) if name.endswith('.html'))
+        self.assertEqual(pages, ['1.html', '2.html', '3.html', 'index.html'])
+
+        # Archive pages that are full never change again
+        for name in ['1.html', '2.html']:
+            with open(os.path.join(public_dir, name), 'w') as f:
+                f.write('untouched')
+        with open(os.path.join(posts_dir, 'test_post_6.md'), 'w') as f:
+            f.write('---\ntitle: Test Post 6\n---\nContent 6')
+        make_site(posts_dir, **site_args)
+
+        for name in ['1.html', '2.html']:
+            with open(os.path.join(public_dir, name)) as f:
+                self.assertEqual(f.read(), 'untouched')
+        for name in ['3.html', 'index.html']:
+            with open(os.path.join(public_dir, name)) as f:
+                self.assertIn('Test Post 6', f.read())
+
+    def test_load_posts_orders_by_date(self):
+        posts_dir = os.path.join(self.backup_dir, 'posts')
+        os.mkdir(posts_dir)
+        for name, date in [('a', '2024-01-02'), ('b', '2023-05-06 10:00'), ('c', None)]:
+            with open(os.path.join(posts_dir, f'{name}.md'), 'w') as f:
+                date_line = f'date: {date}\n' if date else ''
+                f.write(f'---\ntitle: {name}\n{date_line}---\nContent')
+        # Without a date, the modification time is used
+        mtime = time.mktime((2023, 8, 1, 12, 0, 0, 0, 0, -1))
+        os.utime(os.path.join(posts_dir, 'c.md'), (mtime, mtime))
+        posts = load_posts(posts_dir)
+        self.assertEqual([post.title for post in posts], ['a', 'c', 'b'])
+        self.assertEqual(posts.column('date'),
+                         ['2024-01-02 00:00:00', '2023-08-01 12:00:00', '2023-05-06 10:00:00'])
+
+    def test_make_site_archive(self):
+        posts_dir = os.path.join(self.backup_dir, 'posts')
+        public_dir = os.path.join(self.backup_dir, 'public')
+        archive_dir = os.path.join(public_dir, 'archive')
+        site_args = {
+            'public_dir': public_dir,
+            'public_posts_dir': os.path.join(public_dir, 'posts'),
+            'manifest_file': os.path.join(self.backup_dir, 'manifest.json'),
+            'cache_directory': os.path.join(self.backup_dir, 'cache'),
+        }
+        os.mkdir(posts_dir)
+
+        def write_post(name, date):
+            with open(os.path.join(posts_dir, f'{name}.md'), 'w') as f:
+                f.write(f'---\ntitle: {name}\ntype: post\ndate: {date}\n---\nContent')
+
+        write_post('january_1', '2024-01-05')
+        write_post('january_2', '2024-01-20')
+        write_post('march_1', '2024-03-02')
+        make_site(posts_dir, **site_args)
+        january = os.path.join(archive_dir, '2024', '01', 'index.html')
+        march = os.path.join(archive_dir, '2024', '03', 'index.html')
+        for path in [os.path.join(archive_dir, 'index.html'),
+                     os.path.join(archive_dir, '2024', 'index.html'), january, march]:
+            self.assertTrue(os.path.exists(path), path)
+        with open(january) as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        self.assertEqual([dt.a.text for dt in soup.find_all('dt')], ['january_2', 'january_1'])
+        self.assertEqual(soup.find('link', rel='stylesheet', href=lambda href: 'style' in href)
+                         ['href'][:9], '../../../')
+
+        # Only the pages of the month a post is added to are rendered again
+        with open(january, 'w') as f:
+            f.write('untouched')
+        write_post('march_2', '2024-03-10')
+        make_site(posts_dir, **site_args)
+        with open(january) as f:
+            self.assertEqual(f.read(), 'untouched')
+        with open(march) as f:
+            self.assertIn('march_2', f.read())
+        with open(os.path.join(public_dir, 'index.html')) as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        self.assertEqual([dt.a.text for dt in soup.find_all('dt')][:2], ['march_2', 'march_1'])
+
+        # A month without posts left loses its page and directory
+        os.remove(os.path.join(posts_dir, 'march_1.md'))
+        os.remove(os.path.join(posts_dir, 'march_2.md'))
+        make_site(posts_dir, **site_args)
+        self.assertFalse(os.path.exists(os.path.dirname(march)))
+        self.assertTrue(os.path.exists(january))
+
+    def test_make_site_pipeline(self):
+        def read_outputs(public_dir):
+            outputs = {}
+            for root, _, filenames in os.walk(public_dir):
+                for filename in filenames:
+                    path = os.path.join(root, filename)
+                    with open(path, 'rb') as f:
+                        outputs[os.path.relpath(path, public_dir)] = f.read()
+            return outputs
+
+        builds = {}
+        for pipeline, jobs in [(False, 1), (True, 1), (True, 2)]:
+            name = f'public_{pipeline}_{jobs}'
+            public_dir = os.path.join(self.backup_dir, name)
+            site_args = {
+                'public_dir': public_dir,
+                'public_posts_dir': os.path.join(public_dir, 'posts'),
+                'posts_per_page': self.posts_per_page,
+                'manifest_file': os.path.join(self.backup_dir, f'{name}.json'),
+                'cache_directory': os.path.join(self.backup_dir, f'{name}_cache'),
+                'jobs': jobs,
+                'pipeline': pipeline,
+            }
+            stats = make_site(self.test_dir, **site_args)
+            self.assertGreaterEqual(stats['written'], self.post_amount)
+            builds[(pipeline, jobs)] = read_outputs(public_dir)
+        self.assertEqual(builds[(True, 1)], builds[(False, 1)])
+        self.assertEqual(builds[(True, 2)], builds[(False, 1)])
+
+        # Only the edited post goes through the pipeline again
+        edited_post = os.path.join(self.test_dir, 'test_post_1.md')
+        with open(edited_post, 'a') as f:
+            f.write(' edited')
+        stats = make_site(self.test_dir, **site_args)
+        with open(os.path.join(public_dir, 'posts', 'test_post_1.html')) as f:
+            self.assertIn('edited', f.read())
+        self.assertLess(stats['written'], len(builds[(True, 2)]))
+
+    def test_pipeline_reports_unreadable_posts(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        # A post removed between the scan and the read fails on its own
+        os.remove(os.path.join(self.test_dir, 'test_post_1.md'))
+        with self.assertRaises(PostProcessingError) as context:
+            generate_posts_pipeline(self.generated_posts, public_dir, public_dir)
+        self.assertEqual(list(context.exception.errors),
+                         [os.path.join(public_dir, 'test_post_1.html')])
+        self.assertEqual(len(os.listdir(public_dir)), self.post_amount - 1)
+
+    def test_make_site_shards(self):
+        def read_outputs(public_dir):
+            outputs = {}
+            for root, _, filenames in os.walk(public_dir):
+                for filename in filenames:
+                    path = os.path.join(root, filename)
+                    with open(path, 'rb') as f:
+                        outputs[os.path.relpath(path, public_dir)] = f.read()
+            return outputs
+
+        def site_args(name):
+            public_dir = os.path.join(self.backup_dir, name)
+            return {
+                'public_dir': public_dir,
+                'public_posts_dir': os.path.join(public_dir, 'posts'),
+                'posts_per_page': self.posts_per_page,
+                'manifest_file': os.path.join(self.backup_dir, f'{name}.json'),
+                'cache_directory': os.path.join(self.backup_dir, f'{name}_cache'),
+                'site_url': 'https://example.com/',
+            }
+
+        make_site(self.test_dir, **site_args('whole'))
+        sharded = site_args('sharded')
+        rendered = 0
+        for index in (1, 2, 3):
+            stats = make_site(self.test_dir, shard=(index, 3), **sharded)
+            rendered += stats['written']
+            self.assertFalse(os.path.exists(os.path.join(sharded['public_dir'], 'index.html')))
+        self.assertEqual(rendered, self.post_amount)
+        with self.assertLogs('src.generate_pages', level='INFO') as logs:
+            make_site(self.test_dir, merge=True, **sharded)
+        self.assertIn('Generating 0 posts', '\n'.join(logs.output))
+        self.assertEqual(read_outputs(sharded['public_dir']),
+                         read_outputs(site_args('whole')['public_dir']))
+        merged = load_manifest(sharded['manifest_file'])['posts']
+        whole = load_manifest(site_args('whole')['manifest_file'])['posts']
+        self.assertEqual({source: entry['sequence'] for source, entry in merged.items()},
+                         {source: entry['sequence'] for source, entry in whole.items()})
+
+        # Merging needs every shard
+        os.remove(os.path.join(self.backup_dir, 'sharded.shard-2-of-3.json'))
+        with self.assertRaises(ValueError):
+            make_site(self.test_dir, merge=True, force_rebuild=True, **sharded)
+
+    def test_make_site_links(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        site_args = {
+            'public_dir': public_dir,
+            'public_posts_dir': os.path.join(public_dir, 'posts'),
+            'posts_per_page': self.posts_per_page,
+            'manifest_file': os.path.join(self.backup_dir, 'manifest.json'),
+            'cache_directory': os.path.join(self.backup_dir, 'cache'),
+        }
+        stats = make_site(self.test_dir, **site_args)
+        # The navigation links to an about page these posts do not have
+        broken_links = stats['broken_links']
+
+        with open(os.path.join(self.test_dir, 'test_post_1.md'), 'a') as f:
+            f.write('\n\nSee [post 2](test_post_2.html) and [nothing](missing.html).')
+        with self.assertLogs('src.generate_pages', level='INFO') as logs:
+            stats = make_site(self.test_dir, **site_args)
+        self.assertEqual(stats['broken_links'], broken_links + 1)
+        output = '\n'.join(logs.output)
+        self.assertIn('Broken link in posts/test_post_1.html: missing.html', output)
+        # Only the pages written again are scanned
+        scanned = int(re.search(r'Scanned the links of (\d+) ', output).group(1))
+        pages = sum(name.endswith('.html') for _, _, names in os.walk(public_dir) for name in names)
+        self.assertLess(scanned, pages)
+
+        # An unchanged rebuild still reports them, from the cached graph
+        stats = make_site(self.test_dir, **site_args)
+        self.assertEqual(stats['written'], 0)
+        self.assertEqual(stats['broken_links'], broken_links + 1)
+        self.assertIn('orphan_pages', stats)
+
+    def test_build_with_config(self):
+        public_dir = os.path.join(self.backup_dir, 'public')
+        site_config = dict(
+            load_config(CONFIG_PATH),
+            blog_title='Configured Blog',
+            posts_directory=self.test_dir,
+            public_directory=public_dir,
+            public_posts_directory=os.path.join(public_dir, 'posts'),
+            manifest_filename=os.path.join(self.backup_dir, 'manifest.json'),
+            cache_directory=os.path.join(self.backup_dir, 'cache'),
+        )
+        try:
+            stats = build(site_config, posts_per_page=self.posts_per_page)
+        finally:
+            configure()
+        self.assertGreaterEqual(stats['written'], self.post_amount)
+        with open(os.path.join(public_dir, 'index.html')) as f:
+            self.assertIn('Configured Blog', f.read())
+        self.assertTrue(os.path.exists(os.path.join(public_dir, 'posts', 'test_post_1.html')))
+
+    def test_spawned_workers_use_the_configuration(self):
+        output_dir = os.path.join(self.backup_dir, 'public')
+        os.mkdir(output_dir)
+        post_jobs = [(post, output_dir, None, False, None) for post in self.generated_posts]
+        configure(dict(load_config(CONFIG_PATH), blog_title='Configured Blog'))
+        try:
+            # Spawned workers import the generator afresh, as on macOS and Windows
+            run_post_jobs(_generate_post_job, post_jobs, 2, mp_context=get_context('spawn'))
+        finally:
+            configure()
+        with open(os.path.join(output_dir, 'test_post_1.html')) as f:
+            self.assertIn('Configured Blog', f.read())
+
 
 if __name__ == '__main__':
     unittest.main()
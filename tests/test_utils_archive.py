@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.archive import (PostOrder, get_archive_index, get_month_name,
+                               parse_post_date)
+
+
+class TestParsePostDate(unittest.TestCase):
+    def test_formats(self):
+        fallback = '2020-01-01 00:00:00'
+        self.assertEqual(parse_post_date('2024-03-05', fallback), '2024-03-05 00:00:00')
+        self.assertEqual(parse_post_date('2024-03-05 14:30', fallback), '2024-03-05 14:30:00')
+        self.assertEqual(parse_post_date('"2024-03-05T14:30:15"', fallback),
+                         '2024-03-05 14:30:15')
+        self.assertEqual(parse_post_date(None, fallback), fallback)
+        self.assertEqual(parse_post_date('March 5th', fallback), fallback)
+
+    def test_utc_offset(self):
+        self.assertEqual(parse_post_date('2024-03-05T12:00:00Z', 'x'),
+                         parse_post_date('2024-03-05T14:00:00+02:00', 'x'))
+
+
+class TestArchiveIndex(unittest.TestCase):
+    def test_months(self):
+        dates = ['2024-03-05 00:00:00', '2024-01-02 00:00:00', '2023-12-31 23:59:59',
+                 '2024-03-01 00:00:00']
+        self.assertEqual(get_archive_index(dates, [0, 3, 1, 2]),
+                         {'2024/03': [0, 3], '2024/01': [1], '2023/12': [2]})
+        self.assertEqual(list(get_archive_index(dates, [2, 1])), ['2024/01', '2023/12'])
+        self.assertEqual(get_month_name('2024/03'), 'March 2024')
+
+
+class TestPostOrder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.temp_dir, 'cache', 'order.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_update(self):
+        order = PostOrder(self.state_file)
+        self.assertEqual(order.update({'a.md': '2024-01-01 00:00:00',
+                                       'b.md': '2023-01-01 00:00:00',
+                                       'c.md': '2025-01-01 00:00:00'}), 3)
+        self.assertEqual(order.newest_first(), ['c.md', 'a.md', 'b.md'])
+
+        # A redated post moves, a removed one leaves and a new one is inserted in place
+        self.assertEqual(order.update({'a.md': '2026-01-01 00:00:00',
+                                       'c.md': '2025-01-01 00:00:00',
+                                       'd.md': '2024-06-01 00:00:00'}), 3)
+        self.assertEqual(order.newest_first(), ['a.md', 'c.md', 'd.md'])
+        self.assertEqual(order.keys, sorted(order.keys))
+
+    def test_persistence(self):
+        order = PostOrder(self.state_file)
+        order.update({'a.md': '2024-01-01 00:00:00', 'b.md': '2024-01-01 00:00:00'})
+        self.assertTrue(order.save())
+        self.assertFalse(order.save())
+
+        order = PostOrder(self.state_file)
+        self.assertEqual(order.newest_first(), ['b.md', 'a.md'])
+        self.assertEqual(order.update({'a.md': '2024-01-01 00:00:00',
+                                       'b.md': '2024-01-01 00:00:00'}), 0)
+        self.assertFalse(order.save())
+
+    def test_outdated_state(self):
+        os.makedirs(os.path.dirname(self.state_file))
+        with open(self.state_file, 'w') as f:
+            json.dump({'version': 0, 'keys': [['2024-01-01 00:00:00', 'a.md']]}, f)
+        self.assertEqual(PostOrder(self.state_file).newest_first(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
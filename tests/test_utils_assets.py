@@ -0,0 +1,95 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.assets import (
+    copy_asset,
+    get_asset_map,
+    get_asset_paths,
+    get_asset_url,
+    publish_assets,
+    rewrite_asset_urls,
+)
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.static_dir = os.path.join(self.temp_dir, 'static')
+        self.public_dir = os.path.join(self.temp_dir, 'public')
+        self.assets_dir = os.path.join(self.public_dir, 'assets')
+        for name, content in (('style.css', 'body {}'),
+                              ('images/bison.png', 'png'),
+                              ('posts/post.md', '# Post')):
+            path = os.path.join(self.static_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(content)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get_asset_map(self, paths):
+        return get_asset_map({path: 'abcdef0123456789' for path in paths},
+                             self.static_dir, self.assets_dir, self.public_dir)
+
+    def test_get_asset_paths_excludes_posts(self):
+        paths = get_asset_paths(self.static_dir,
+                                [os.path.join(self.static_dir, 'posts')])
+        self.assertEqual(
+            [os.path.relpath(path, self.static_dir) for path in paths],
+            [os.path.join('images', 'bison.png'), 'style.css'])
+
+    def test_get_asset_map(self):
+        paths = get_asset_paths(self.static_dir,
+                                [os.path.join(self.static_dir, 'posts')])
+        self.assertEqual(self.get_asset_map(paths), {
+            'static/images/bison.png': 'assets/images/bison.abcdef0123.png',
+            'static/style.css': 'assets/style.abcdef0123.css',
+        })
+
+    def test_get_asset_url(self):
+        asset_map = {'static/style.css': 'assets/style.abcdef0123.css'}
+        self.assertEqual(get_asset_url(asset_map, 'static/style.css'),
+                         'assets/style.abcdef0123.css')
+        self.assertEqual(get_asset_url(asset_map, 'static/other.css'),
+                         'static/other.css')
+        self.assertEqual(get_asset_url(None, 'static/style.css'),
+                         'static/style.css')
+
+    def test_rewrite_asset_urls(self):
+        asset_map = {'static/images/bison.png': 'assets/images/bison.abcdef0123.png'}
+        content = ('<img src="static/images/bison.png" alt="Bison">'
+                   "<a href='../static/images/bison.png?size=2#top'>Bison</a>"
+                   '<a href="https://example.com/static/images/bison.png">Elsewhere</a>')
+        self.assertEqual(rewrite_asset_urls(content, asset_map), (
+            '<img src="assets/images/bison.abcdef0123.png" alt="Bison">'
+            "<a href='../assets/images/bison.abcdef0123.png?size=2#top'>Bison</a>"
+            '<a href="https://example.com/static/images/bison.png">Elsewhere</a>'))
+        self.assertEqual(rewrite_asset_urls(content, {}), content)
+
+    def test_publish_assets(self):
+        paths = get_asset_paths(self.static_dir,
+                                [os.path.join(self.static_dir, 'posts')])
+        asset_map = self.get_asset_map(paths)
+        manifest_file = os.path.join(self.assets_dir, 'manifest.json')
+        written = publish_assets(paths, asset_map, self.static_dir,
+                                 self.public_dir, manifest_file)
+        self.assertEqual(len(written), 3)
+        self.assertIn(manifest_file, written)
+        with open(os.path.join(self.assets_dir, 'style.abcdef0123.css')) as f:
+            self.assertEqual(f.read(), 'body {}')
+        with open(manifest_file) as f:
+            self.assertEqual(json.load(f), asset_map)
+
+        # Fingerprinted copies are never copied again
+        self.assertEqual(publish_assets(paths, asset_map, self.static_dir,
+                                        self.public_dir, manifest_file), [])
+        self.assertFalse(copy_asset(
+            paths[1], os.path.join(self.assets_dir, 'style.abcdef0123.css')))
+
+
+if __name__ == '__main__':
+    unittest.main()
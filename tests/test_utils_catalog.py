@@ -0,0 +1,84 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from src.exceptions import PostNotFoundError
+from src.utils.catalog import Post, PostCatalog
+
+
+def render(content):
+    return f'<p>{content.strip()}</p>'
+
+
+class TestPostCatalog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.posts = []
+        for i, post_type in enumerate(['post', None, 'post', 'post']):
+            source_path = os.path.join(self.temp_dir, f'post_{i}.md')
+            with open(source_path, 'w') as f:
+                f.write(f'---\ntitle: Post {i}\n---\nBody {i}')
+            self.posts.append(Post(
+                id=f'id-{3 - i}', type=post_type, tags=('test', f'tag{i % 2}'),
+                title=f'Post {i}', sanitized_title=f'post_{i}',
+                source_path=source_path, body_offset=len(f'---\ntitle: Post {i}\n---'),
+                renderer=render))
+        self.catalog = PostCatalog(self.posts, renderer=render)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_catalog_round_trip(self):
+        self.assertEqual(len(self.catalog), 4)
+        self.assertEqual(list(self.catalog), self.posts)
+        self.assertEqual(self.catalog[1:3], self.posts[1:3])
+        self.assertEqual(self.catalog[-1], self.posts[-1])
+
+    def test_filters_and_sorted_views(self):
+        self.assertEqual([post.title for post in self.catalog.of_type('post')],
+                         ['Post 0', 'Post 2', 'Post 3'])
+        self.assertEqual(self.catalog.count_type(None), 1)
+        self.assertEqual([post.id for post in self.catalog.sorted_by('id')],
+                         ['id-0', 'id-1', 'id-2', 'id-3'])
+
+    def test_tag_index(self):
+        self.assertEqual(self.catalog.tags(), ['test', 'tag0', 'tag1'])
+        self.assertEqual(self.catalog.tag_rows['tag1'], [1, 3])
+        self.assertEqual([post.title for post in self.catalog.with_tag('tag0')],
+                         ['Post 0', 'Post 2'])
+        self.assertEqual(self.catalog.with_tag('missing'), [])
+
+    def test_tags_are_interned(self):
+        tags = self.catalog.column('tags')
+        self.assertIs(tags[0], tags[2])
+
+    def test_content_is_lazy(self):
+        post = self.catalog[0]
+        self.assertNotIn('content', post)
+        self.assertEqual(post.content, '<p>Body 0</p>')
+        self.assertEqual(post['content'], '<p>Body 0</p>')
+        self.assertIn('content', post)
+
+    def test_read_body(self):
+        post = self.catalog[0]
+        self.assertEqual(post.read_body(), '\nBody 0')
+        # An offset gone stale after the front matter changed is found again
+        with open(post.source_path, 'w') as f:
+            f.write('---\ntitle: Post 0\nsynopsis: Longer\n---\nBody 0')
+        self.assertEqual(post.read_body(), '\nBody 0')
+
+        os.remove(post.source_path)
+        with self.assertRaises(PostNotFoundError) as context:
+            post.read_body()
+        self.assertIn(post.source_path, str(context.exception))
+
+    def test_post_pickles(self):
+        post = pickle.loads(pickle.dumps(self.catalog[2]))
+        self.assertEqual(post, self.posts[2])
+        self.assertEqual(post.content, '<p>Body 2</p>')
+
+
+if __name__ == '__main__':
+    unittest.main()
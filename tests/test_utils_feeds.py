@@ -0,0 +1,74 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from src.utils.feeds import (
+    get_sitemap_filenames,
+    get_url,
+    iter_atom_feed,
+    iter_sitemaps,
+)
+
+SITEMAP = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class TestFeeds(unittest.TestCase):
+    def test_get_url(self):
+        self.assertEqual(get_url('https://example.com/blog', 'posts/a.html'),
+                         'https://example.com/blog/posts/a.html')
+        self.assertEqual(get_url('https://example.com/', 'index.html'),
+                         'https://example.com/index.html')
+
+    def test_sitemap(self):
+        entries = [('https://example.com/index.html', None),
+                   ('https://example.com/posts/a&b.html', '2024-01-02 03:04:05')]
+        [(filename, output)] = list(iter_sitemaps(entries, 'https://example.com/'))
+        self.assertEqual(filename, 'sitemap.xml')
+        root = ET.fromstring(''.join(output).encode('utf-8'))
+        self.assertEqual(root.tag, f'{SITEMAP}urlset')
+        urls = root.findall(f'{SITEMAP}url')
+        self.assertEqual([url.find(f'{SITEMAP}loc').text for url in urls],
+                         [url for url, _ in entries])
+        self.assertIsNone(urls[0].find(f'{SITEMAP}lastmod'))
+        self.assertTrue(urls[1].find(f'{SITEMAP}lastmod').text.startswith('2024-01-02T03:04:05'))
+
+    def test_sitemap_index(self):
+        self.assertEqual(get_sitemap_filenames(5, max_urls=2),
+                         ['sitemap-1.xml', 'sitemap-2.xml', 'sitemap-3.xml', 'sitemap.xml'])
+        entries = [(f'https://example.com/{n}.html', f'2024-01-0{n + 1} 00:00:00')
+                   for n in range(5)]
+        files = {filename: ''.join(output) for filename, output
+                 in iter_sitemaps(entries, 'https://example.com/', max_urls=2)}
+        self.assertEqual(len(ET.fromstring(files['sitemap-3.xml'])), 1)
+        index = ET.fromstring(files['sitemap.xml'])
+        self.assertEqual(index.tag, f'{SITEMAP}sitemapindex')
+        sitemaps = index.findall(f'{SITEMAP}sitemap')
+        self.assertEqual(sitemaps[0].find(f'{SITEMAP}loc').text,
+                         'https://example.com/sitemap-1.xml')
+        self.assertTrue(sitemaps[0].find(f'{SITEMAP}lastmod').text.startswith('2024-01-02'))
+
+    def test_atom_feed(self):
+        feed = {'title': 'Blog', 'subtitle': 'A <blog>', 'url': 'https://example.com/',
+                'feed_url': 'https://example.com/atom.xml', 'author': 'Ann',
+                'email': 'ann@example.com'}
+        entries = [{'title': 'New', 'url': 'https://example.com/posts/new.html',
+                    'last_updated': '2024-02-01 00:00:00', 'summary': 'Newer',
+                    'content': '<p>New &amp; shiny</p>'},
+                   {'title': 'Old', 'url': 'https://example.com/posts/old.html',
+                    'last_updated': '2024-01-01 00:00:00', 'summary': '',
+                    'content': '<p>Old</p>'}]
+        root = ET.fromstring(''.join(iter_atom_feed(feed, iter(entries))))
+        self.assertEqual(root.find(f'{ATOM}subtitle').text, 'A <blog>')
+        self.assertTrue(root.find(f'{ATOM}updated').text.startswith('2024-02-01'))
+        items = root.findall(f'{ATOM}entry')
+        self.assertEqual([item.find(f'{ATOM}title').text for item in items], ['New', 'Old'])
+        self.assertEqual(items[0].find(f'{ATOM}content').text, '<p>New &amp; shiny</p>')
+        self.assertIsNone(items[1].find(f'{ATOM}summary'))
+
+        # An empty feed is still valid
+        root = ET.fromstring(''.join(iter_atom_feed(feed, [])))
+        self.assertEqual(root.findall(f'{ATOM}entry'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
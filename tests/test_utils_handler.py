@@ -66,3 +66,42 @@ class TestUtils(unittest.TestCase):
         metadata = handler.extract_metadata(post_content)
         self.assertEqual(
             metadata, {'title': 'Test Post', 'tags': ['test', 'example']})
+
+    def test_get_template_reloads_changed_template(self):
+        template_dir = os.path.join(self.temp_dir, 'templates')
+        cache_dir = os.path.join(self.temp_dir, 'cache')
+        os.mkdir(template_dir)
+        template_path = os.path.join(template_dir, 'page.html')
+        with open(template_path, 'w') as f:
+            f.write('first {{ value }}')
+        template = handler.get_template('page.html', template_dir, cache_dir)
+        self.assertEqual(template.render(value=1), 'first 1')
+        self.assertTrue(os.listdir(cache_dir), 'Bytecode cache is empty.')
+
+        with open(template_path, 'w') as f:
+            f.write('second {{ value }}')
+        stat = os.stat(template_path)
+        os.utime(template_path, (stat.st_atime + 10, stat.st_mtime + 10))
+        template = handler.get_template('page.html', template_dir, cache_dir)
+        self.assertEqual(template.render(value=2), 'second 2')
+
+    def test_read_front_matter(self):
+        post_path = os.path.join(self.temp_dir, 'post.md')
+        post_content = '---\ntitle: Test Post\ntags: [test, example]\n---\nContent'
+        with open(post_path, 'w') as f:
+            f.write(post_content)
+        metadata, body_offset = handler.read_front_matter(post_path)
+        self.assertEqual(metadata, handler.extract_metadata(post_content))
+        self.assertEqual(post_content[body_offset:],
+                         handler.extract_post_content(post_content))
+
+        # The offset counts bytes, so the body is read without the front matter
+        with open(post_path, 'w', encoding='utf-8') as f:
+            f.write('---\ntitle: Café ☕\n---\nContent')
+        metadata, body_offset = handler.read_front_matter(post_path)
+        self.assertEqual(metadata['title'], 'Café ☕')
+        self.assertEqual(handler.read_post_body(post_path, body_offset), '\nContent')
+
+        with open(post_path, 'w') as f:
+            f.write('# No metadata\nContent')
+        self.assertEqual(handler.read_front_matter(post_path), (None, 0))
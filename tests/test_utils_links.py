@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from src.utils.links import LinkGraph, extract_links, resolve_link
+
+
+class TestExtractLinks(unittest.TestCase):
+    def test_attributes(self):
+        content = (
+            '<link rel="stylesheet" href="../assets/style.css">'
+            "<a href='tags/a%20b/index.html?x=1&amp;y=2#top'>tag</a>"
+            '<img src="image.png" data-src="lazy.png">'
+            '<a HREF = "../assets/style.css">again</a>'
+        )
+        self.assertEqual(
+            extract_links(content),
+            ['../assets/style.css', 'tags/a%20b/index.html?x=1&y=2#top', 'image.png'],
+        )
+
+
+class TestResolveLink(unittest.TestCase):
+    def test_relative(self):
+        self.assertEqual(resolve_link('posts/a.html', '../index.html'), 'index.html')
+        self.assertEqual(resolve_link('posts/a.html', './b.html#top'), 'posts/b.html')
+        self.assertEqual(resolve_link('index.html', 'tags/a%20b/'), 'tags/a b/index.html')
+        self.assertEqual(resolve_link('index.html', '../outside.html'), '../outside.html')
+
+    def test_not_site_files(self):
+        for url in ('https://example.com/', '//cdn.example.com/x.js', 'mailto:me@example.com',
+                    '#top', '/absolute.html', ''):
+            self.assertIsNone(resolve_link('posts/a.html', url))
+
+
+class TestLinkGraph(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_file = os.path.join(self.temp_dir, 'cache', 'links.json')
+        self.pages = {
+            'index.html': '<a href="posts/a.html">a</a><a href="about.html">about</a>',
+            'about.html': '<a href="./index.html">home</a>',
+            'posts/a.html': '<a href="../index.html">home</a><img src="../missing.png">',
+            'posts/b.html': '<a href="a.html">a</a>',
+        }
+        for page, content in self.pages.items():
+            self.write_page(page, content)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_page(self, page, content):
+        path = os.path.join(self.temp_dir, page)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def get_paths(self):
+        return [os.path.join(self.temp_dir, page) for page in self.pages]
+
+    def test_check(self):
+        graph = LinkGraph(self.state_file)
+        self.assertEqual(graph.update(self.get_paths(), self.temp_dir), 4)
+        broken, orphans = graph.check(set(self.pages))
+        self.assertEqual(broken, [('posts/a.html', '../missing.png')])
+        self.assertEqual(orphans, ['posts/b.html'])
+        self.assertTrue(graph.save())
+
+    def test_only_changed_pages_are_scanned(self):
+        graph = LinkGraph(self.state_file)
+        graph.update(self.get_paths(), self.temp_dir)
+        graph.save()
+
+        graph = LinkGraph(self.state_file)
+        self.assertEqual(graph.update(self.get_paths(), self.temp_dir), 0)
+        self.assertFalse(graph.save())
+
+        time.sleep(0.01)
+        self.write_page('about.html', '<a href="./index.html">home</a><a href="posts/b.html">b</a>')
+        self.assertEqual(graph.update(self.get_paths(), self.temp_dir), 1)
+        self.assertEqual(graph.check(set(self.pages))[1], [])
+
+        # Removed pages leave the graph
+        del self.pages['posts/b.html']
+        graph.update(self.get_paths(), self.temp_dir)
+        broken, _ = graph.check(set(self.pages))
+        self.assertIn(('about.html', 'posts/b.html'), broken)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import src.utils.manifest as manifest
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, f'file_{i}.md')
+            with open(path, 'w') as f:
+                f.write(f'content {i}')
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_relative_path(self):
+        path = os.path.join(self.temp_dir, 'posts', 'post.html')
+        self.assertEqual(manifest.relative_path(path, self.temp_dir),
+                         'posts/post.html')
+
+    def test_scan_files_rehashes_only_changed_files(self):
+        files, rehashed = manifest.scan_files(self.paths, {}, self.temp_dir)
+        self.assertEqual(rehashed, ['file_0.md', 'file_1.md', 'file_2.md'])
+
+        files_again, rehashed = manifest.scan_files(
+            self.paths, files, self.temp_dir)
+        self.assertEqual(rehashed, [])
+        self.assertEqual(files_again, files)
+
+        with open(self.paths[1], 'a') as f:
+            f.write(' edited')
+        files_after, rehashed = manifest.scan_files(
+            self.paths, files, self.temp_dir)
+        self.assertEqual(rehashed, ['file_1.md'])
+        self.assertNotEqual(files_after['file_1.md']['hash'],
+                            files['file_1.md']['hash'])
+
+    def test_load_manifest_missing_file(self):
+        loaded = manifest.load_manifest(
+            os.path.join(self.temp_dir, 'missing.json'))
+        self.assertEqual(loaded, manifest.new_manifest())
+
+    def test_load_cached_manifest(self):
+        path = os.path.join(self.temp_dir, 'manifest.json')
+        cache = {}
+        saved = manifest.new_manifest('fingerprint')
+        manifest.save_manifest(saved, path, cache)
+        self.assertIs(manifest.load_cached_manifest(path, cache), saved)
+
+        # A manifest written by another process is loaded again
+        other = manifest.new_manifest('other')
+        manifest.save_manifest(other, path)
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(manifest.load_cached_manifest(path, cache), other)
+
+        os.remove(path)
+        self.assertEqual(manifest.load_cached_manifest(path, cache), manifest.new_manifest())
+        self.assertEqual(cache, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
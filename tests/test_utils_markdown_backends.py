@@ -0,0 +1,66 @@
+import glob
+import os
+import unittest
+from unittest import mock
+
+from benchmarks.markdown_backends import (
+    CORPUS_DIRECTORY,
+    find_differences,
+    load_corpus,
+    normalize_html,
+)
+from src.utils.markdown_backends import (
+    MARKDOWN_BACKENDS,
+    MarkdownBackend,
+    get_available_backends,
+    get_markdown_backend,
+    load_markdown_backend,
+)
+
+
+def load_missing_backend(options):
+    raise ImportError("not installed")
+
+
+class TestMarkdownBackends(unittest.TestCase):
+    def test_default_backend_conformance(self):
+        """The default backend still renders the corpus exactly as recorded."""
+        backend = get_markdown_backend()
+        paths = sorted(glob.glob(os.path.join(CORPUS_DIRECTORY, '*.md')))
+        self.assertTrue(paths)
+        for path in paths:
+            with self.subTest(path=os.path.basename(path)):
+                with open(path) as f:
+                    markdown = f.read()
+                with open(path[:-3] + '.html') as f:
+                    self.assertEqual(backend.render(markdown), f.read())
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_markdown_backend('no-such-backend')
+
+    def test_missing_backend_falls_back(self):
+        with mock.patch.dict(MARKDOWN_BACKENDS, {'missing': load_missing_backend}):
+            self.assertEqual(load_markdown_backend('missing', ['tables']).name, 'markdown2')
+            self.assertNotIn('missing', get_available_backends())
+
+    def test_normalize_html(self):
+        self.assertEqual(
+            normalize_html('<p>A &amp; B</p>\n\n<hr />\n<img alt="x" src="y">'),
+            normalize_html('<p>A &#38;  B</p><hr><img src="y" alt="x" />'))
+        self.assertNotEqual(normalize_html('<pre>a  b</pre>'),
+                            normalize_html('<pre>a b</pre>'))
+
+    def test_find_differences(self):
+        reference = get_markdown_backend()
+        shouting = MarkdownBackend('shouting', '1', [],
+                                   lambda markdown: reference.render(markdown).upper())
+        corpus = load_corpus()
+        differences = find_differences(
+            {'markdown2': reference, 'same': reference, 'shouting': shouting}, corpus)
+        self.assertEqual(differences['same'], {})
+        self.assertEqual(set(differences['shouting']), set(corpus))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from src.utils.pipeline import run_pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    def test_every_item_is_processed(self):
+        results = asyncio.run(run_pipeline(
+            range(50), lambda item: item * 2, lambda item, data: (item, data + 1),
+            lambda output: output, render_tasks=3))
+        self.assertEqual(sorted(results), [(item, item * 2 + 1) for item in range(50)])
+
+    def test_backpressure(self):
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+
+        def read(item):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            return item
+
+        def write(output):
+            # A slow disk: the earlier stages must wait instead of piling up items
+            time.sleep(0.001)
+            with lock:
+                in_flight[0] -= 1
+            return output
+
+        results = asyncio.run(run_pipeline(
+            range(200), read, lambda item, data: data, write, io_tasks=2, queue_size=4))
+        self.assertEqual(len(results), 200)
+        # Two queues, plus the items held by the readers, renderer and writers
+        self.assertLessEqual(peak[0], 2 * 4 + 2 + 1 + 2)
+
+    def test_errors_stop_the_pipeline(self):
+        read = []
+
+        def render(item, data):
+            raise ValueError('render failed')
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run_pipeline(
+                range(1000), lambda item: read.append(item) or item, render, lambda output: output,
+                queue_size=2))
+        self.assertLess(len(read), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.postprocess import (
+    compress_file,
+    compress_outputs,
+    minify_css,
+    minify_html,
+    remove_compressed,
+)
+from src.utils.writer import PageWriter
+
+
+class TestMinify(unittest.TestCase):
+    def test_minify_html(self):
+        content = ('<!DOCTYPE html>\n<html>\n<head>\n    <title>Blog</title>\n'
+                   '    <!-- layout -->\n</head>\n<body>\n'
+                   '    <p>Hello   <b>bold</b>  <i>world</i>\n    again</p>\n'
+                   '</body>\n</html>\n')
+        self.assertEqual(minify_html(content), (
+            '<!DOCTYPE html><html><head><title>Blog</title></head><body>'
+            '<p>Hello <b>bold</b> <i>world</i> again</p></body></html>'))
+
+    def test_minify_html_keeps_preformatted(self):
+        content = ('<div>\n  <pre><code>def f():\n    return  1\n</code></pre>\n'
+                   '  <p>Use <code>a  =  b</code>.</p>\n'
+                   '  <script>\n  var s = "  x  ";\n  </script>\n'
+                   '  <!--[if IE]><p>Old</p><![endif]-->\n</div>')
+        self.assertEqual(minify_html(content), (
+            '<div><pre><code>def f():\n    return  1\n</code></pre>'
+            '<p>Use <code>a  =  b</code>.</p>'
+            '<script>\n  var s = "  x  ";\n  </script>'
+            '<!--[if IE]><p>Old</p><![endif]--></div>'))
+
+    def test_minify_css(self):
+        content = ('/* theme */\nbody {\n  color: red;\n  font-family: "A  B", serif;\n}\n'
+                   'a:hover , a:focus {\n  content: "{ ; }";\n}\n')
+        self.assertEqual(minify_css(content), (
+            'body{color: red;font-family: "A  B",serif}'
+            'a:hover,a:focus{content: "{ ; }"}'))
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_compress_file(self):
+        path = self.write('index.html', '<p>Hello</p>' * 100)
+        self.assertTrue(compress_file(path))
+        with gzip.open(path + '.gz', 'rt') as f:
+            self.assertEqual(f.read(), '<p>Hello</p>' * 100)
+        # The same content compresses to the same bytes, so nothing is rewritten
+        self.assertFalse(compress_file(path))
+        self.assertTrue(remove_compressed(path))
+        self.assertFalse(remove_compressed(path))
+
+    def test_compress_outputs(self):
+        paths = [self.write(name, 'body {}')
+                 for name in ('a.html', 'b.css', 'c.js', 'd.png')]
+        written = compress_outputs(paths, workers=2)
+        self.assertEqual(written, sorted(paths[:3]))
+        self.assertFalse(os.path.exists(paths[3] + '.gz'))
+        self.assertEqual(compress_outputs(paths, workers=2), [])
+
+    def test_writer_minifies_html(self):
+        with PageWriter(minify=True) as writer:
+            writer.write(os.path.join(self.temp_dir, 'page.html'),
+                         iter(['<div>\n  <p>A</p>\n', '</div>\n']))
+            writer.write(os.path.join(self.temp_dir, 'data.json'), '{\n "a": 1\n}')
+        with open(os.path.join(self.temp_dir, 'page.html')) as f:
+            self.assertEqual(f.read(), '<div><p>A</p></div>')
+        with open(os.path.join(self.temp_dir, 'data.json')) as f:
+            self.assertEqual(f.read(), '{\n "a": 1\n}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.profiler import BuildProfiler, get_profiler, profile_span, set_profiler
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        set_profiler(None)
+        shutil.rmtree(self.temp_dir)
+
+    def test_phases_and_spans(self):
+        profiler = BuildProfiler(profile_calls=True)
+        set_profiler(profiler)
+        profiler.start()
+        with profiler.phase('render'):
+            with profile_span('markdown', 'slow.md'):
+                data = [bytes(1024) for _ in range(100)]
+            with profile_span('template', 'slow.md', template='post.html'):
+                sum(range(100000))
+            with profile_span('template', 'fast.md', template='post.html'):
+                pass
+        profiler.stop()
+
+        self.assertEqual(list(profiler.phases), ['render'])
+        self.assertGreater(profiler.phases['render']['peak'], 100 * 1024)
+        slowest = profiler.slowest('name')
+        self.assertEqual([total['name'] for total in slowest], ['slow.md', 'fast.md'])
+        self.assertEqual(set(slowest[0]['categories']), {'markdown', 'template'})
+        self.assertEqual(profiler.slowest('template', categories=('template',))[0]['count'], 2)
+        self.assertIn('slow.md', profiler.format_report())
+        self.assertEqual(profiler.category_totals()['template']['count'], 2)
+
+        trace_file = os.path.join(self.temp_dir, 'trace.json')
+        profiler.save_trace(trace_file)
+        with open(trace_file) as f:
+            events = json.load(f)['traceEvents']
+        self.assertEqual(len(events), 4)
+        self.assertTrue(all(event['ph'] == 'X' for event in events))
+
+        paths = profiler.save_snapshots(self.temp_dir)
+        self.assertEqual([os.path.basename(path) for path in paths], ['build.prof', 'build.tracemalloc'])
+        del data
+
+    def test_no_active_profiler(self):
+        self.assertIsNone(get_profiler())
+        with profile_span('markdown', 'post.md'):
+            pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def renderer(self, content):
+        self.calls.append(content)
+        return f'<p>{content}</p>'
+
+    def test_render_hits_cache(self):
+        cache = RenderCache(self.temp_dir)
+        self.assertEqual(cache.render('hello', self.renderer), '<p>hello</p>')
+        self.assertEqual(cache.render('hello', self.renderer), '<p>hello</p>')
+        self.assertEqual(self.calls, ['hello'])
+
+    def test_key_depends_on_version_and_options(self):
+        key = RenderCache(self.temp_dir, version='1').get_key('hello')
+        self.assertNotEqual(
+            key, RenderCache(self.temp_dir, version='2').get_key('hello'))
+        self.assertNotEqual(
+            key, RenderCache(self.temp_dir, version='1',
+                             options=['tables']).get_key('hello'))
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = RenderCache(self.temp_dir, max_size=20)
+        keys = [cache.get_key(content) for content in ('a', 'b', 'c')]
+        for i, key in enumerate(keys):
+            cache.put(key, '0123456789')
+            os.utime(cache.get_path(key), ns=(i, i))
+        # Reading the oldest entry makes it the most recently used
+        cache.get(keys[0])
+        self.assertEqual(cache.prune(), 1)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
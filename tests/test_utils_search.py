@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.search import SearchIndex, get_shard_filename, score_terms, tokenize
+
+
+class FakePost:
+    def __init__(self, title, content):
+        self.title = title
+        self.content = content
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, 'search')
+        self.state_file = os.path.join(self.temp_dir, 'cache', 'search.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def get_index(self):
+        return SearchIndex(self.output_dir, self.state_file, shard_size=200)
+
+    def find(self, term):
+        """Look a term up the way the client script does."""
+        with open(os.path.join(self.output_dir, 'index.json')) as f:
+            index = json.load(f)
+        for length in range(len(term), 0, -1):
+            if term[:length] in index['shards']:
+                path = os.path.join(self.output_dir, 'terms', index['shards'][term[:length]])
+                with open(path) as f:
+                    postings = json.load(f).get(term, [])
+                return dict(zip(postings[::2], postings[1::2]))
+        return {}
+
+    def test_tokenize_and_score(self):
+        self.assertEqual(tokenize('The <Cave> of a bison, 2023!'), ['the', 'cave', 'of', 'bison', '2023'])
+        scores = score_terms('Bison', '<p>bison &amp; cave</p><p>cave</p>')
+        self.assertEqual(scores, {'bison': 11, 'cave': 2})
+
+    def test_incremental_update(self):
+        posts = {
+            f'posts/{i}.md': (f'hash{i}', [f'Post {i}', f'posts/{i}.html', None],
+                              FakePost(f'Post {i}', f'<p>common word{i} altamira{i % 3}</p>'))
+            for i in range(30)
+        }
+        index = self.get_index()
+        self.assertTrue(index.update(posts))
+        index.save()
+        # Oversized shards were split
+        self.assertGreater(len(index.state['prefixes']), 3)
+        self.assertEqual(len(self.find('common')), 30)
+        self.assertEqual(len(self.find('altamira1')), 10)
+        self.assertEqual(self.find('post'), {doc: 10 for doc in range(30)})
+
+        # Nothing changed: nothing to do
+        index = self.get_index()
+        self.assertFalse(index.update(posts))
+
+        # Remove one post and edit another; the free number is reused
+        del posts['posts/3.md']
+        posts['posts/5.md'] = ('changed', posts['posts/5.md'][1], FakePost('Post 5', '<p>bison</p>'))
+        index = self.get_index()
+        self.assertTrue(index.update(posts))
+        index.save()
+        self.assertEqual(len(self.find('common')), 28)
+        self.assertEqual(list(self.find('bison')), [3])
+        with open(os.path.join(self.output_dir, 'docs', '0.json')) as f:
+            docs = json.load(f)
+        self.assertEqual(docs[3][0], 'Post 5')
+        self.assertIsNone(docs[5])
+
+    def test_missing_output_rebuilds(self):
+        posts = {'a.md': ('hash', ['A', 'a.html', None], FakePost('A', 'cave'))}
+        index = self.get_index()
+        index.update(posts)
+        index.save()
+        os.remove(os.path.join(self.output_dir, 'terms', get_shard_filename('c')))
+        self.assertTrue(self.get_index().update(posts))
+
+
+if __name__ == '__main__':
+    unittest.main()
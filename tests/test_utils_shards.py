@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.shards import (find_shard_manifests, get_post_shard,
+                              get_shard_manifest_path, merge_shard_manifests,
+                              parse_shard)
+
+
+class TestParseShard(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_shard('2/4'), (2, 4))
+        self.assertEqual(parse_shard(' 1/1 '), (1, 1))
+        for value in ('0/4', '5/4', '2', 'a/b', '-1/4'):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+
+class TestPostShard(unittest.TestCase):
+    def test_partition(self):
+        sources = [f'static/posts/post_{i}.md' for i in range(200)]
+        shards = [get_post_shard(source, 4) for source in sources]
+        self.assertEqual(set(shards), {1, 2, 3, 4})
+        # Stable: the same path always lands on the same shard
+        self.assertEqual(shards, [get_post_shard(source, 4) for source in sources])
+        self.assertEqual(get_post_shard('static/posts/about.md', 1), 1)
+
+
+class TestShardManifests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.manifest_file = os.path.join(self.temp_dir, 'manifest.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_shards(self, shards):
+        for shard in shards:
+            with open(get_shard_manifest_path(self.manifest_file, shard), 'w') as f:
+                f.write('{}')
+
+    def test_manifest_path(self):
+        self.assertEqual(get_shard_manifest_path('/site/manifest.json', (2, 4)),
+                         '/site/manifest.shard-2-of-4.json')
+
+    def test_find(self):
+        with self.assertRaises(ValueError):
+            find_shard_manifests(self.manifest_file)
+        self.write_shards([(2, 3), (1, 3)])
+        with self.assertRaises(ValueError):
+            find_shard_manifests(self.manifest_file)
+        self.write_shards([(3, 3)])
+        self.assertEqual(
+            find_shard_manifests(self.manifest_file),
+            [get_shard_manifest_path(self.manifest_file, (i, 3)) for i in (1, 2, 3)],
+        )
+        self.write_shards([(1, 2)])
+        with self.assertRaises(ValueError):
+            find_shard_manifests(self.manifest_file)
+
+    def test_merge(self):
+        options = {'minify': False}
+        first = {'fingerprint': 'f', 'options': options, 'posts': {'a.md': {'hash': '1'}},
+                 'search': {'a.md': {'word': 1}}}
+        second = {'fingerprint': 'f', 'options': options, 'posts': {'b.md': {'hash': '2'}}}
+        posts, search = merge_shard_manifests([first, second], 'f', options)
+        self.assertEqual(posts, {'a.md': {'hash': '1'}, 'b.md': {'hash': '2'}})
+        self.assertEqual(search, {'a.md': {'word': 1}})
+
+        with self.assertRaises(ValueError):
+            merge_shard_manifests([first, second], 'other', options)
+        with self.assertRaises(ValueError):
+            merge_shard_manifests([first, first], 'f', options)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.watcher import PollingWatcher, get_watcher
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.post_path = os.path.join(self.temp_dir, 'post.md')
+        with open(self.post_path, 'w') as f:
+            f.write('content')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def assert_detects_changes(self, watcher):
+        try:
+            self.assertEqual(watcher.wait(timeout=0.1), set())
+            with open(self.post_path, 'a') as f:
+                f.write(' edited')
+            self.assertIn(self.post_path, watcher.wait(timeout=5))
+        finally:
+            watcher.close()
+
+    def test_polling_watcher(self):
+        self.assert_detects_changes(
+            PollingWatcher([self.temp_dir], interval=0.01))
+
+    def test_get_watcher(self):
+        self.assert_detects_changes(get_watcher([self.temp_dir]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.utils.writer import PageWriter, write_output
+
+
+class TestPageWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_write_pages(self):
+        pages = {
+            os.path.join(self.temp_dir, f'page_{i}.html'): f'<p>{i}</p>'
+            for i in range(20)
+        }
+        streamed = os.path.join(self.temp_dir, 'posts', 'streamed.html')
+        with PageWriter(workers=3, queue_size=2) as writer:
+            writer.create_directories([self.temp_dir])
+            for output_filename, output_html in pages.items():
+                writer.write(output_filename, output_html)
+            writer.write(streamed, (f'<p>{i}</p>' for i in range(3)))
+        pages[streamed] = '<p>0</p><p>1</p><p>2</p>'
+
+        self.assertEqual(sorted(writer.written), sorted(pages))
+        for output_filename, output_html in pages.items():
+            with open(output_filename) as f:
+                self.assertEqual(f.read(), output_html)
+
+    def test_write_error_is_raised_on_close(self):
+        writer = PageWriter(workers=1)
+        writer.directories.add(os.path.join(self.temp_dir, 'missing'))
+        writer.write(os.path.join(self.temp_dir, 'missing', 'page.html'), '')
+        with self.assertRaises(FileNotFoundError):
+            writer.close()
+
+    def test_write_output_skips_identical_content(self):
+        output_filename = os.path.join(self.temp_dir, 'page.html')
+        self.assertTrue(write_output(output_filename, '<p>page</p>'))
+        os.utime(output_filename, ns=(0, 0))
+        self.assertFalse(write_output(output_filename, '<p>page</p>'))
+        self.assertFalse(write_output(output_filename, iter(['<p>', 'page</p>'])))
+        self.assertEqual(os.stat(output_filename).st_mtime_ns, 0)
+
+        self.assertTrue(write_output(output_filename, '<p>edited</p>'))
+        with open(output_filename) as f:
+            self.assertEqual(f.read(), '<p>edited</p>')
+        self.assertEqual(os.listdir(self.temp_dir), ['page.html'])
+
+
+    @unittest.skipIf(os.name != 'posix', 'file modes are POSIX')
+    def test_write_output_permissions_follow_the_umask(self):
+        output_filename = os.path.join(self.temp_dir, 'page.html')
+        umask = os.umask(0o027)
+        try:
+            write_output(output_filename, '<p>page</p>')
+            # Writing never changes the umask of the process
+            self.assertEqual(os.umask(0o027), 0o027)
+        finally:
+            os.umask(umask)
+        self.assertEqual(os.stat(output_filename).st_mode & 0o777, 0o640)
+
+if __name__ == '__main__':
+    unittest.main()